@@ -1,8 +1,9 @@
 import django_filters
 from django import forms
-from django.db.models import Q
-from .models import Caso, CasoNino, CasoParte
-from personas.models import Nino, Parte
+from core.texto import filtrar_por_texto
+from core.widgets import AutocompletarSelect
+from .models import Caso
+from personas.models import Nino
 
 class CasoFilter(django_filters.FilterSet):
     
@@ -37,9 +38,13 @@ class CasoFilter(django_filters.FilterSet):
     # Filtro por niño/a (ModelChoice)
     nino = django_filters.ModelChoiceFilter(
         label='Niño/a',
-        queryset=Nino.objects.all().order_by('apellido', 'nombre'),
+        queryset=Nino.objects.all(),
         field_name='caso_ninos__nino',
-        widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+        widget=AutocompletarSelect(
+            'personas:api_ninos',
+            attrs={'class': 'form-select form-select-sm'},
+            placeholder='Buscar niño/a...',
+        )
     )
 
     # Filtros por fechas
@@ -81,39 +86,21 @@ class CasoFilter(django_filters.FilterSet):
         """
         Filtro personalizado para búsqueda en múltiples campos
         Incluye búsqueda por:
-        - Número de expediente
+        - Número de expediente y código
         - DNI de niños
         - Nombres y apellidos de niños
         - DNI de partes
         - Nombres y apellidos de partes
+
+        Usa el documento precalculado Caso.texto_busqueda: una sola consulta,
+        sin joins ni distinct, sin importar cuántas personas tenga el caso.
         """
         if not value:
             return queryset
-            
-        # Búsqueda en campos directos del caso
-        q_objects = Q(expte__icontains=value)
-        
-        # Búsqueda en niños relacionados
-        ninos = Nino.objects.filter(
-            Q(dni__icontains=value) |
-            Q(nombre__icontains=value) |
-            Q(apellido__icontains=value)
-        ).values_list('id_ninos', flat=True)
-        
-        # Búsqueda en partes relacionadas
-        partes = Parte.objects.filter(
-            Q(dni__icontains=value) |
-            Q(nombre__icontains=value) |
-            Q(apellido__icontains=value)
-        ).values_list('id_partes', flat=True)
-        
-        # Obtener los IDs de casos que tienen los niños o partes encontrados
-        if ninos.exists():
-            casos_con_ninos = CasoNino.objects.filter(nino_id__in=ninos).values_list('caso_id', flat=True)
-            q_objects |= Q(id__in=casos_con_ninos)
-            
-        if partes.exists():
-            casos_con_partes = CasoParte.objects.filter(parte_id__in=partes).values_list('caso_id', flat=True)
-            q_objects |= Q(id__in=casos_con_partes)
-        
-        return queryset.filter(q_objects).distinct()
+        return filtrar_por_texto(queryset, value)
+
+    def ordenar(self, queryset):
+        """Orden del listado (más nuevos primero); con búsqueda, primero por relevancia."""
+        if 'relevancia' in queryset.query.annotations:
+            return queryset.order_by('-relevancia', '-creado')
+        return queryset.order_by('-creado')
@@ -1,5 +1,6 @@
 from django import forms
 from django.forms import ModelForm, inlineformset_factory
+from core.widgets import AutocompletarSelect
 from .models import Caso, CasoNino, CasoParte
 from personas.models import Nino, Parte
 
@@ -38,7 +39,7 @@ class CasoForm(ModelForm):
 class CasoNinoForm(ModelForm):
     nino = forms.ModelChoiceField(
         queryset=Nino.objects.all(),
-        widget=forms.Select(attrs={'class': 'form-select'}),
+        widget=AutocompletarSelect('personas:api_ninos', attrs={'class': 'form-select'}),
         label='Niño'
     )
     
@@ -52,7 +53,7 @@ class CasoNinoForm(ModelForm):
 class CasoParteForm(ModelForm):
     parte = forms.ModelChoiceField(
         queryset=Parte.objects.all(),
-        widget=forms.Select(attrs={'class': 'form-select'}),
+        widget=AutocompletarSelect('personas:api_partes', attrs={'class': 'form-select'}),
         label='Parte'
     )
     
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count, Q
+
+from casos.models import Caso
+
+
+class Command(BaseCommand):
+    help = (
+        'Verifica y reconstruye los contadores de oficios de cada caso '
+        '(total_oficios, oficios_pendientes) y su estado derivado.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--solo-verificar',
+            action='store_true',
+            help='Informa las diferencias sin corregirlas (sale con error si hay alguna).',
+        )
+
+    def handle(self, *args, **options):
+        solo_verificar = options['solo_verificar']
+        casos = (
+            Caso.objects
+            .annotate(
+                total_real=Count('oficios'),
+                pendientes_real=Count('oficios', filter=~Q(oficios__estado='enviado')),
+            )
+            .order_by('pk')
+        )
+        diferencias = []
+        for caso in casos.iterator(chunk_size=1000):
+            if caso.total_oficios != caso.total_real or caso.oficios_pendientes != caso.pendientes_real:
+                self.stdout.write(
+                    f'Caso {caso.pk}: total {caso.total_oficios} -> {caso.total_real}, '
+                    f'pendientes {caso.oficios_pendientes} -> {caso.pendientes_real}'
+                )
+                caso.total_oficios = caso.total_real
+                caso.oficios_pendientes = caso.pendientes_real
+                diferencias.append(caso)
+
+        if solo_verificar:
+            if diferencias:
+                raise CommandError(f'{len(diferencias)} casos con contadores desactualizados.')
+            self.stdout.write(self.style.SUCCESS('Contadores correctos.'))
+            return
+
+        with transaction.atomic():
+            Caso.objects.bulk_update(diferencias, ['total_oficios', 'oficios_pendientes'], batch_size=500)
+            estados_cambiados = sum(1 for caso in diferencias if caso.actualizar_estado_segun_oficios())
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(diferencias)} casos corregidos, {estados_cambiados} con cambio de estado.'
+        ))
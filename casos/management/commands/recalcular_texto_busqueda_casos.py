@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from casos.models import Caso
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula el documento de busqueda de los casos (expediente, codigo y '
+        'nombres/DNI de niños y partes vinculados).'
+    )
+
+    def handle(self, *args, **options):
+        actualizados = Caso.recalcular_texto_busqueda(Caso.objects.values_list('pk', flat=True))
+        self.stdout.write(self.style.SUCCESS(f'{actualizados} casos actualizados.'))
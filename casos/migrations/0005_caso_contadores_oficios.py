@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:47
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def poblar_contadores(apps, schema_editor):
+    Caso = apps.get_model('casos', 'Caso')
+    casos = (
+        Caso.objects
+        .annotate(
+            total=Count('oficios'),
+            pendientes=Count('oficios', filter=~Q(oficios__estado='enviado')),
+        )
+        .filter(total__gt=0)
+    )
+    cambios = []
+    for caso in casos.iterator():
+        caso.total_oficios = caso.total
+        caso.oficios_pendientes = caso.pendientes
+        cambios.append(caso)
+    Caso.objects.bulk_update(cambios, ['total_oficios', 'oficios_pendientes'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casos', '0004_caso_codigo_historicalcaso_codigo'),
+        ('oficios', '0036_alter_historicaloficio_codigo_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='caso',
+            name='oficios_pendientes',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Oficios no enviados'),
+        ),
+        migrations.AddField(
+            model_name='caso',
+            name='total_oficios',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Total de oficios'),
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:11
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+from core.texto import componer_texto_busqueda
+
+
+def poblar_texto_busqueda(apps, schema_editor):
+    Caso = apps.get_model('casos', 'Caso')
+    CasoNino = apps.get_model('casos', 'CasoNino')
+    CasoParte = apps.get_model('casos', 'CasoParte')
+    personas = defaultdict(list)
+    for filas in (
+        CasoNino.objects.values_list('caso_id', 'nino__apellido', 'nino__nombre', 'nino__dni'),
+        CasoParte.objects.values_list('caso_id', 'parte__apellido', 'parte__nombre', 'parte__dni'),
+    ):
+        for caso_id, apellido, nombre, dni in filas.order_by('pk').iterator():
+            personas[caso_id].append(f'{apellido or ""} {nombre or ""}')
+            personas[caso_id].append(dni)
+    casos = []
+    for caso in Caso.objects.only('pk', 'expte', 'codigo').iterator():
+        caso.texto_busqueda = componer_texto_busqueda([caso.expte, caso.codigo, *personas[caso.pk]])
+        casos.append(caso)
+    Caso.objects.bulk_update(casos, ['texto_busqueda'], batch_size=1000)
+
+
+def crear_indice_trigramas(apps, schema_editor):
+    # Solo PostgreSQL (ver oficios 0038)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS caso_texto_busqueda_trgm '
+        'ON casos_caso USING gin (texto_busqueda gin_trgm_ops)'
+    )
+
+
+def borrar_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS caso_texto_busqueda_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casos', '0005_caso_contadores_oficios'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='caso',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de búsqueda'),
+        ),
+        migrations.RunPython(poblar_texto_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice_trigramas, borrar_indice_trigramas),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casos', '0006_caso_texto_busqueda'),
+        ('personas', '0009_indices_paginacion_cursor'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='caso',
+            index=models.Index(fields=['-creado', '-id'], name='caso_creado_idx'),
+        ),
+    ]
@@ -1,8 +1,14 @@
-from django.db import models
+from collections import defaultdict
+
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from simple_history.models import HistoricalRecords
 from personas.models import Nino, Parte
+from core.codigos import reservar_codigos
+from core.texto import componer_texto_busqueda
 
 User = get_user_model()
 
@@ -43,6 +49,16 @@ class CasoNino(models.Model):
     def __str__(self):
         return f"{self.caso} - {self.nino}"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Caso.recalcular_texto_busqueda([self.caso_id])
+
+    def delete(self, *args, **kwargs):
+        caso_id = self.caso_id
+        resultado = super().delete(*args, **kwargs)
+        Caso.recalcular_texto_busqueda([caso_id])
+        return resultado
+
 
 class CasoParte(models.Model):
     """
@@ -84,6 +100,16 @@ class CasoParte(models.Model):
     def __str__(self):
         return f"{self.caso} - {self.parte} ({self.tipo_relacion})"
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        Caso.recalcular_texto_busqueda([self.caso_id])
+
+    def delete(self, *args, **kwargs):
+        caso_id = self.caso_id
+        resultado = super().delete(*args, **kwargs)
+        Caso.recalcular_texto_busqueda([caso_id])
+        return resultado
+
 
 class Caso(models.Model):
     TIPO_CHOICES = [
@@ -148,37 +174,39 @@ class Caso(models.Model):
         blank=True
     )
 
+    # Contadores desnormalizados de oficios, mantenidos por Oficio.save()/delete()
+    # con updates F(). Se reconstruyen con `manage.py recalcular_contadores_casos`.
+    total_oficios = models.PositiveIntegerField('Total de oficios', default=0, editable=False)
+    oficios_pendientes = models.PositiveIntegerField('Oficios no enviados', default=0, editable=False)
+
+    # Documento de busqueda: expediente, codigo y nombres/DNI de niños y partes
+    # vinculados, normalizado. Lo mantienen Caso/CasoNino/CasoParte/Nino/Parte.
+    texto_busqueda = models.TextField('Texto de búsqueda', blank=True, default='', editable=False)
+
     creado = models.DateTimeField('Creado', auto_now_add=True)
     actualizado = models.DateTimeField('Actualizado', auto_now=True)
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=['total_oficios', 'oficios_pendientes', 'texto_busqueda'])
     
     class Meta:
         verbose_name = 'Caso'
         verbose_name_plural = 'Casos'
         ordering = ['-creado']
+        indexes = [
+            # Listado (mas nuevos primero) paginado por cursor
+            models.Index(fields=['-creado', '-id'], name='caso_creado_idx'),
+        ]
     
     def __str__(self):
         referencia = self.codigo or self.expte or self.pk
         return f"{self.get_tipo_display()} - {referencia}"
 
+    # Columnas que mantienen otros con UPDATE propios (contadores con F(), texto de
+    # busqueda): un save() completo del caso no las reescribe con valores viejos
+    CAMPOS_MANTENIDOS = ('total_oficios', 'oficios_pendientes', 'texto_busqueda')
+
     def _generar_codigo(self):
         anio = (self.creado.year if self.creado else timezone.now().year)
-        ultimo = (
-            Caso.objects
-            .filter(codigo__startswith='CS-', codigo__endswith=f'-{anio}')
-            .exclude(pk=self.pk)
-            .order_by('-codigo')
-            .first()
-        )
-        siguiente = 1
-
-        if ultimo and ultimo.codigo:
-            try:
-                siguiente = int(ultimo.codigo.split('-')[1]) + 1
-            except (IndexError, ValueError):
-                siguiente = 1
-
-        return f"CS-{siguiente:05d}-{anio}"
+        return reservar_codigos('CS', anio, modelo=Caso)[0]
 
     def save(self, *args, **kwargs):
         if self.expte:
@@ -190,8 +218,103 @@ class Caso(models.Model):
         )
         if not self.codigo or codigo_en_uso:
             self.codigo = self._generar_codigo()
+        update_fields = kwargs.get('update_fields')
+        if self._state.adding:
+            # Un caso nuevo todavia no tiene personas vinculadas
+            self.texto_busqueda = componer_texto_busqueda([self.expte, self.codigo])
+            super().save(*args, **kwargs)
+            return
+        if update_fields is None:
+            diferidos = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.CAMPOS_MANTENIDOS
+                and field.attname not in diferidos
+            ]
         super().save(*args, **kwargs)
+        if update_fields is None or {'expte', 'codigo'} & set(update_fields):
+            Caso.recalcular_texto_busqueda([self.pk])
+
+    @classmethod
+    def recalcular_texto_busqueda(cls, caso_ids, batch_size=1000):
+        """
+        Recompone texto_busqueda de los casos indicados con una consulta por tabla
+        (casos, niños y partes vinculados) por lote y un bulk_update.
+        """
+        caso_ids = [pk for pk in dict.fromkeys(caso_ids) if pk]
+        actualizados = 0
+        for inicio in range(0, len(caso_ids), batch_size):
+            lote = caso_ids[inicio:inicio + batch_size]
+            personas = defaultdict(list)
+            vinculos = [
+                CasoNino.objects.filter(caso_id__in=lote).values_list(
+                    'caso_id', 'nino__apellido', 'nino__nombre', 'nino__dni'
+                ),
+                CasoParte.objects.filter(caso_id__in=lote).values_list(
+                    'caso_id', 'parte__apellido', 'parte__nombre', 'parte__dni'
+                ),
+            ]
+            for filas in vinculos:
+                for caso_id, apellido, nombre, dni in filas.order_by('pk'):
+                    personas[caso_id].append(f'{apellido or ""} {nombre or ""}')
+                    personas[caso_id].append(dni)
+            cambios = []
+            for caso in cls.objects.filter(pk__in=lote).only('pk', 'expte', 'codigo', 'texto_busqueda'):
+                texto = componer_texto_busqueda([caso.expte, caso.codigo, *personas[caso.pk]])
+                if texto != caso.texto_busqueda:
+                    caso.texto_busqueda = texto
+                    cambios.append(caso)
+            cls.objects.bulk_update(cambios, ['texto_busqueda'])
+            actualizados += len(cambios)
+        return actualizados
         
+    @property
+    def oficios_enviados(self):
+        return max(self.total_oficios - self.oficios_pendientes, 0)
+
+    @property
+    def progreso_oficios(self):
+        """Porcentaje de oficios enviados (0-100) calculado con los contadores."""
+        if not self.total_oficios:
+            return 0
+        return round(self.oficios_enviados * 100 / self.total_oficios)
+
+    def actualizar_estado_segun_oficios(self):
+        """
+        Ajusta el estado segun los contadores: si todos los oficios estan 'enviado'
+        pasa a CERRADO; si hay oficios pendientes y estaba ABIERTO o CERRADO pasa
+        a EN_PROCESO.
+        """
+        if self.total_oficios and not self.oficios_pendientes:
+            nuevo_estado = 'CERRADO'
+        elif self.oficios_pendientes or self.estado == 'CERRADO':
+            nuevo_estado = 'EN_PROCESO'
+        else:
+            return False
+        if self.estado == nuevo_estado:
+            return False
+        self.estado = nuevo_estado
+        self.save(update_fields=['estado'])
+        return True
+
+    @classmethod
+    def ajustar_contadores(cls, caso_id, total=0, pendientes=0):
+        """
+        Suma los deltas a los contadores del caso con un UPDATE atomico (F()) y
+        decide el cierre/reapertura en O(1), sin recorrer sus oficios.
+        """
+        if not caso_id or not (total or pendientes):
+            return
+        with transaction.atomic(savepoint=False):
+            cls.objects.filter(pk=caso_id).update(
+                total_oficios=Greatest(F('total_oficios') + total, 0),
+                oficios_pendientes=Greatest(F('oficios_pendientes') + pendientes, 0),
+            )
+            caso = cls.objects.filter(pk=caso_id).first()
+            if caso is not None:
+                caso.actualizar_estado_segun_oficios()
+
     def get_all_movimientos(self):
         """
         Obtiene todos los movimientos de los oficios relacionados con este caso.
@@ -1,3 +1,112 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from oficios.models import Oficio
+from personas.models import Nino, Parte
+
+from .models import Caso, CasoNino, CasoParte
+
+
+class ContadoresCasoTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+
+    def setUp(self):
+        self.caso = Caso.objects.create(usuario=self.user)
+
+    def _refrescar(self):
+        self.caso.refresh_from_db()
+        return self.caso.total_oficios, self.caso.oficios_pendientes, self.caso.estado
+
+    def test_alta_y_envio_cierran_el_caso(self):
+        primero = Oficio.objects.create(caso=self.caso)
+        segundo = Oficio.objects.create(caso=self.caso)
+        self.assertEqual(self._refrescar(), (2, 2, 'EN_PROCESO'))
+
+        primero.estado = 'enviado'
+        primero.save()
+        self.assertEqual(self._refrescar(), (2, 1, 'EN_PROCESO'))
+
+        segundo.estado = 'enviado'
+        segundo.save(update_fields=['estado'])
+        self.assertEqual(self._refrescar(), (2, 0, 'CERRADO'))
+
+        segundo.estado = 'devuelto'
+        segundo.save()
+        self.assertEqual(self._refrescar(), (2, 1, 'EN_PROCESO'))
+
+    def test_mover_y_borrar_oficio(self):
+        otro = Caso.objects.create(usuario=self.user)
+        oficio = Oficio.objects.create(caso=self.caso)
+        oficio.caso = otro
+        oficio.save(update_fields=['caso'])
+        self.assertEqual(self._refrescar()[:2], (0, 0))
+        otro.refresh_from_db()
+        self.assertEqual((otro.total_oficios, otro.oficios_pendientes), (1, 1))
+
+        oficio.delete()
+        otro.refresh_from_db()
+        self.assertEqual((otro.total_oficios, otro.oficios_pendientes), (0, 0))
+
+    def test_editar_el_caso_conserva_deltas_concurrentes(self):
+        caso = Caso.objects.get(pk=self.caso.pk)
+        # Otro proceso da de alta un oficio despues de que se leyo el caso
+        Caso.ajustar_contadores(self.caso.pk, total=1, pendientes=1)
+        caso.expte = 'exp-9'
+        caso.save()
+        self.assertEqual(self._refrescar(), (1, 1, self.caso.estado))
+        self.assertEqual(self.caso.expte, 'EXP-9')
+
+    def test_comando_verifica_y_reconstruye(self):
+        Oficio.objects.create(caso=self.caso)
+        Caso.objects.filter(pk=self.caso.pk).update(total_oficios=5, oficios_pendientes=0)
+        with self.assertRaises(CommandError):
+            call_command('recalcular_contadores_casos', '--solo-verificar', stdout=StringIO())
+        call_command('recalcular_contadores_casos', stdout=StringIO())
+        self.assertEqual(self._refrescar()[:2], (1, 1))
+        call_command('recalcular_contadores_casos', '--solo-verificar', stdout=StringIO())
+
+
+class BusquedaCasosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.caso = Caso.objects.create(usuario=cls.user, expte='EXP-100')
+        cls.otro = Caso.objects.create(usuario=cls.user, expte='EXP-1001')
+        cls.nino = Nino.objects.create(nombre='José', apellido='Gómez', dni='40111222')
+        cls.parte = Parte.objects.create(nombre='Ana', apellido='Pérez', dni='20333444')
+        CasoNino.objects.create(caso=cls.caso, nino=cls.nino)
+        CasoParte.objects.create(caso=cls.caso, parte=cls.parte, tipo_relacion='Madre')
+
+    def _buscar(self, valor):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('casos:list'), {'busqueda': valor})
+        self.consultas_caso = [q['sql'] for q in ctx.captured_queries if 'FROM "casos_caso"' in q['sql']]
+        return list(response.context['casos'])
+
+    def test_busca_por_personas_vinculadas_sin_joins(self):
+        self.assertEqual(self._buscar('gomez jose'), [self.caso])
+        self.assertEqual(self._buscar('2033'), [self.caso])
+        self.assertFalse(any('casos_casonino' in sql or 'DISTINCT' in sql for sql in self.consultas_caso))
+
+    def test_relevancia_por_expediente(self):
+        self.assertEqual(self._buscar('exp-100'), [self.caso, self.otro])
 
-# Create your tests here.
+    def test_cambios_en_personas_y_vinculos_actualizan_el_documento(self):
+        self.nino.apellido = 'Fernández'
+        self.nino.save()
+        self.assertEqual(self._buscar('fernandez'), [self.caso])
+        self.assertEqual(self._buscar('gomez'), [])
+        CasoParte.objects.get(caso=self.caso, parte=self.parte).delete()
+        self.assertEqual(self._buscar('perez'), [])
+        CasoNino.objects.create(caso=self.otro, nino=self.nino)
+        # Misma relevancia: primero el caso mas reciente
+        self.assertEqual(self._buscar('fernandez'), [self.otro, self.caso])
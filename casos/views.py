@@ -5,16 +5,18 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.db import transaction
 from django.db.models import Q
-import unicodedata
 
+from core import roles
+from core.paginacion import PaginacionCursorMixin
 from .models import Caso, CasoNino, CasoParte
 from .forms import CasoForm, CasoNinoFormSet, CasoParteFormSet
 
-class CasoListView(LoginRequiredMixin, ListView):
+class CasoListView(LoginRequiredMixin, PaginacionCursorMixin, ListView):
     model = Caso
     template_name = 'casos/caso_list.html'
     context_object_name = 'casos'
     paginate_by = 10
+    estimar_total = True
     
     def get_queryset(self):
         from .filters import CasoFilter
@@ -27,8 +29,8 @@ class CasoListView(LoginRequiredMixin, ListView):
         # Aplicar filtros
         self.filterset = CasoFilter(self.request.GET, queryset=queryset)
         
-        # Ordenar por defecto por fecha de creación descendente
-        return self.filterset.qs.order_by('-creado')
+        # Ordenar por defecto por fecha de creación descendente (por relevancia si hay búsqueda)
+        return self.filterset.ordenar(self.filterset.qs.select_related('usuario'))
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -51,12 +53,7 @@ class CasoCreateView(LoginRequiredMixin, CreateView):
     template_name = 'casos/caso_form.html'
 
     def dispatch(self, request, *args, **kwargs):
-        perfil = getattr(request.user, 'perfil', None)
-        raw_nombre = getattr(getattr(perfil, 'id_sector', None), 'nombre', '') or ''
-        # Normalizar eliminando acentos y a minúsculas para comparar de forma robusta
-        norm = unicodedata.normalize('NFKD', raw_nombre)
-        sector_nombre = ''.join(c for c in norm if not unicodedata.combining(c)).lower()
-        if 'coordinacion opd' in sector_nombre:
+        if roles.tiene_rol(request.user, roles.COORDINACION_OPD):
             messages.error(request, 'No tiene permisos para crear casos.')
             return redirect('casos:list')
         return super().dispatch(request, *args, **kwargs)
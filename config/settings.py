@@ -48,6 +48,36 @@ DATABASES = {
     }
 }
 
+# Cache compartido entre procesos: las versiones de core.versiones (y los snapshots
+# del tablero, la pagina de inicio, el autocompletado y los ETag de la API) tienen
+# que ser las mismas en todos los workers de gunicorn y en los comandos de
+# manage.py. CACHE_URL=redis://... usa Redis; CACHE_URL=db usa la tabla
+# `cache_compartido` de la base (crearla con `python manage.py createcachetable`).
+# Sin CACHE_URL queda el cache en memoria de cada proceso: las invalidaciones no
+# salen del proceso que las hace (sirve para desarrollo y tests con un solo proceso).
+CACHE_URL = os.getenv('CACHE_URL', '')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+elif CACHE_URL == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'cache_compartido',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # Configuración de correo electrónico
 EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST', '')
@@ -103,6 +133,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.RolesMiddleware',
     'simple_history.middleware.HistoryRequestMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
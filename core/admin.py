@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from simple_history.admin import SimpleHistoryAdmin
-from .models import Sector, UsuarioPerfil
+from .models import ContadorCodigo, Feriado, Sector, UsuarioPerfil
 
 
 @admin.register(Sector)
@@ -23,6 +23,22 @@ class UsuarioPerfilAdmin(SimpleHistoryAdmin):
     list_filter = ('es_profesional', 'id_sector', 'id_institucion')
 
 
+@admin.register(ContadorCodigo)
+class ContadorCodigoAdmin(admin.ModelAdmin):
+    list_display = ('prefijo', 'anio', 'ultimo')
+    list_filter = ('prefijo',)
+    ordering = ('prefijo', '-anio')
+
+
+@admin.register(Feriado)
+class FeriadoAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'descripcion', 'habil')
+    list_filter = ('habil',)
+    search_fields = ('descripcion',)
+    date_hierarchy = 'fecha'
+    ordering = ('-fecha',)
+
+
 class UsuarioPerfilInline(admin.StackedInline):
     model = UsuarioPerfil
     can_delete = False
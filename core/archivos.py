@@ -0,0 +1,250 @@
+"""
+Almacenamiento de archivos por contenido.
+
+Cada archivo se guarda una sola vez en `contenido/<sha[:2]>/<sha>.pdf`, con el
+SHA-256 calculado por bloques mientras se lee la subida (sin cargarla entera en
+memoria). Si el mismo PDF se sube de nuevo (por ejemplo, el mismo oficio enviado a
+varias instituciones) se reutiliza el blob existente. La tabla `core.Archivo`
+lleva las referencias de cada blob; los modelos que usan ArchivoContenidoField
+las ajustan al guardar y borrar con ReferenciasArchivoMixin, y el comando
+`limpiar_archivos` recuenta desde las columnas y borra los blobs huerfanos.
+
+Cada blob nuevo queda encolado para extraer paginas, texto y miniatura en
+segundo plano (core/pdf.py).
+
+Funciona con cualquier `Storage` de Django: solo usa exists/save/delete.
+Los archivos subidos antes de este esquema conservan su ruta original.
+"""
+import hashlib
+from collections import Counter
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.db import connection, models, transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.utils import timezone
+
+from core import pdf
+
+
+CARPETA = 'contenido'
+
+# Columnas con nombres de archivo que no son ArchivoContenidoField y tambien
+# mantienen vivo un blob: (modelo, campo, filtro)
+REFERENCIAS_EXTERNAS = (
+    # Adjuntos de correos que todavia no se enviaron
+    ('oficios.CorreoSaliente', 'adjunto', {'estado': 'pendiente'}),
+)
+
+
+def es_contenido(nombre):
+    """True si `nombre` es un blob guardado por contenido."""
+    return bool(nombre) and nombre.startswith(f'{CARPETA}/')
+
+
+def _resumen(archivo):
+    """(sha256, tamaño) leyendo `archivo` por bloques; lo deja al comienzo."""
+    digest = hashlib.sha256()
+    tamanio = 0
+    archivo.seek(0)
+    for chunk in archivo.chunks():
+        digest.update(chunk)
+        tamanio += len(chunk)
+    archivo.seek(0)
+    return digest.hexdigest(), tamanio
+
+
+def guardar(archivo, storage=None):
+    """
+    Guarda `archivo` por su contenido y devuelve el nombre en el storage. No
+    suma referencias: eso lo hace quien guarda el registro que lo usa.
+    """
+    from core.models import Archivo
+
+    storage = storage or default_storage
+    sha, tamanio = _resumen(archivo)
+    nombre = f'{CARPETA}/{sha[:2]}/{sha}.pdf'
+    # Alta o "ultimo uso" en una sola sentencia: la limpieza no toca un blob recien
+    # subido. Si `limpiar` tiene la fila bloqueada, el upsert espera a que termine de
+    # borrar fila y blob, y entonces inserta de nuevo y el blob se vuelve a escribir.
+    registro, = Archivo.objects.bulk_create(
+        [Archivo(sha256=sha, nombre=nombre, tamanio=tamanio)],
+        update_conflicts=True,
+        unique_fields=['sha256'],
+        update_fields=['ultimo_uso'],
+    )
+    pdf.encolar(registro.pk)
+    if not storage.exists(nombre):
+        guardado = storage.save(nombre, archivo)
+        if guardado != nombre:
+            # Otro proceso escribio el mismo contenido entre exists() y save()
+            storage.delete(guardado)
+    return nombre
+
+
+def ajustar_referencias(deltas):
+    """Aplica {nombre: delta} a Archivo.referencias en un solo UPDATE."""
+    from core.models import Archivo
+
+    deltas = {nombre: delta for nombre, delta in deltas.items() if delta and es_contenido(nombre)}
+    if not deltas:
+        return
+    Archivo.objects.filter(nombre__in=deltas).update(referencias=F('referencias') + Case(
+        *(When(nombre=nombre, then=Value(delta)) for nombre, delta in deltas.items()),
+        default=Value(0),
+        output_field=IntegerField(),
+    ))
+
+
+class ArchivoContenidoField(models.FileField):
+    """
+    FileField que guarda la subida con core.archivos.guardar en lugar de
+    `upload_to`: el nombre resultante depende solo del contenido.
+    """
+
+    def pre_save(self, model_instance, add):
+        archivo = getattr(model_instance, self.attname)
+        if archivo and not archivo._committed:
+            archivo.name = guardar(archivo.file, self.storage)
+            archivo._committed = True
+        return archivo
+
+
+def campos_contenido(modelo):
+    return [f for f in modelo._meta.concrete_fields if isinstance(f, ArchivoContenidoField)]
+
+
+class ReferenciasArchivoMixin:
+    """
+    Mantiene Archivo.referencias de los ArchivoContenidoField del modelo: al
+    guardar compara con los nombres cargados de la base y al borrar descuenta.
+    Los borrados en cascada y las operaciones en bloque no pasan por aca; los
+    corrige el recuento de `limpiar_archivos`.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        campos = {f.attname for f in campos_contenido(cls)}
+        instance._archivos_cargados = {
+            campo: valor or '' for campo, valor in zip(field_names, values) if campo in campos
+        }
+        return instance
+
+    def _nombres_archivos(self, campos):
+        return {campo: getattr(self, campo).name or '' for campo in campos}
+
+    def save(self, *args, **kwargs):
+        campos = [f.attname for f in campos_contenido(type(self))]
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            campos = [campo for campo in campos if campo in set(update_fields)]
+        campos = [campo for campo in campos if campo not in self.get_deferred_fields()]
+        cargados = self.__dict__.get('_archivos_cargados')
+        if self._state.adding:
+            anteriores = {}
+        elif cargados is not None and all(campo in cargados for campo in campos):
+            anteriores = cargados
+        else:
+            anteriores = (
+                type(self)._default_manager.filter(pk=self.pk).values(*campos).first() or {}
+            ) if campos else {}
+        super().save(*args, **kwargs)
+
+        nuevos = self._nombres_archivos(campos)
+        deltas = Counter()
+        for campo, nombre in nuevos.items():
+            anterior = anteriores.get(campo) or ''
+            if anterior != nombre:
+                deltas[anterior] -= 1
+                deltas[nombre] += 1
+        ajustar_referencias(deltas)
+        self._archivos_cargados = {**(cargados or {}), **nuevos}
+        if deltas:
+            self._archivos_modificados()
+
+    def delete(self, *args, **kwargs):
+        nombres = self._nombres_archivos(
+            f.attname for f in campos_contenido(type(self)) if f.attname not in self.get_deferred_fields()
+        )
+        resultado = super().delete(*args, **kwargs)
+        ajustar_referencias(Counter({nombre: -1 for nombre in nombres.values()}))
+        if any(nombres.values()):
+            self._archivos_modificados()
+        return resultado
+
+    def _archivos_modificados(self):
+        """Se llama despues de guardar o borrar si cambio algun archivo."""
+
+
+def recontar():
+    """
+    Recalcula Archivo.referencias desde las columnas que los usan y devuelve la
+    cantidad de archivos corregidos.
+    """
+    from core.models import Archivo
+
+    reales = Counter()
+    fuentes = [
+        (modelo, campo.attname, {})
+        for modelo in apps.get_models()
+        for campo in campos_contenido(modelo)
+    ] + [
+        (apps.get_model(etiqueta), campo, filtro)
+        for etiqueta, campo, filtro in REFERENCIAS_EXTERNAS
+    ]
+    for modelo, campo, filtro in fuentes:
+        filas = (
+            modelo._default_manager.filter(**filtro, **{f'{campo}__startswith': f'{CARPETA}/'})
+            .order_by()
+            .values(campo)
+            .annotate(total=Count('pk'))
+            .values_list(campo, 'total')
+        )
+        for nombre, total in filas:
+            reales[nombre] += total
+
+    corregidos = []
+    for archivo in Archivo.objects.only('pk', 'nombre', 'referencias').iterator():
+        if archivo.referencias != reales[archivo.nombre]:
+            archivo.referencias = reales[archivo.nombre]
+            corregidos.append(archivo)
+    Archivo.objects.bulk_update(corregidos, ['referencias'], batch_size=500)
+    return len(corregidos)
+
+
+def limpiar(storage=None, margen=timedelta(hours=24)):
+    """
+    Borra los blobs sin referencias que no se subieron en el ultimo `margen`
+    (una subida en curso todavia no sumo su referencia). Devuelve
+    (archivos borrados, bytes liberados). Tambien borra la miniatura del blob.
+    """
+    from core.models import Archivo
+
+    storage = storage or default_storage
+    limite = timezone.now() - margen
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    borrados = liberados = 0
+    candidatos = Archivo.objects.filter(referencias__lte=0, ultimo_uso__lt=limite)
+    filas = candidatos.values_list('pk', 'nombre', 'tamanio', 'contenido_pdf__miniatura')
+    for pk, nombre, tamanio, miniatura in filas.iterator():
+        # Fila y blob se borran con la fila bloqueada: un `guardar` del mismo
+        # contenido espera en su upsert y despues vuelve a escribir el blob. Se
+        # vuelve a comprobar al bloquear (pudo volver a usarse) y se saltea la fila
+        # si otro proceso la tiene tomada.
+        with transaction.atomic():
+            bloqueada = (
+                Archivo.objects.select_for_update(skip_locked=skip_locked)
+                .filter(pk=pk, referencias__lte=0, ultimo_uso__lt=limite)
+                .values_list('pk', flat=True)
+            )
+            if not list(bloqueada):
+                continue
+            storage.delete(nombre)
+            if miniatura:
+                storage.delete(miniatura)
+            Archivo.objects.filter(pk=pk).delete()
+        borrados += 1
+        liberados += tamanio
+    return borrados, liberados
@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from django.contrib.auth.backends import ModelBackend
 
 
@@ -20,3 +21,11 @@ class NoProfesionalesBackend(ModelBackend):
             pass
         return True
 
+    def get_user(self, user_id):
+        # Usuario, perfil y sector en una consulta por request (ver core.roles)
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related('perfil__id_sector').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,37 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.views import View
+
+from core.paginacion import CursorPaginator, PARAMETRO
+
+
+# Opciones por pedido; select2 pide las que siguen al llegar al final de la lista
+LIMITE = 20
+
+
+class AutocompletarView(LoginRequiredMixin, View):
+    """
+    Endpoint para los widgets de core.widgets: filtra `model` por `campo`
+    (icontains), ordena por ese campo y devuelve a lo sumo LIMITE opciones con el
+    cursor de las siguientes: {"resultados": [{"id", "texto"}], "siguiente"}.
+    """
+    raise_exception = True
+    model = None
+    campo = 'nombre'
+
+    def get_queryset(self):
+        return self.model._default_manager.only('pk', self.campo).order_by(self.campo)
+
+    def texto(self, obj):
+        return str(obj)
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        search = request.GET.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(**{f'{self.campo}__icontains': search})
+        pagina = CursorPaginator(queryset, LIMITE).page(request.GET.get(PARAMETRO))
+        return JsonResponse({
+            'resultados': [{'id': obj.pk, 'texto': self.texto(obj)} for obj in pagina.object_list],
+            'siguiente': pagina.cursor_siguiente,
+        })
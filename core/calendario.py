@@ -0,0 +1,217 @@
+from array import array
+from datetime import date, datetime, timedelta
+
+from django.utils import timezone
+
+from core import versiones
+
+
+# Rango inicial del indice; se extiende si se consulta una fecha fuera de el
+ANIO_INICIAL = 2015
+ANIOS_ADELANTE = 10
+
+# Feriados nacionales inamovibles (Ley 27.399): (mes, dia, descripcion)
+FERIADOS_FIJOS = (
+    (1, 1, 'Año Nuevo'),
+    (3, 24, 'Día Nacional de la Memoria por la Verdad y la Justicia'),
+    (4, 2, 'Día del Veterano y de los Caídos en la Guerra de Malvinas'),
+    (5, 1, 'Día del Trabajador'),
+    (5, 25, 'Día de la Revolución de Mayo'),
+    (6, 20, 'Paso a la Inmortalidad del Gral. Manuel Belgrano'),
+    (7, 9, 'Día de la Independencia'),
+    (12, 8, 'Inmaculada Concepción de María'),
+    (12, 25, 'Navidad'),
+)
+
+# Feriados trasladables: martes y miercoles pasan al lunes anterior, jueves y
+# viernes al lunes siguiente. Los traslados por decreto y los dias puente se
+# cargan como Feriado desde el admin.
+FERIADOS_TRASLADABLES = (
+    (6, 17, 'Paso a la Inmortalidad del Gral. Martín Miguel de Güemes'),
+    (8, 17, 'Paso a la Inmortalidad del Gral. José de San Martín'),
+    (10, 12, 'Día del Respeto a la Diversidad Cultural'),
+    (11, 20, 'Día de la Soberanía Nacional'),
+)
+
+
+def _pascua(anio):
+    """Domingo de Pascua (algoritmo de Meeus/Jones/Butcher, calendario gregoriano)."""
+    a = anio % 19
+    b, c = divmod(anio, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(anio, mes, dia + 1)
+
+
+def _trasladar(fecha):
+    dia_semana = fecha.weekday()
+    if dia_semana in (1, 2):
+        return fecha - timedelta(days=dia_semana)
+    if dia_semana in (3, 4):
+        return fecha + timedelta(days=7 - dia_semana)
+    return fecha
+
+
+def feriados_nacionales(anio):
+    """{fecha: descripcion} de los feriados nacionales de ley del año."""
+    feriados = {date(anio, mes, dia): descripcion for mes, dia, descripcion in FERIADOS_FIJOS}
+    for mes, dia, descripcion in FERIADOS_TRASLADABLES:
+        feriados[_trasladar(date(anio, mes, dia))] = descripcion
+    pascua = _pascua(anio)
+    feriados[pascua - timedelta(days=48)] = 'Carnaval'
+    feriados[pascua - timedelta(days=47)] = 'Carnaval'
+    feriados[pascua - timedelta(days=2)] = 'Viernes Santo'
+    return feriados
+
+
+class Calendario:
+    """
+    Indice de dias habiles entre el 1/1 de `desde_anio` y el 31/12 de `hasta_anio`.
+
+    `_acumulados[i]` es la cantidad de dias habiles desde el inicio hasta el dia i
+    (inclusive) y `_habiles` la posicion de cada dia habil: sumar N dias habiles o
+    contar los habiles entre dos fechas son dos accesos al arreglo.
+    """
+
+    def __init__(self, desde_anio, hasta_anio, no_habiles=(), habiles=()):
+        self.desde_anio = desde_anio
+        self.hasta_anio = hasta_anio
+        self.inicio = date(desde_anio, 1, 1).toordinal()
+        self.fin = date(hasta_anio, 12, 31).toordinal()
+
+        no_habiles = set(no_habiles)
+        for anio in range(desde_anio, hasta_anio + 1):
+            no_habiles.update(feriados_nacionales(anio))
+        no_habiles.difference_update(habiles)
+        no_habiles = {fecha.toordinal() for fecha in no_habiles}
+
+        self._acumulados = array('I')
+        self._habiles = array('I')
+        total = 0
+        for posicion, ordinal in enumerate(range(self.inicio, self.fin + 1)):
+            # date.fromordinal(1) es lunes: weekday == (ordinal - 1) % 7
+            if (ordinal - 1) % 7 < 5 and ordinal not in no_habiles:
+                total += 1
+                self._habiles.append(posicion)
+            self._acumulados.append(total)
+
+    def _posicion(self, fecha):
+        return fecha.toordinal() - self.inicio
+
+    def es_habil(self, fecha):
+        posicion = self._posicion(fecha)
+        anterior = self._acumulados[posicion - 1] if posicion else 0
+        return self._acumulados[posicion] > anterior
+
+    def contar(self, desde, hasta):
+        """Dias habiles en (desde, hasta]; negativo si hasta < desde."""
+        return self._acumulados[self._posicion(hasta)] - self._acumulados[self._posicion(desde)]
+
+    def sumar(self, fecha, dias):
+        """El dia habil numero `dias` posterior a `fecha` (la fecha misma si dias <= 0)."""
+        if dias <= 0:
+            return fecha
+        indice = self._acumulados[self._posicion(fecha)] + dias - 1
+        if indice >= len(self._habiles):
+            return None
+        return date.fromordinal(self.inicio + self._habiles[indice])
+
+    def no_habiles(self, desde, hasta):
+        """Fechas no habiles (fines de semana incluidos) entre desde y hasta, inclusive."""
+        return [
+            date.fromordinal(ordinal)
+            for ordinal in range(desde.toordinal(), hasta.toordinal() + 1)
+            if not self.es_habil(date.fromordinal(ordinal))
+        ]
+
+
+_calendario = None
+_version = None
+
+
+def _construir(desde_anio, hasta_anio):
+    from core.models import Feriado
+
+    no_habiles, habiles = [], []
+    for fecha, habil in Feriado.objects.values_list('fecha', 'habil'):
+        (habiles if habil else no_habiles).append(fecha)
+    desde_anio = min([desde_anio] + [fecha.year for fecha in no_habiles + habiles])
+    hasta_anio = max([hasta_anio] + [fecha.year for fecha in no_habiles + habiles])
+    return Calendario(desde_anio, hasta_anio, no_habiles, habiles)
+
+
+def obtener(*fechas):
+    """
+    Calendario vigente que cubre `fechas`. Se arma una vez por proceso y se rehace
+    cuando cambia la version del calendario o se pide una fecha fuera del rango.
+    """
+    global _calendario, _version
+    version = versiones.version_datos(versiones.CALENDARIO)
+    anios = [fecha.year for fecha in fechas]
+    if (
+        _calendario is None
+        or _version != version
+        or any(not _calendario.desde_anio <= anio <= _calendario.hasta_anio for anio in anios)
+    ):
+        desde_anio = min([ANIO_INICIAL] + anios)
+        hasta_anio = max([timezone.localdate().year + ANIOS_ADELANTE] + anios)
+        if _calendario is not None and _version == version:
+            desde_anio = min(desde_anio, _calendario.desde_anio)
+            hasta_anio = max(hasta_anio, _calendario.hasta_anio)
+        _calendario = _construir(desde_anio, hasta_anio)
+        _version = version
+    return _calendario
+
+
+def invalidar():
+    """Descarta el calendario armado (en todos los procesos, via la version)."""
+    global _calendario
+    _calendario = None
+    versiones.invalidar_datos(versiones.CALENDARIO)
+
+
+def _como_fecha(valor):
+    if isinstance(valor, datetime):
+        if timezone.is_aware(valor):
+            valor = timezone.localtime(valor)
+        return valor.date()
+    return valor
+
+
+def sumar_dias_habiles(fecha_base, dias_habiles):
+    """
+    Suma dias habiles (sin fines de semana, feriados ni dias de cierre) a una fecha
+    o fecha/hora; conserva la hora de `fecha_base`.
+    """
+    if dias_habiles <= 0:
+        return fecha_base
+    dia = _como_fecha(fecha_base)
+    calendario = obtener(dia)
+    destino = calendario.sumar(dia, dias_habiles)
+    if destino is None:
+        # Fuera del indice: se extiende lo necesario (un año tiene mas de 200 habiles)
+        calendario = obtener(dia, date(dia.year + dias_habiles // 200 + 1, 12, 31))
+        destino = calendario.sumar(dia, dias_habiles)
+    return fecha_base + timedelta(days=(destino - dia).days)
+
+
+def contar_dias_habiles(desde, hasta):
+    """Dias habiles en (desde, hasta]."""
+    desde, hasta = _como_fecha(desde), _como_fecha(hasta)
+    return obtener(desde, hasta).contar(desde, hasta)
+
+
+def es_habil(fecha):
+    fecha = _como_fecha(fecha)
+    return obtener(fecha).es_habil(fecha)
+
+
+def dias_no_habiles(desde, hasta):
+    desde, hasta = _como_fecha(desde), _como_fecha(hasta)
+    return obtener(desde, hasta).no_habiles(desde, hasta)
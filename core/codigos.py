@@ -0,0 +1,92 @@
+from django.db import IntegrityError, connection, transaction
+
+from .models import ContadorCodigo
+
+
+def formatear_codigo(prefijo, numero, anio):
+    return f"{prefijo}-{numero:05d}-{anio}"
+
+
+def _parsear_codigo(codigo):
+    # PREFIJO-00001-AAAA -> (1, AAAA)
+    try:
+        _, numero, anio = codigo.split('-')
+        return int(numero), int(anio)
+    except (AttributeError, ValueError):
+        return None
+
+
+def ultimo_numero_existente(modelo, prefijo, anio):
+    """
+    Busca el mayor correlativo ya usado en `modelo.codigo` para el prefijo y año.
+    Solo se usa para inicializar un contador (una vez por año).
+    """
+    codigos = (
+        modelo.objects
+        .filter(codigo__startswith=f'{prefijo}-', codigo__endswith=f'-{anio}')
+        .values_list('codigo', flat=True)
+    )
+    maximo = 0
+    for codigo in codigos.iterator():
+        parsed = _parsear_codigo(codigo)
+        if parsed:
+            maximo = max(maximo, parsed[0])
+    return maximo
+
+
+def maximos_por_anio(modelo, prefijo):
+    """Devuelve {anio: mayor correlativo} recorriendo una sola vez los codigos del prefijo."""
+    maximos = {}
+    codigos = modelo.objects.filter(codigo__startswith=f'{prefijo}-').values_list('codigo', flat=True)
+    for codigo in codigos.iterator():
+        parsed = _parsear_codigo(codigo)
+        if parsed:
+            numero, anio = parsed
+            maximos[anio] = max(maximos.get(anio, 0), numero)
+    return maximos
+
+
+def _inicializar_contador(prefijo, anio, modelo):
+    inicial = ultimo_numero_existente(modelo, prefijo, anio) if modelo is not None else 0
+    try:
+        with transaction.atomic():
+            ContadorCodigo.objects.create(prefijo=prefijo, anio=anio, ultimo=inicial)
+    except IntegrityError:
+        # Otro proceso lo creo en paralelo; se usa el existente
+        pass
+
+
+def _incrementar(prefijo, anio, cantidad):
+    # UPDATE ... RETURNING: incrementa y lee el nuevo valor en un solo viaje a la base
+    tabla = connection.ops.quote_name(ContadorCodigo._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {tabla} SET ultimo = ultimo + %s WHERE prefijo = %s AND anio = %s RETURNING ultimo',
+            [cantidad, prefijo, anio],
+        )
+        fila = cursor.fetchone()
+    return fila[0] if fila else None
+
+
+def reservar_numeros(prefijo, anio, cantidad=1, modelo=None):
+    """
+    Reserva `cantidad` correlativos consecutivos para el prefijo y año y devuelve
+    un range con los numeros asignados.
+
+    El UPDATE bloquea la fila del contador hasta el fin de la transaccion, asi que
+    dos workers nunca reciben el mismo numero. Si el contador del año todavia no
+    existe se crea a partir del mayor codigo ya guardado en `modelo`.
+    """
+    if cantidad < 1:
+        return range(0)
+    with transaction.atomic():
+        ultimo = _incrementar(prefijo, anio, cantidad)
+        if ultimo is None:
+            _inicializar_contador(prefijo, anio, modelo)
+            ultimo = _incrementar(prefijo, anio, cantidad)
+    return range(ultimo - cantidad + 1, ultimo + 1)
+
+
+def reservar_codigos(prefijo, anio, cantidad=1, modelo=None):
+    """Igual que reservar_numeros pero devuelve los codigos ya formateados (PREFIJO-00001-AAAA)."""
+    return [formatear_codigo(prefijo, numero, anio) for numero in reservar_numeros(prefijo, anio, cantidad, modelo)]
@@ -0,0 +1,167 @@
+"""
+Descarga autenticada de archivos del storage de medios.
+
+DescargaArchivoView sirve el FileField `campo` de un registro solo a usuarios con
+sesion iniciada. El contenido se envia por bloques (el archivo nunca se carga
+entero en memoria), con soporte de `Range: bytes=` (un rango, 206/416), `ETag`
+y `Last-Modified` para GET condicionales (304). Para los archivos guardados por
+contenido (core.archivos) el ETag es el SHA-256.
+
+Con `DESCARGAS_ENVIO` se delega el envio al servidor web despues de autorizar:
+- 'x-accel' (nginx): `X-Accel-Redirect: DESCARGAS_PREFIJO_INTERNO + nombre`,
+  con una location `internal` que apunte a MEDIA_ROOT;
+- 'x-sendfile' (Apache mod_xsendfile, lighttpd): `X-Sendfile` con la ruta
+  local, solo para storages en disco.
+"""
+import hashlib
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date, quote_etag
+from django.views import View
+
+from core import archivos
+
+
+BLOQUE = 64 * 1024
+_RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangoInvalido(Exception):
+    pass
+
+
+def parsear_rango(cabecera, tamanio):
+    """
+    (inicio, fin) inclusivos para una cabecera `Range` de un solo rango, o None
+    si no hay rango o no se soporta (varios rangos: se envia el archivo entero).
+    RangoInvalido si el rango no se puede satisfacer (416).
+    """
+    coincidencia = _RANGO.match((cabecera or '').strip())
+    if not coincidencia:
+        return None
+    inicio, fin = coincidencia.groups()
+    if not inicio and not fin:
+        return None
+    if not inicio:
+        # Ultimos N bytes
+        largo = int(fin)
+        if not largo:
+            raise RangoInvalido
+        return max(tamanio - largo, 0), tamanio - 1
+    inicio = int(inicio)
+    fin = min(int(fin), tamanio - 1) if fin else tamanio - 1
+    if inicio >= tamanio or fin < inicio:
+        raise RangoInvalido
+    return inicio, fin
+
+
+def _bloques(archivo, inicio, largo):
+    try:
+        archivo.seek(inicio)
+        while largo > 0:
+            bloque = archivo.read(min(BLOQUE, largo))
+            if not bloque:
+                break
+            largo -= len(bloque)
+            yield bloque
+    finally:
+        archivo.close()
+
+
+class DescargaArchivoView(LoginRequiredMixin, View):
+    model = None
+    campo = None
+    content_type = 'application/pdf'
+
+    def get_queryset(self):
+        return self.model._default_manager.only('pk', self.campo)
+
+    def archivo_de(self, obj):
+        """(storage, nombre) del archivo a servir; Http404 si no hay."""
+        archivo = getattr(obj, self.campo)
+        if not archivo:
+            raise Http404('El registro no tiene archivo.')
+        return archivo.storage, archivo.name
+
+    def nombre_descarga(self, obj, nombre):
+        return os.path.basename(nombre)
+
+    def _etag(self, nombre, tamanio, modificado):
+        if archivos.es_contenido(nombre):
+            return quote_etag(os.path.splitext(os.path.basename(nombre))[0])
+        base = f'{nombre}|{tamanio}|{modificado}'
+        return quote_etag(hashlib.md5(base.encode('utf-8')).hexdigest())
+
+    def _cabeceras(self, respuesta, etag, modificado):
+        respuesta['ETag'] = etag
+        if modificado is not None:
+            respuesta['Last-Modified'] = http_date(modificado)
+        respuesta['Accept-Ranges'] = 'bytes'
+        patch_cache_control(respuesta, private=True, no_cache=True)
+        return respuesta
+
+    def _delegar(self, envio, storage, nombre):
+        respuesta = HttpResponse(content_type=self.content_type)
+        if envio == 'x-accel':
+            prefijo = getattr(settings, 'DESCARGAS_PREFIJO_INTERNO', '/protegido/')
+            respuesta['X-Accel-Redirect'] = quote(prefijo.rstrip('/') + '/' + nombre)
+        else:
+            respuesta['X-Sendfile'] = storage.path(nombre)
+        return respuesta
+
+    def get(self, request, pk):
+        obj = get_object_or_404(self.get_queryset(), pk=pk)
+        storage, nombre = self.archivo_de(obj)
+        try:
+            tamanio = storage.size(nombre)
+        except (FileNotFoundError, OSError):
+            raise Http404('El archivo ya no está disponible.')
+        try:
+            # Segundos enteros, como los compara If-Modified-Since
+            modificado = int(storage.get_modified_time(nombre).timestamp())
+        except (NotImplementedError, OSError):
+            modificado = None
+
+        etag = self._etag(nombre, tamanio, modificado)
+        respuesta = get_conditional_response(request, etag=etag, last_modified=modificado)
+        if respuesta is not None:
+            return self._cabeceras(respuesta, etag, modificado)
+
+        nombre_descarga = self.nombre_descarga(obj, nombre)
+        envio = getattr(settings, 'DESCARGAS_ENVIO', None)
+        if envio:
+            # El servidor web resuelve Range y condicionales por su cuenta
+            respuesta = self._delegar(envio, storage, nombre)
+            respuesta['Content-Disposition'] = content_disposition_header(False, nombre_descarga)
+            return self._cabeceras(respuesta, etag, modificado)
+
+        rango = None
+        # If-Range: solo se respeta el rango si el cliente tiene esta version
+        if request.headers.get('If-Range', etag) == etag:
+            try:
+                rango = parsear_rango(request.headers.get('Range'), tamanio)
+            except RangoInvalido:
+                respuesta = HttpResponse(status=416)
+                respuesta['Content-Range'] = f'bytes */{tamanio}'
+                return self._cabeceras(respuesta, etag, modificado)
+
+        contenido = storage.open(nombre, 'rb')
+        if rango is None:
+            respuesta = FileResponse(contenido, content_type=self.content_type, filename=nombre_descarga)
+            respuesta.block_size = BLOQUE
+        else:
+            inicio, fin = rango
+            respuesta = StreamingHttpResponse(
+                _bloques(contenido, inicio, fin - inicio + 1), status=206, content_type=self.content_type,
+            )
+            respuesta['Content-Range'] = f'bytes {inicio}-{fin}/{tamanio}'
+            respuesta['Content-Length'] = str(fin - inicio + 1)
+            respuesta['Content-Disposition'] = content_disposition_header(False, nombre_descarga)
+        return self._cabeceras(respuesta, etag, modificado)
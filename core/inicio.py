@@ -0,0 +1,109 @@
+"""
+Paneles de la pagina de inicio segun el rol del usuario.
+
+Cada rol tiene sus paneles (ultimos oficios creados que cumplen una condicion).
+Todos los paneles del rol se leen en una sola consulta: `id IN (ultimos POR_PANEL
+del panel)` por cada uno, unidos con OR, y un CASE que etiqueta cada fila con su
+panel, solo con las columnas que muestra la plantilla. Cada subconsulta recorre
+POR_PANEL entradas de `oficio_estado_creado_idx` u `oficio_respondido_panel_idx`;
+numerar con ROW_NUMBER() OVER (PARTITION BY panel) obligaria a leer todos los
+oficios de cada panel (p. ej. todos los enviados). El resultado se cachea por rol
+con la version `oficios` en la clave, asi cualquier cambio de estado o validacion
+de un oficio lo deja obsoleto.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, CharField, Q, Subquery, Value, When
+
+from core import roles, versiones
+
+
+POR_PANEL = 8
+CACHE_SEGUNDOS = 60
+
+_ENVIADOS = ('ultimos_enviados', Q(estado='enviado'))
+_PARA_DIRECTOR = Q(estado='respondido', validado_coord=True, validado_director=False)
+
+# Paneles por rol, en orden de prioridad: un usuario ve los del primer rol que tiene.
+# Las condiciones de un mismo rol no se superponen.
+PANELES = (
+    (roles.COORDINACION_OPD, 'is_coordinacion_opd', (
+        ('ultimos_cargados', Q(estado='cargado')),
+        ('ultimos_asignados', Q(estado='asignado')),
+        ('ultimos_devueltos', Q(estado='devuelto')),
+        ('ultimos_incompetencia', Q(estado='incompetencia')),
+    )),
+    (roles.DESPACHO_NINEZ, 'is_despacho_ninez', (
+        # Respondidos con las dos validaciones, listos para enviar
+        ('ultimos_asignados', Q(estado='respondido', validado_coord=True, validado_director=True)),
+        _ENVIADOS,
+    )),
+    (roles.DIRECTOR_NINEZ, 'is_director_ninez', (
+        ('ultimos_respondidos_un_check', _PARA_DIRECTOR),
+        _ENVIADOS,
+    )),
+    (roles.COORDINADOR, 'is_coordinador', (
+        ('ultimos_respondidos_sin_check', Q(estado='respondido', validado_coord=False, validado_director=False)),
+        ('ultimos_respondidos_para_director', _PARA_DIRECTOR),
+    )),
+)
+
+NOMBRES_PANELES = sorted({nombre for _, _, paneles in PANELES for nombre, _ in paneles})
+
+
+def _segundos():
+    return getattr(settings, 'INICIO_CACHE_SEGUNDOS', CACHE_SEGUNDOS)
+
+
+def _leer_paneles(paneles):
+    """{panel: [oficio]} con los ultimos POR_PANEL oficios de cada panel."""
+    from oficios.models import Oficio
+
+    filtro = Q()
+    for _, condicion in paneles:
+        ultimos = Oficio.objects.filter(condicion).order_by('-creado', '-id').values('pk')[:POR_PANEL]
+        filtro |= Q(pk__in=Subquery(ultimos))
+    filas = (
+        Oficio.objects.filter(filtro)
+        .annotate(panel=Case(
+            *(When(condicion, then=Value(nombre)) for nombre, condicion in paneles),
+            output_field=CharField(),
+        ))
+        .order_by('-creado', '-id')
+        .values('panel', 'id', 'caratula_oficio', 'creado', 'caso_id', 'caso__expte', 'institucion__nombre')
+    )
+    resultado = {nombre: [] for nombre, _ in paneles}
+    for fila in filas:
+        # Misma forma que un Oficio para la plantilla (oficio.caso.expte, ...)
+        resultado[fila['panel']].append({
+            'pk': fila['id'],
+            'caratula_oficio': fila['caratula_oficio'],
+            'creado': fila['creado'],
+            'caso': {'pk': fila['caso_id'], 'expte': fila['caso__expte']} if fila['caso_id'] else None,
+            'institucion': {'nombre': fila['institucion__nombre']} if fila['institucion__nombre'] else None,
+        })
+    return resultado
+
+
+def paneles_de(mascara):
+    """
+    Contexto de la plantilla de inicio para una mascara de core.roles: la marca
+    del rol (is_coordinacion_opd, ...) y una lista por panel, vacia si el rol no
+    lo muestra.
+    """
+    contexto = {marca: False for _, marca, _ in PANELES}
+    contexto.update({nombre: [] for nombre in NOMBRES_PANELES})
+    for rol, marca, paneles in PANELES:
+        if mascara & rol:
+            break
+    else:
+        return contexto
+
+    contexto[marca] = True
+    clave = f'inicio:{versiones.version_datos(versiones.OFICIOS)}:{rol}'
+    datos = cache.get(clave)
+    if datos is None:
+        datos = _leer_paneles(paneles)
+        cache.set(clave, datos, _segundos())
+    contexto.update(datos)
+    return contexto
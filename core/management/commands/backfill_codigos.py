@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from casos.models import Caso
+from core.codigos import maximos_por_anio, reservar_codigos
+from core.models import ContadorCodigo
+from oficios.models import Oficio
+
+
+def _anio_local(fecha):
+    if fecha is None:
+        return timezone.localdate().year
+    if timezone.is_aware(fecha):
+        fecha = timezone.localtime(fecha)
+    return fecha.year
+
+
+# (prefijo, modelo, campo de fecha que define el año del codigo)
+SECUENCIAS = [
+    ('OF', Oficio, 'fecha_emision'),
+    ('CS', Caso, 'creado'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Inicializa los contadores de codigos (OF/CS por año) a partir de los codigos '
+        'existentes y, opcionalmente, asigna codigo a los registros que no lo tienen.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--asignar-faltantes',
+            action='store_true',
+            help='Genera codigo para oficios y casos con codigo vacio.',
+        )
+
+    def handle(self, *args, **options):
+        for prefijo, modelo, campo_fecha in SECUENCIAS:
+            with transaction.atomic():
+                self._sincronizar_contadores(prefijo, modelo)
+                if options['asignar_faltantes']:
+                    self._asignar_faltantes(prefijo, modelo, campo_fecha)
+
+    def _sincronizar_contadores(self, prefijo, modelo):
+        for anio, maximo in sorted(maximos_por_anio(modelo, prefijo).items()):
+            contador, _ = ContadorCodigo.objects.select_for_update().get_or_create(
+                prefijo=prefijo, anio=anio
+            )
+            if contador.ultimo < maximo:
+                contador.ultimo = maximo
+                contador.save(update_fields=['ultimo'])
+            self.stdout.write(f'{prefijo}-{anio}: ultimo={contador.ultimo}')
+
+    def _asignar_faltantes(self, prefijo, modelo, campo_fecha):
+        por_anio = defaultdict(list)
+        faltantes = modelo.objects.filter(codigo__isnull=True).order_by('pk').only('pk', campo_fecha)
+        for obj in faltantes.iterator():
+            por_anio[_anio_local(getattr(obj, campo_fecha))].append(obj)
+
+        for anio, objs in sorted(por_anio.items()):
+            codigos = reservar_codigos(prefijo, anio, cantidad=len(objs), modelo=modelo)
+            for obj, codigo in zip(objs, codigos):
+                obj.codigo = codigo
+            # bulk_update evita save(): no dispara historial ni recalculos del modelo
+            modelo.objects.bulk_update(objs, ['codigo'], batch_size=500)
+            self.stdout.write(f'{prefijo}-{anio}: {len(objs)} codigos asignados')
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from core import archivos
+
+
+class Command(BaseCommand):
+    help = (
+        'Recuenta las referencias de los archivos guardados por contenido (core.archivos) '
+        'y borra del storage los que quedaron sin uso.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--margen-horas',
+            type=float,
+            default=24,
+            help='No borra archivos subidos en las ultimas N horas (subidas en curso).',
+        )
+        parser.add_argument(
+            '--solo-recontar',
+            action='store_true',
+            help='Corrige las referencias sin borrar archivos.',
+        )
+
+    def handle(self, *args, **options):
+        corregidos = archivos.recontar()
+        self.stdout.write(f'{corregidos} archivos con referencias corregidas.')
+        if options['solo_recontar']:
+            return
+        borrados, liberados = archivos.limpiar(margen=timedelta(hours=options['margen_horas']))
+        self.stdout.write(self.style.SUCCESS(
+            f'{borrados} archivos sin referencias borrados ({liberados / 1024 / 1024:.1f} MB).'
+        ))
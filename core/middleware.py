@@ -0,0 +1,16 @@
+from core import roles
+
+
+class RolesMiddleware:
+    """
+    Deja en `request.roles` la mascara de core.roles del usuario. Perfil y sector
+    quedan cargados en request.user, asi las vistas y plantillas que leen
+    user.perfil.id_sector no vuelven a consultar.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.roles = roles.roles_de(getattr(request, 'user', None))
+        return self.get_response(request)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_historicaluser'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorCodigo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefijo', models.CharField(max_length=10, verbose_name='Prefijo')),
+                ('anio', models.PositiveIntegerField(verbose_name='Año')),
+                ('ultimo', models.PositiveIntegerField(default=0, verbose_name='Último número asignado')),
+            ],
+            options={
+                'verbose_name': 'Contador de código',
+                'verbose_name_plural': 'Contadores de código',
+                'ordering': ['prefijo', '-anio'],
+                'unique_together': {('prefijo', 'anio')},
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_contadorcodigo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Feriado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(unique=True, verbose_name='Fecha')),
+                ('descripcion', models.CharField(blank=True, max_length=150, verbose_name='Descripción')),
+                ('habil', models.BooleanField(default=False, help_text='Marcar para que el día cuente como hábil aunque sea feriado nacional.', verbose_name='Es hábil')),
+            ],
+            options={
+                'verbose_name': 'Feriado o día de cierre',
+                'verbose_name_plural': 'Feriados y días de cierre',
+                'ordering': ['-fecha'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:58
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_feriado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Archivo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('nombre', models.CharField(max_length=255, unique=True, verbose_name='Nombre en el storage')),
+                ('tamanio', models.PositiveBigIntegerField(default=0, verbose_name='Tamaño (bytes)')),
+                ('referencias', models.IntegerField(default=0, verbose_name='Referencias')),
+                ('creado', models.DateTimeField(auto_now_add=True, verbose_name='Creado')),
+                ('ultimo_uso', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Último uso')),
+            ],
+            options={
+                'verbose_name': 'Archivo',
+                'verbose_name_plural': 'Archivos',
+                'indexes': [models.Index(condition=models.Q(('referencias__lte', 0)), fields=['ultimo_uso'], name='archivo_sin_referencias_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def encolar_existentes(apps, schema_editor):
+    # Los blobs subidos antes de este esquema tambien se procesan
+    Archivo = apps.get_model('core', 'Archivo')
+    ContenidoPDF = apps.get_model('core', 'ContenidoPDF')
+    ids = Archivo.objects.order_by('pk').values_list('pk', flat=True)
+    ContenidoPDF.objects.bulk_create(
+        [ContenidoPDF(archivo_id=archivo_id) for archivo_id in ids.iterator(chunk_size=1000)],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_archivo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContenidoPDF',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('listo', 'Listo'), ('error', 'Error')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('paginas', models.PositiveIntegerField(blank=True, null=True, verbose_name='Páginas')),
+                ('texto', models.TextField(blank=True, verbose_name='Texto')),
+                ('miniatura', models.CharField(blank=True, max_length=255, verbose_name='Miniatura')),
+                ('intentos', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próximo intento')),
+                ('ultimo_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('procesado', models.DateTimeField(blank=True, null=True, verbose_name='Procesado')),
+                ('archivo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='contenido_pdf', to='core.archivo', verbose_name='Archivo')),
+            ],
+            options={
+                'verbose_name': 'Contenido de PDF',
+                'verbose_name_plural': 'Contenidos de PDF',
+                'indexes': [models.Index(condition=models.Q(('estado', 'pendiente')), fields=['proximo_intento'], name='contenido_pdf_pendiente_idx')],
+            },
+        ),
+        migrations.RunPython(encolar_existentes, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,13 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from simple_history import register
 from simple_history.models import HistoricalRecords
 
+from core import versiones
+
 
 class Sector(models.Model):
     nombre = models.CharField(max_length=150, verbose_name='Nombre')
@@ -18,6 +22,16 @@ class Sector(models.Model):
     def __str__(self):
         return self.nombre
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Los roles se deducen del nombre (core.roles)
+        versiones.invalidar_datos(versiones.SECTORES)
+
+    def delete(self, *args, **kwargs):
+        resultado = super().delete(*args, **kwargs)
+        versiones.invalidar_datos(versiones.SECTORES)
+        return resultado
+
 
 class UsuarioPerfil(models.Model):
     usuario = models.OneToOneField(
@@ -56,8 +70,150 @@ class UsuarioPerfil(models.Model):
         return f"Perfil de {self.usuario.username}"
 
 
+class ContadorCodigo(models.Model):
+    """
+    Ultimo numero correlativo asignado por prefijo y año (por ejemplo OF/2025).
+    Se incrementa de forma atomica desde core.codigos.reservar_codigos.
+    """
+    prefijo = models.CharField(max_length=10, verbose_name='Prefijo')
+    anio = models.PositiveIntegerField(verbose_name='Año')
+    ultimo = models.PositiveIntegerField(default=0, verbose_name='Último número asignado')
+
+    class Meta:
+        verbose_name = 'Contador de código'
+        verbose_name_plural = 'Contadores de código'
+        unique_together = ('prefijo', 'anio')
+        ordering = ['prefijo', '-anio']
+
+    def __str__(self):
+        return f"{self.prefijo}-{self.anio}: {self.ultimo}"
+
+
+class Feriado(models.Model):
+    """
+    Dia no habil cargado a mano (feriado puente, traslado por decreto, cierre de
+    la oficina), o dia habil que el calendario nacional calculado marca como
+    feriado (`habil=True`). Ver core.calendario.
+    """
+    fecha = models.DateField(unique=True, verbose_name='Fecha')
+    descripcion = models.CharField(max_length=150, blank=True, verbose_name='Descripción')
+    habil = models.BooleanField(
+        default=False,
+        verbose_name='Es hábil',
+        help_text='Marcar para que el día cuente como hábil aunque sea feriado nacional.'
+    )
+
+    class Meta:
+        verbose_name = 'Feriado o día de cierre'
+        verbose_name_plural = 'Feriados y días de cierre'
+        ordering = ['-fecha']
+
+    def __str__(self):
+        return f"{self.fecha:%d/%m/%Y} {self.descripcion}".strip()
+
+    def save(self, *args, **kwargs):
+        fechas = {self.fecha}
+        if self.pk:
+            anterior = Feriado.objects.filter(pk=self.pk).values_list('fecha', flat=True).first()
+            if anterior:
+                fechas.add(anterior)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self._recalcular_vencimientos(min(fechas))
+
+    def delete(self, *args, **kwargs):
+        fecha = self.fecha
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            self._recalcular_vencimientos(fecha)
+        return resultado
+
+    @staticmethod
+    def _recalcular_vencimientos(desde):
+        from core import calendario
+        from oficios.models import Oficio
+
+        calendario.invalidar()
+        Oficio.recalcular_vencimientos(desde=desde)
+
+
 # Registrar historial para el modelo de usuario en un lugar visible para makemigrations.
 try:
     register(get_user_model(), app='core')
 except Exception:
     pass
+
+
+class Archivo(models.Model):
+    """
+    Archivo guardado por contenido (core.archivos): un solo blob por SHA-256,
+    compartido por todos los registros que suben el mismo PDF. `referencias`
+    cuenta los registros que lo usan; `limpiar_archivos` borra los que quedan
+    sin referencias.
+    """
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name='SHA-256')
+    nombre = models.CharField(max_length=255, unique=True, verbose_name='Nombre en el storage')
+    tamanio = models.PositiveBigIntegerField(default=0, verbose_name='Tamaño (bytes)')
+    referencias = models.IntegerField(default=0, verbose_name='Referencias')
+    creado = models.DateTimeField(auto_now_add=True, verbose_name='Creado')
+    # Ultima vez que se subio este contenido: la limpieza respeta un margen desde aca
+    ultimo_uso = models.DateTimeField(default=timezone.now, verbose_name='Último uso')
+
+    class Meta:
+        verbose_name = 'Archivo'
+        verbose_name_plural = 'Archivos'
+        indexes = [
+            # Candidatos de la limpieza
+            models.Index(fields=['ultimo_uso'], name='archivo_sin_referencias_idx', condition=Q(referencias__lte=0)),
+        ]
+
+    def __str__(self):
+        return self.nombre
+
+
+class ContenidoPDF(models.Model):
+    """
+    Datos extraidos de un PDF guardado por contenido: cantidad de paginas, texto
+    (normalizado, para la busqueda) y miniatura de la primera pagina. Se crea
+    pendiente al subir el archivo y la completa el comando `procesar_pdfs` (ver
+    core/pdf.py); un mismo blob se procesa una sola vez.
+    """
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_LISTO = 'listo'
+    ESTADO_ERROR = 'error'
+    ESTADO_CHOICES = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_LISTO, 'Listo'),
+        (ESTADO_ERROR, 'Error'),
+    ]
+
+    archivo = models.OneToOneField(
+        Archivo,
+        on_delete=models.CASCADE,
+        related_name='contenido_pdf',
+        verbose_name='Archivo'
+    )
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default=ESTADO_PENDIENTE, verbose_name='Estado')
+    paginas = models.PositiveIntegerField(null=True, blank=True, verbose_name='Páginas')
+    texto = models.TextField(blank=True, verbose_name='Texto')
+    # Nombre en el storage de medios del PNG de la primera pagina
+    miniatura = models.CharField(max_length=255, blank=True, verbose_name='Miniatura')
+    intentos = models.PositiveIntegerField(default=0, verbose_name='Intentos')
+    proximo_intento = models.DateTimeField(default=timezone.now, verbose_name='Próximo intento')
+    ultimo_error = models.TextField(blank=True, verbose_name='Último error')
+    procesado = models.DateTimeField(null=True, blank=True, verbose_name='Procesado')
+
+    class Meta:
+        verbose_name = 'Contenido de PDF'
+        verbose_name_plural = 'Contenidos de PDF'
+        indexes = [
+            # Cola: solo los pendientes, por fecha de proximo intento
+            models.Index(
+                fields=['proximo_intento'],
+                name='contenido_pdf_pendiente_idx',
+                condition=Q(estado='pendiente'),
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.archivo_id} ({self.get_estado_display()})'
@@ -0,0 +1,285 @@
+"""
+Paginacion por cursor (keyset) para los listados grandes.
+
+En lugar de `OFFSET n` y un `COUNT(*)` por pagina, cada pagina se pide a partir
+de la clave de orden de la ultima fila vista (por ejemplo `(fecha_vencimiento,
+fecha_emision, id)` en oficios): la pagina 5.000 cuesta lo mismo que la primera.
+Los cursores viajan firmados en `?cursor=`, asi no se pueden fabricar a mano.
+"""
+import json
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import OrderBy
+
+
+SALT = 'core.paginacion'
+PARAMETRO = 'cursor'
+SIGUIENTE = 'n'
+ANTERIOR = 'p'
+
+
+class OrdenNoSoportado(Exception):
+    """El orden del queryset no se puede recorrer por cursor (anotaciones, relaciones)."""
+
+
+class Clave:
+    """Un campo del orden: nombre, sentido y posicion de los nulos."""
+
+    def __init__(self, campo, descendente=False, nulos_al_final=True):
+        self.campo = campo
+        self.descendente = descendente
+        self.nulos_al_final = nulos_al_final
+
+    def invertida(self):
+        return Clave(self.campo, not self.descendente, not self.nulos_al_final)
+
+    def orden(self):
+        # Siempre explicito: PostgreSQL y SQLite ubican los nulos distinto por defecto
+        if self.nulos_al_final:
+            return OrderBy(F(self.campo.name), descending=self.descendente, nulls_last=True)
+        return OrderBy(F(self.campo.name), descending=self.descendente, nulls_first=True)
+
+    def posteriores(self, valor, inclusive=False):
+        """Q de las filas que van despues de `valor` en este campo."""
+        nombre = self.campo.name
+        if valor is None:
+            if self.nulos_al_final:
+                # Despues de un nulo solo hay nulos (iguales)
+                return Q(**{f'{nombre}__isnull': True}) if inclusive else Q(pk__in=[])
+            return Q(**{f'{nombre}__isnull': False}) | (Q(**{f'{nombre}__isnull': True}) if inclusive else Q())
+        operador = 'lt' if self.descendente else 'gt'
+        if inclusive:
+            operador += 'e'
+        condicion = Q(**{f'{nombre}__{operador}': valor})
+        if self.nulos_al_final and self.campo.null:
+            condicion |= Q(**{f'{nombre}__isnull': True})
+        return condicion
+
+    def igual(self, valor):
+        if valor is None:
+            return Q(**{f'{self.campo.name}__isnull': True})
+        return Q(**{self.campo.name: valor})
+
+
+def claves_de_orden(queryset):
+    """
+    Lee el orden del queryset como lista de Clave, agregando la pk al final para
+    desempatar. Solo campos propios del modelo; si no, OrdenNoSoportado.
+    """
+    modelo = queryset.model
+    orden = list(queryset.query.order_by) or list(modelo._meta.ordering)
+    if not orden:
+        raise OrdenNoSoportado('El queryset no tiene orden.')
+
+    claves = []
+    for item in orden:
+        if isinstance(item, str):
+            descendente = item.startswith('-')
+            nombre = item.lstrip('-')
+            nulos_al_final = True
+        elif isinstance(item, OrderBy) and isinstance(item.expression, F):
+            descendente = item.descending
+            nombre = item.expression.name
+            nulos_al_final = not item.nulls_first
+        else:
+            raise OrdenNoSoportado(f'Orden no soportado: {item!r}')
+        if nombre == 'pk':
+            nombre = modelo._meta.pk.name
+        try:
+            campo = modelo._meta.get_field(nombre)
+        except FieldDoesNotExist:
+            raise OrdenNoSoportado(f'{nombre} no es un campo de {modelo.__name__}.')
+        if campo.is_relation or nombre in queryset.query.annotations:
+            raise OrdenNoSoportado(f'{nombre} no es un campo simple de {modelo.__name__}.')
+        claves.append(Clave(campo, descendente, nulos_al_final))
+
+    pk = modelo._meta.pk
+    if all(clave.campo != pk for clave in claves):
+        claves.append(Clave(pk, claves[-1].descendente))
+    return claves
+
+
+def _posteriores(claves, valores):
+    """
+    Filas estrictamente posteriores a `valores` en el orden de `claves`:
+    (a > x) OR (a = x AND b > y) OR ... Se agrega la cota sobre el primer campo
+    para que el planificador recorra el indice como un rango.
+    """
+    condicion = Q(pk__in=[])
+    prefijo = Q()
+    for clave, valor in zip(claves, valores):
+        condicion |= prefijo & clave.posteriores(valor)
+        prefijo &= clave.igual(valor)
+    return claves[0].posteriores(valores[0], inclusive=True) & condicion
+
+
+def _serializar(claves, fila):
+    """Valores de la clave de `fila` (instancia o dict de values()) como texto."""
+    valores = []
+    for clave in claves:
+        if isinstance(fila, dict):
+            valor = fila[clave.campo.attname]
+        else:
+            valor = getattr(fila, clave.campo.attname)
+        if valor is not None:
+            valor = valor.isoformat() if hasattr(valor, 'isoformat') else str(valor)
+        valores.append(valor)
+    return valores
+
+
+def _deserializar(claves, valores):
+    return [None if valor is None else clave.campo.to_python(valor) for clave, valor in zip(claves, valores)]
+
+
+def firmar(direccion, valores):
+    return signing.dumps([direccion, valores], salt=SALT, compress=True)
+
+
+def leer(token):
+    """(direccion, valores) del cursor, o None si falta o no es valido."""
+    if not token:
+        return None
+    try:
+        direccion, valores = signing.loads(token, salt=SALT)
+    except (signing.BadSignature, ValueError, TypeError):
+        return None
+    if direccion not in (SIGUIENTE, ANTERIOR) or not isinstance(valores, list):
+        return None
+    return direccion, valores
+
+
+def total_estimado(queryset):
+    """
+    Cantidad de filas estimada por el planificador (EXPLAIN) sin recorrerlas.
+    Solo en PostgreSQL; en otros motores devuelve None.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    try:
+        sql, params = queryset.order_by().query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+    except Exception:
+        return None
+
+
+class PaginaCursor:
+    """Pagina de un listado por cursor; se usa en la plantilla como page_obj."""
+    es_cursor = True
+
+    def __init__(self, object_list, paginator, siguiente=None, anterior=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.cursor_siguiente = siguiente
+        self.cursor_anterior = anterior
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.cursor_siguiente is not None
+
+    def has_previous(self):
+        return self.cursor_anterior is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Paginador por cursor sobre el orden del queryset. `count` es el total exacto
+    si se paso `total`, o la estimacion del planificador si `estimar_total`.
+    """
+
+    def __init__(self, queryset, per_page, total=None, estimar_total=False):
+        self.object_list = queryset
+        self.per_page = int(per_page)
+        self.claves = claves_de_orden(queryset)
+        self._total = total
+        self.estimar_total = estimar_total
+
+    @property
+    def count(self):
+        if self._total is None and self.estimar_total:
+            self._total = total_estimado(self.object_list)
+        return self._total
+
+    @property
+    def total_es_estimado(self):
+        return self.estimar_total and self.count is not None
+
+    def page(self, token=None):
+        cursor = leer(token)
+        direccion, valores = cursor if cursor else (SIGUIENTE, None)
+        if valores is not None and len(valores) != len(self.claves):
+            direccion, valores = SIGUIENTE, None
+
+        claves = self.claves if direccion == SIGUIENTE else [clave.invertida() for clave in self.claves]
+        queryset = self.object_list.order_by(*(clave.orden() for clave in claves))
+        if valores is not None:
+            try:
+                queryset = queryset.filter(_posteriores(claves, _deserializar(self.claves, valores)))
+            except Exception:
+                # Cursor de otro listado u orden: se vuelve a la primera pagina
+                queryset = self.object_list.order_by(*(clave.orden() for clave in self.claves))
+                direccion, valores = SIGUIENTE, None
+        filas = list(queryset[:self.per_page + 1])
+        hay_mas = len(filas) > self.per_page
+        filas = filas[:self.per_page]
+
+        if direccion == ANTERIOR:
+            filas.reverse()
+            hay_siguiente, hay_anterior = True, hay_mas
+        else:
+            hay_siguiente, hay_anterior = hay_mas, valores is not None
+
+        siguiente = firmar(SIGUIENTE, _serializar(self.claves, filas[-1])) if filas and hay_siguiente else None
+        anterior = firmar(ANTERIOR, _serializar(self.claves, filas[0])) if filas and hay_anterior else None
+        return PaginaCursor(filas, self, siguiente=siguiente, anterior=anterior)
+
+
+class PaginacionCursorMixin:
+    """
+    Para ListView: pagina por cursor cuando el orden del listado lo permite y
+    PAGINACION_CURSOR esta activo (por defecto); si no, paginacion por numero.
+    `estimar_total` muestra el total aproximado del planificador en vez de contar.
+    """
+    estimar_total = False
+
+    def usar_cursor(self, queryset):
+        if not getattr(settings, 'PAGINACION_CURSOR', True):
+            return False
+        try:
+            claves_de_orden(queryset)
+        except OrdenNoSoportado:
+            return False
+        return True
+
+    def get_total_cursor(self, queryset):
+        """Total exacto ya conocido por la vista (None si no se conoce)."""
+        return None
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.usar_cursor(queryset):
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset,
+            page_size,
+            total=self.get_total_cursor(queryset),
+            estimar_total=self.estimar_total,
+        )
+        pagina = paginator.page(self.request.GET.get(PARAMETRO))
+        return paginator, pagina, pagina.object_list, pagina.has_other_pages()
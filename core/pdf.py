@@ -0,0 +1,161 @@
+"""
+Procesamiento de PDFs en segundo plano: paginas, texto y miniatura.
+
+Al guardar un blob por contenido (core.archivos.guardar) se encola su
+ContenidoPDF; el request nunca abre el PDF. El comando `procesar_pdfs` toma lotes
+de la cola (SELECT ... FOR UPDATE SKIP LOCKED, como los correos), lee los
+archivos del storage en el proceso principal y reparte el parseo, que es CPU
+puro, en un pool de procesos. Los resultados se guardan con un bulk_update por
+lote; los que fallan se reintentan con espera exponencial hasta MAX_INTENTOS.
+
+La extraccion usa PyMuPDF (`fitz`), que solo necesita el proceso del worker.
+"""
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.texto import normalizar
+
+
+MAX_INTENTOS = 3
+# Espera antes del reintento n: 1, 2, 4... minutos, con tope de una hora
+ESPERA_BASE = timedelta(minutes=1)
+ESPERA_MAXIMA = timedelta(hours=1)
+# Tiempo que un lote queda reservado para un worker (ver oficios/correos.py)
+RESERVA = timedelta(minutes=10)
+# Caracteres de texto normalizado que se guardan por archivo
+LIMITE_TEXTO = 20000
+CARPETA_MINIATURAS = 'miniaturas'
+ANCHO_MINIATURA = 200
+
+
+def encolar(archivo_id):
+    """Crea el ContenidoPDF pendiente del blob, si todavia no existe."""
+    from core.models import ContenidoPDF
+
+    ContenidoPDF.objects.bulk_create([ContenidoPDF(archivo_id=archivo_id)], ignore_conflicts=True)
+
+
+def espera_reintento(intentos):
+    return min(ESPERA_BASE * (2 ** max(intentos - 1, 0)), ESPERA_MAXIMA)
+
+
+def extraer(datos, ancho=ANCHO_MINIATURA):
+    """(paginas, texto normalizado, PNG de la primera pagina) de un PDF en bytes."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(stream=datos, filetype='pdf') as documento:
+        paginas = documento.page_count
+        partes = []
+        largo = 0
+        for pagina in documento:
+            parte = pagina.get_text()
+            partes.append(parte)
+            largo += len(parte)
+            # Sobra margen: normalizar colapsa espacios y saltos de linea
+            if largo >= 2 * LIMITE_TEXTO:
+                break
+        texto = normalizar(' '.join(partes))[:LIMITE_TEXTO]
+        png = b''
+        if paginas:
+            primera = documento[0]
+            escala = ancho / primera.rect.width if primera.rect.width else 1
+            png = primera.get_pixmap(matrix=fitz.Matrix(escala, escala)).tobytes('png')
+    return paginas, texto, png
+
+
+def _extraer_en_proceso(datos):
+    # Corre en el pool: el error vuelve como texto (no toda excepcion se puede serializar)
+    try:
+        return extraer(datos), ''
+    except Exception as e:
+        return None, str(e) or e.__class__.__name__
+
+
+def nombre_miniatura(sha256):
+    return f'{CARPETA_MINIATURAS}/{sha256[:2]}/{sha256}.png'
+
+
+def _guardar_miniatura(storage, sha256, png):
+    nombre = nombre_miniatura(sha256)
+    if not storage.exists(nombre):
+        guardado = storage.save(nombre, ContentFile(png))
+        if guardado != nombre:
+            storage.delete(guardado)
+    return nombre
+
+
+def _reservar_lote(tamano, ahora):
+    from core.models import ContenidoPDF
+
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    with transaction.atomic():
+        lote = list(
+            ContenidoPDF.objects
+            .select_related('archivo')
+            .select_for_update(skip_locked=skip_locked, of=('self',))
+            .filter(estado=ContenidoPDF.ESTADO_PENDIENTE, proximo_intento__lte=ahora)
+            .order_by('proximo_intento', 'pk')[:tamano]
+        )
+        if lote:
+            ContenidoPDF.objects.filter(pk__in=[c.pk for c in lote]).update(proximo_intento=ahora + RESERVA)
+    return lote
+
+
+def procesar_lote(tamano=10, ejecutor=None, storage=None):
+    """
+    Procesa un lote de PDFs pendientes. El parseo corre en `ejecutor` (un
+    concurrent.futures.Executor; el comando usa un ProcessPoolExecutor) o, sin
+    ejecutor, en este proceso. Devuelve (nombres de los blobs listos, fallidos).
+    """
+    from core.models import ContenidoPDF
+
+    storage = storage or default_storage
+    lote = _reservar_lote(tamano, timezone.now())
+    if not lote:
+        return [], 0
+
+    resultados = {}
+    trabajos = {}
+    for contenido in lote:
+        try:
+            with storage.open(contenido.archivo.nombre, 'rb') as archivo:
+                trabajos[contenido.pk] = archivo.read()
+        except Exception as e:
+            resultados[contenido.pk] = None, str(e) or e.__class__.__name__
+    mapear = ejecutor.map if ejecutor is not None else map
+    resultados.update(zip(trabajos, mapear(_extraer_en_proceso, trabajos.values())))
+
+    listos = []
+    fallidos = 0
+    for contenido in lote:
+        extraido, error = resultados[contenido.pk]
+        contenido.intentos += 1
+        if extraido is not None:
+            paginas, texto, png = extraido
+            try:
+                contenido.miniatura = _guardar_miniatura(storage, contenido.archivo.sha256, png) if png else ''
+            except Exception as e:
+                extraido, error = None, str(e) or e.__class__.__name__
+        if extraido is None:
+            fallidos += 1
+            contenido.ultimo_error = error
+            if contenido.intentos >= MAX_INTENTOS:
+                contenido.estado = ContenidoPDF.ESTADO_ERROR
+            else:
+                contenido.proximo_intento = timezone.now() + espera_reintento(contenido.intentos)
+            continue
+        contenido.estado = ContenidoPDF.ESTADO_LISTO
+        contenido.paginas = paginas
+        contenido.texto = texto
+        contenido.ultimo_error = ''
+        contenido.procesado = timezone.now()
+        listos.append(contenido.archivo.nombre)
+
+    ContenidoPDF.objects.bulk_update(
+        lote, ['estado', 'paginas', 'texto', 'miniatura', 'intentos', 'proximo_intento', 'ultimo_error', 'procesado']
+    )
+    return listos, fallidos
@@ -0,0 +1,154 @@
+"""
+Escritura de planillas (CSV y XLSX) fila por fila, sin armar el archivo en memoria.
+
+El XLSX se genera con la biblioteca estandar (zipfile + XML con cadenas en linea):
+una sola hoja, sin estilos, suficiente para abrir y filtrar en Excel/LibreOffice.
+"""
+import csv
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+
+CSV_DELIMITADOR = ';'  # Excel en configuracion regional es-AR
+
+
+class _Buffer:
+    """Destino de escritura que acumula lo escrito hasta que se lo vacia."""
+
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def write(self, datos):
+        if isinstance(datos, str):
+            datos = datos.encode('utf-8')
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        # Sin seek(): zipfile escribe en modo secuencial (descriptores de datos)
+        return self._posicion
+
+    def flush(self):
+        pass
+
+    def vaciar(self):
+        datos = b''.join(self._partes)
+        self._partes = []
+        return datos
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return valor.strftime('%d/%m/%Y %H:%M')
+    if isinstance(valor, date):
+        return valor.strftime('%d/%m/%Y')
+    return str(valor)
+
+
+class _Escritor:
+    """Adaptador para csv.writer, que escribe str."""
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def write(self, texto):
+        return self.buffer.write(texto)
+
+
+def filas_csv(encabezados, filas, cada=500):
+    """Genera el CSV (UTF-8 con BOM, para Excel) en bloques de bytes cada `cada` filas."""
+    buffer = _Buffer()
+    escritor = csv.writer(_Escritor(buffer), delimiter=CSV_DELIMITADOR)
+    buffer.write('\ufeff')
+    escritor.writerow(encabezados)
+    for numero, fila in enumerate(filas, start=1):
+        escritor.writerow([_texto(valor) for valor in fila])
+        if numero % cada == 0:
+            yield buffer.vaciar()
+    yield buffer.vaciar()
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{hoja}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+
+def _celda(valor):
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return f'<c t="n"><v>{valor}</v></c>'
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(_texto(valor))}</t></is></c>'
+
+
+def _fila_xml(valores):
+    return ('<row>' + ''.join(_celda(valor) for valor in valores) + '</row>').encode('utf-8')
+
+
+def filas_xlsx(encabezados, filas, hoja='Datos', cada=500):
+    """Genera el XLSX en bloques de bytes cada `cada` filas (apto para StreamingHttpResponse)."""
+    buffer = _Buffer()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as libro:
+        libro.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        libro.writestr('_rels/.rels', _RELS)
+        libro.writestr('xl/workbook.xml', _WORKBOOK.format(hoja=escape(hoja)))
+        libro.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        with libro.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as hoja_xml:
+            hoja_xml.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            hoja_xml.write(_fila_xml(encabezados))
+            for numero, fila in enumerate(filas, start=1):
+                hoja_xml.write(_fila_xml(fila))
+                if numero % cada == 0:
+                    yield buffer.vaciar()
+            hoja_xml.write(b'</sheetData></worksheet>')
+    yield buffer.vaciar()
+
+
+def generar(formato, encabezados, filas, hoja='Datos'):
+    """Bloques de bytes de la planilla en el formato pedido ('csv' o 'xlsx')."""
+    if formato == 'xlsx':
+        return filas_xlsx(encabezados, filas, hoja=hoja)
+    return filas_csv(encabezados, filas)
+
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
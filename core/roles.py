@@ -0,0 +1,88 @@
+"""
+Roles de un usuario segun el nombre de su sector.
+
+Los permisos dependen del sector del perfil ("Coordinación OPD", "Despacho de
+Niñez", ...). El nombre se pliega (sin tildes, minusculas) y se traduce a una
+mascara de bits una vez por sector y por proceso; el cache se descarta cuando
+cambia la version `sectores` (alta, edicion o baja de un Sector). Cada usuario
+guarda su mascara durante el request.
+"""
+from core import versiones
+from core.texto import normalizar
+
+
+COORDINACION_OPD = 1
+DESPACHO_NINEZ = 2
+DIRECTOR_NINEZ = 4
+COORDINADOR = 8
+INFORMATICA = 16
+# Informatica, coordinador y director de niñez ven y corrigen todo
+ADMINISTRACION = INFORMATICA | COORDINADOR | DIRECTOR_NINEZ
+
+
+def roles_de_nombre(nombre):
+    """Mascara de roles para el nombre de un sector."""
+    plegado = normalizar(nombre)
+    roles = 0
+    if 'coordinacion opd' in plegado:
+        roles |= COORDINACION_OPD
+    if 'ninez' in plegado:
+        if 'despacho' in plegado:
+            roles |= DESPACHO_NINEZ
+        if 'director' in plegado:
+            roles |= DIRECTOR_NINEZ
+    if plegado == 'coordinador':
+        roles |= COORDINADOR
+    if plegado == 'informatica':
+        roles |= INFORMATICA
+    return roles
+
+
+_por_sector = {}
+_version = None
+
+
+def roles_de_sector(sector):
+    """Mascara de roles de un Sector (o None), cacheada por id en el proceso."""
+    global _por_sector, _version
+    if sector is None:
+        return 0
+    version = versiones.version_datos(versiones.SECTORES)
+    if _version != version:
+        _por_sector = {}
+        _version = version
+    roles = _por_sector.get(sector.pk)
+    if roles is None:
+        roles = _por_sector[sector.pk] = roles_de_nombre(sector.nombre)
+    return roles
+
+
+def cargar_perfil(user):
+    """
+    Lee perfil y sector del usuario en una consulta, salvo que ya esten
+    cargados (por ejemplo desde NoProfesionalesBackend.get_user).
+    """
+    from core.models import UsuarioPerfil
+
+    if 'perfil' in user._state.fields_cache:
+        return
+    perfil = UsuarioPerfil.objects.select_related('id_sector').filter(usuario_id=user.pk).first()
+    # Sin perfil queda None en el cache: user.perfil sigue lanzando DoesNotExist
+    user._state.fields_cache['perfil'] = perfil
+
+
+def roles_de(user):
+    """Mascara de roles del usuario, calculada una vez por request."""
+    if user is None or not user.is_authenticated:
+        return 0
+    roles = getattr(user, '_roles', None)
+    if roles is None:
+        cargar_perfil(user)
+        perfil = user._state.fields_cache.get('perfil')
+        roles = user._roles = roles_de_sector(perfil.id_sector if perfil is not None else None)
+    return roles
+
+
+def tiene_rol(user, rol):
+    """True si el usuario tiene alguno de los roles de la mascara `rol`."""
+    return bool(roles_de(user) & rol)
@@ -0,0 +1,60 @@
+/*
+ * Selects con autocompletado remoto (core.widgets.AutocompletarSelect).
+ *
+ * El select llega solo con las opciones elegidas y la URL en
+ * data-autocompletar; las demas se piden al escribir. El endpoint responde
+ * {"resultados": [{"id", "texto"}], "siguiente"} y "siguiente" es el cursor de
+ * la pagina que sigue, que select2 pide al llegar al final de la lista.
+ * Requiere jQuery y select2 cargados antes.
+ */
+(function ($) {
+    function inicializar(select) {
+        const $select = $(select);
+        if ($select.data('select2')) return;
+        // Cursor de la pagina siguiente por texto buscado
+        const cursores = {};
+
+        $select.select2({
+            theme: 'bootstrap-5',
+            width: '100%',
+            allowClear: true,
+            placeholder: $select.data('placeholder') || 'Buscar...',
+            minimumInputLength: 0,
+            ajax: {
+                url: $select.data('autocompletar'),
+                delay: 250,
+                data: function (params) {
+                    const search = params.term || '';
+                    const datos = { search: search };
+                    if (params.page && cursores[search]) datos.cursor = cursores[search];
+                    return datos;
+                },
+                processResults: function (data, params) {
+                    const search = params.term || '';
+                    cursores[search] = data.siguiente;
+                    return {
+                        results: (data.resultados || []).map(function (item) {
+                            return { id: item.id, text: item.texto };
+                        }),
+                        pagination: { more: Boolean(data.siguiente) }
+                    };
+                }
+            },
+            language: {
+                noResults: function () { return 'No se encontraron resultados'; },
+                searching: function () { return 'Buscando...'; },
+                loadingMore: function () { return 'Cargando más...'; }
+            }
+        });
+    }
+
+    window.inicializarAutocompletar = function (contexto) {
+        $(contexto || document).find('select[data-autocompletar]').each(function () {
+            inicializar(this);
+        });
+    };
+
+    $(function () {
+        window.inicializarAutocompletar();
+    });
+})(jQuery);
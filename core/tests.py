@@ -1,3 +1,356 @@
-from django.test import TestCase
+import tempfile
+from datetime import date, datetime, timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from casos.models import Caso
+from oficios.filters import OficioFilter
+from oficios.models import CorreoSaliente, Oficio
+from reportes.models import ResumenDiarioOficio
+
+from . import archivos, calendario, inicio, paginacion, pdf, roles
+from .codigos import reservar_codigos
+from .models import Archivo, ContadorCodigo, ContenidoPDF, Feriado, Sector, UsuarioPerfil
+
+
+class ReservaCodigosTest(TestCase):
+    def test_inicializa_desde_codigos_existentes(self):
+        Oficio.objects.bulk_create([
+            Oficio(codigo='OF-00007-2024'),
+            Oficio(codigo='OF-00003-2024'),
+            Oficio(codigo='OF-00099-2023'),
+        ])
+        self.assertEqual(reservar_codigos('OF', 2024, modelo=Oficio), ['OF-00008-2024'])
+        self.assertEqual(reservar_codigos('OF', 2024, modelo=Oficio), ['OF-00009-2024'])
+
+    def test_reserva_en_lote_consecutiva(self):
+        ContadorCodigo.objects.create(prefijo='OF', anio=2025, ultimo=10)
+        with CaptureQueriesContext(connection) as ctx:
+            codigos = reservar_codigos('OF', 2025, cantidad=3)
+        sentencias = [q['sql'] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(sentencias), 1)
+        self.assertEqual(codigos, ['OF-00011-2025', 'OF-00012-2025', 'OF-00013-2025'])
+        self.assertEqual(ContadorCodigo.objects.get(prefijo='OF', anio=2025).ultimo, 13)
+
+    def test_save_asigna_codigos_correlativos(self):
+        user = get_user_model().objects.create_user(username='operador', password='x')
+        anio = timezone.localdate().year
+        caso = Caso.objects.create(usuario=user)
+        self.assertEqual(caso.codigo, f'CS-00001-{anio}')
+        primero = Oficio.objects.create(fecha_emision=timezone.now())
+        segundo = Oficio.objects.create(fecha_emision=timezone.now())
+        self.assertEqual(primero.codigo, f'OF-00001-{anio}')
+        self.assertEqual(segundo.codigo, f'OF-00002-{anio}')
+
+    def test_backfill_sincroniza_y_asigna_faltantes(self):
+        anio = timezone.localdate().year
+        Oficio.objects.bulk_create([
+            Oficio(codigo=f'OF-00005-{anio}'),
+            Oficio(codigo=None),
+        ])
+        ContadorCodigo.objects.create(prefijo='OF', anio=anio, ultimo=2)
+        call_command('backfill_codigos', '--asignar-faltantes', stdout=StringIO())
+        self.assertTrue(Oficio.objects.filter(codigo=f'OF-00006-{anio}').exists())
+        self.assertEqual(ContadorCodigo.objects.get(prefijo='OF', anio=anio).ultimo, 6)
+
+
+class CalendarioTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_feriados_nacionales(self):
+        feriados = calendario.feriados_nacionales(2025)
+        self.assertIn(date(2025, 3, 3), feriados)  # Carnaval
+        self.assertIn(date(2025, 4, 18), feriados)  # Viernes Santo
+        # 17/8/2025 cae domingo: no se traslada; 17/6/2025 (martes) pasa al lunes 16
+        self.assertIn(date(2025, 8, 17), feriados)
+        self.assertIn(date(2025, 6, 16), feriados)
+        self.assertNotIn(date(2025, 6, 17), feriados)
+
+    def test_sumar_y_contar_dias_habiles(self):
+        # Viernes 21/3/2025 + 2 habiles: lunes 24 es feriado -> miercoles 26
+        self.assertEqual(calendario.sumar_dias_habiles(date(2025, 3, 21), 2), date(2025, 3, 26))
+        self.assertEqual(calendario.contar_dias_habiles(date(2025, 3, 21), date(2025, 3, 26)), 2)
+        self.assertFalse(calendario.es_habil(date(2025, 3, 24)))
+        # Conserva la hora y extiende el indice fuera del rango inicial
+        base = datetime(2040, 1, 2, 9, 30)
+        self.assertEqual(calendario.sumar_dias_habiles(base, 1), datetime(2040, 1, 3, 9, 30))
+
+    def test_consultas_en_o1(self):
+        calendario.obtener(date(2025, 1, 1))
+        with self.assertNumQueries(0):
+            for dias in (1, 10, 100, 1000):
+                calendario.sumar_dias_habiles(date(2025, 1, 1), dias)
+
+    def test_feriado_cargado_recalcula_vencimientos_abiertos(self):
+        emision = timezone.make_aware(datetime(2025, 9, 5, 10, 0))  # viernes
+        abierto = Oficio.objects.create(plazo_horas=48, plazo_unidad='dias', fecha_emision=emision)
+        enviado = Oficio.objects.create(plazo_horas=48, plazo_unidad='dias', fecha_emision=emision, estado='enviado')
+        manual = Oficio.objects.create(plazo_horas=48, plazo_unidad='dias', fecha_emision=emision)
+        manual._fecha_vencimiento_manual = emision + timedelta(days=10)
+        manual.save()
+        self.assertEqual(timezone.localtime(abierto.fecha_vencimiento).date(), date(2025, 9, 9))
+
+        feriado = Feriado.objects.create(fecha=date(2025, 9, 8), descripcion='Cierre')
+        abierto.refresh_from_db()
+        enviado.refresh_from_db()
+        manual.refresh_from_db()
+        self.assertEqual(timezone.localtime(abierto.fecha_vencimiento).date(), date(2025, 9, 10))
+        self.assertEqual(timezone.localtime(abierto.fecha_vencimiento).time(), emision.time())
+        self.assertEqual(timezone.localtime(enviado.fecha_vencimiento).date(), date(2025, 9, 9))
+        self.assertEqual(timezone.localtime(manual.fecha_vencimiento).date(), date(2025, 9, 15))
+        # El resumen de reportes toma el vencimiento nuevo
+        self.assertEqual(
+            ResumenDiarioOficio.objects.filter(vencimiento=date(2025, 9, 10)).values_list('total', flat=True).get(),
+            1,
+        )
+
+        feriado.delete()
+        abierto.refresh_from_db()
+        self.assertEqual(timezone.localtime(abierto.fecha_vencimiento).date(), date(2025, 9, 9))
+
+
+class PaginacionCursorTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        ahora = timezone.now()
+        oficios = []
+        for i in range(23):
+            # Vencimientos repetidos y nulos para ejercitar los desempates
+            vence = None if i % 5 == 0 else ahora + timedelta(days=i % 3)
+            oficios.append(Oficio(codigo=f'T-PAG{i:02d}', fecha_vencimiento=vence, fecha_emision=ahora - timedelta(hours=i % 4)))
+        Oficio.objects.bulk_create(oficios)
+
+    def _listado(self):
+        return OficioFilter({}, queryset=Oficio.objects.all()).ordenar(Oficio.objects.all())
+
+    def test_recorre_todo_en_ambos_sentidos(self):
+        esperado = [oficio.pk for oficio in self._listado().order_by(
+            *(clave.orden() for clave in paginacion.claves_de_orden(self._listado()))
+        )]
+        paginator = paginacion.CursorPaginator(self._listado(), 5)
+
+        vistos, paginas, token = [], [], None
+        while True:
+            pagina = paginator.page(token)
+            paginas.append(pagina)
+            vistos.extend(oficio.pk for oficio in pagina)
+            if not pagina.has_next():
+                break
+            token = pagina.cursor_siguiente
+        self.assertEqual(vistos, esperado)
+        self.assertEqual(len(paginas), 5)
+        self.assertFalse(paginas[0].has_previous())
+
+        # Hacia atras desde la ultima pagina se obtienen las mismas paginas
+        pagina = paginas[-1]
+        for anterior in reversed(paginas[:-1]):
+            pagina = paginator.page(pagina.cursor_anterior)
+            self.assertEqual([o.pk for o in pagina], [o.pk for o in anterior])
+        self.assertFalse(pagina.has_previous())
+
+    def test_cursor_invalido_vuelve_al_inicio(self):
+        paginator = paginacion.CursorPaginator(self._listado(), 5)
+        primera = [o.pk for o in paginator.page()]
+        self.assertEqual([o.pk for o in paginator.page('basura')], primera)
+
+    def test_pagina_profunda_sin_offset_ni_count(self):
+        user = get_user_model().objects.create_user(username='operador', password='x')
+        self.client.force_login(user)
+        paginator = paginacion.CursorPaginator(self._listado(), 20)
+        token = paginator.page().cursor_siguiente
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('oficios:list'), {'cursor': token})
+        self.assertEqual(len(response.context['oficios']), 3)
+        self.assertNotIn('OFFSET', ' '.join(q['sql'] for q in consultas.captured_queries).upper())
+        self.assertContains(response, 'Anterior')
+        for nombre in ('casos:list', 'personas:nino_list', 'personas:parte_list'):
+            self.assertEqual(self.client.get(reverse(nombre)).status_code, 200)
+
+
+class RolesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.sector = Sector.objects.create(nombre='Coordinación OPD')
+        cls.user = get_user_model().objects.create_user(username='opd', password='x')
+        UsuarioPerfil.objects.create(usuario=cls.user, id_sector=cls.sector)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_roles_por_nombre(self):
+        self.assertEqual(roles.roles_de_nombre('Coordinación OPD Capital'), roles.COORDINACION_OPD)
+        self.assertEqual(roles.roles_de_nombre('Despacho de Niñez'), roles.DESPACHO_NINEZ)
+        self.assertEqual(roles.roles_de_nombre('Dirección de Niñez'), 0)
+        self.assertEqual(roles.roles_de_nombre(' COORDINADOR '), roles.COORDINADOR)
+        self.assertEqual(roles.roles_de_nombre('Coordinador de area'), 0)
+        self.assertTrue(roles.roles_de_nombre('Director de Niñez') & roles.ADMINISTRACION)
+        self.assertEqual(roles.roles_de(get_user_model().objects.create_user(username='sin_perfil')), 0)
+
+    def test_perfil_y_sector_una_vez_por_request(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('core:home'))
+        self.assertTrue(response.context['is_coordinacion_opd'])
+        tablas = [q['sql'] for q in ctx.captured_queries if 'core_usuarioperfil' in q['sql']]
+        # Usuario, perfil y sector en la misma consulta de la sesion
+        self.assertEqual(len(tablas), 1)
+        self.assertIn('core_sector', tablas[0])
+
+    def test_renombrar_sector_invalida_roles(self):
+        response = self.client.get(reverse('casos:create'))
+        self.assertRedirects(response, reverse('casos:list'), fetch_redirect_response=False)
+        self.sector.nombre = 'Informática'
+        self.sector.save()
+        response = self.client.get(reverse('casos:create'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.roles, roles.INFORMATICA)
+
+
+class InicioTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='opd', password='x')
+        UsuarioPerfil.objects.create(usuario=cls.user, id_sector=Sector.objects.create(nombre='Coordinación OPD'))
+        cls.caso = Caso.objects.create(usuario=cls.user)
+        Oficio.objects.bulk_create(
+            [Oficio(estado='cargado', caso=cls.caso) for _ in range(inicio.POR_PANEL + 2)]
+            + [Oficio(estado='devuelto'), Oficio(estado='enviado')]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def _inicio(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('core:home'))
+        paneles = [q['sql'] for q in ctx.captured_queries if 'oficios_oficio' in q['sql']]
+        self.assertEqual(response.status_code, 200)
+        return response, paneles
+
+    def test_paneles_del_rol_en_una_consulta(self):
+        response, consultas = self._inicio()
+        contexto = response.context
+        self.assertEqual(len(consultas), 1)
+        self.assertTrue(contexto['is_coordinacion_opd'])
+        self.assertFalse(contexto['is_coordinador'])
+        cargados = contexto['ultimos_cargados']
+        self.assertEqual(len(cargados), inicio.POR_PANEL)
+        self.assertEqual(cargados[0]['caso']['pk'], self.caso.pk)
+        self.assertContains(response, reverse('oficios:detail', args=[cargados[0]['pk']]))
+        self.assertEqual([o['pk'] for o in cargados], sorted((o['pk'] for o in cargados), reverse=True))
+        self.assertEqual(len(contexto['ultimos_devueltos']), 1)
+        self.assertEqual(contexto['ultimos_asignados'], [])
+        self.assertEqual(contexto['ultimos_enviados'], [])
+
+    def test_cache_por_rol_se_invalida_al_cambiar_estado(self):
+        self._inicio()
+        _, consultas = self._inicio()
+        self.assertEqual(consultas, [])
+        oficio = Oficio.objects.get(estado='enviado')
+        oficio.estado = 'asignado'
+        oficio.save()
+        response, consultas = self._inicio()
+        self.assertEqual(len(consultas), 1)
+        self.assertEqual([o['pk'] for o in response.context['ultimos_asignados']], [oficio.pk])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ArchivosTest(TestCase):
+    def _oficio(self, contenido):
+        return Oficio.objects.create(archivo_pdf=SimpleUploadedFile('oficio.pdf', contenido))
+
+    def test_limpieza_recuenta_y_borra_huerfanos(self):
+        compartido = self._oficio(b'%PDF compartido')
+        self._oficio(b'%PDF compartido')
+        huerfano = self._oficio(b'%PDF huerfano')
+        nombre_huerfano = huerfano.archivo_pdf.name
+        huerfano.delete()
+        # Un borrado en bloque no descuenta: lo corrige el recuento
+        Oficio.objects.filter(pk=compartido.pk).delete()
+
+        salida = StringIO()
+        call_command('limpiar_archivos', '--margen-horas', '0', stdout=salida)
+        self.assertIn('1 archivos con referencias corregidas', salida.getvalue())
+        self.assertEqual(list(Archivo.objects.values_list('nombre', 'referencias')), [(compartido.archivo_pdf.name, 1)])
+        self.assertFalse(default_storage.exists(nombre_huerfano))
+        self.assertTrue(default_storage.exists(compartido.archivo_pdf.name))
+
+    def test_margen_y_correos_pendientes(self):
+        oficio = self._oficio(b'%PDF adjunto')
+        nombre = oficio.archivo_pdf.name
+        CorreoSaliente.objects.create(destinatario='a@example.com', asunto='Oficio', adjunto=nombre)
+        oficio.delete()
+        archivos.recontar()
+        self.assertEqual(Archivo.objects.get(nombre=nombre).referencias, 1)
+        CorreoSaliente.objects.update(estado='enviado')
+        archivos.recontar()
+        # Sin referencias, pero subido recien: queda dentro del margen
+        self.assertEqual(archivos.limpiar(), (0, 0))
+        self.assertEqual(archivos.limpiar(margen=timedelta(0)), (1, len(b'%PDF adjunto')))
+
+    def test_si_falla_el_borrado_del_blob_queda_la_fila(self):
+        oficio = self._oficio(b'%PDF a borrar')
+        nombre = oficio.archivo_pdf.name
+        oficio.delete()
+        # Fila y blob se borran en la misma transaccion: se reintenta en la proxima limpieza
+        with mock.patch.object(default_storage, 'delete', side_effect=OSError('sin permiso')):
+            with self.assertRaises(OSError):
+                archivos.limpiar(margen=timedelta(0))
+        self.assertTrue(Archivo.objects.filter(nombre=nombre).exists())
+        self.assertEqual(archivos.limpiar(margen=timedelta(0)), (1, len(b'%PDF a borrar')))
+        self.assertFalse(default_storage.exists(nombre))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ProcesamientoPDFTest(TestCase):
+    def _oficio(self, contenido):
+        return Oficio.objects.create(archivo_pdf=SimpleUploadedFile('oficio.pdf', contenido))
+
+    def test_encola_un_contenido_por_blob_y_procesa(self):
+        oficio = self._oficio(b'%PDF igual')
+        self._oficio(b'%PDF igual')
+        contenido = ContenidoPDF.objects.get()
+        self.assertEqual(contenido.estado, ContenidoPDF.ESTADO_PENDIENTE)
+
+        with mock.patch('core.pdf.extraer', return_value=(3, 'texto del oficio', b'png')) as extraer:
+            listos, fallidos = pdf.procesar_lote()
+        extraer.assert_called_once_with(b'%PDF igual')
+        self.assertEqual((listos, fallidos), ([oficio.archivo_pdf.name], 0))
+        contenido.refresh_from_db()
+        self.assertEqual((contenido.estado, contenido.paginas, contenido.texto), ('listo', 3, 'texto del oficio'))
+        self.assertTrue(default_storage.exists(contenido.miniatura))
+        # Nada pendiente: el siguiente lote no abre archivos
+        self.assertEqual(pdf.procesar_lote(), ([], 0))
+
+        Oficio.objects.all().delete()
+        archivos.recontar()
+        archivos.limpiar(margen=timedelta(0))
+        self.assertFalse(default_storage.exists(contenido.miniatura))
+        self.assertFalse(ContenidoPDF.objects.exists())
+
+    def test_reintentos_con_espera_y_error(self):
+        self._oficio(b'%PDF roto')
+        with mock.patch('core.pdf.extraer', side_effect=ValueError('PDF ilegible')):
+            self.assertEqual(pdf.procesar_lote(), ([], 1))
+            contenido = ContenidoPDF.objects.get()
+            self.assertEqual((contenido.estado, contenido.intentos), ('pendiente', 1))
+            self.assertGreater(contenido.proximo_intento, timezone.now())
+            # Todavia no vencio el reintento
+            self.assertEqual(pdf.procesar_lote(), ([], 0))
+            for _ in range(pdf.MAX_INTENTOS - 1):
+                ContenidoPDF.objects.update(proximo_intento=timezone.now())
+                pdf.procesar_lote()
+        contenido.refresh_from_db()
+        self.assertEqual((contenido.estado, contenido.ultimo_error), ('error', 'PDF ilegible'))
@@ -0,0 +1,67 @@
+import re
+import unicodedata
+
+from django.db.models import Case, IntegerField, Q, Value, When
+
+
+_ESPACIOS = re.compile(r'\s+')
+
+
+def normalizar(texto):
+    """
+    Pasa a minusculas, quita tildes/diacriticos y colapsa espacios. Se usa para
+    los campos de busqueda precalculados y para los terminos que escribe el usuario,
+    asi 'Pérez' y 'PEREZ' coinciden.
+    """
+    if not texto:
+        return ''
+    descompuesto = unicodedata.normalize('NFKD', str(texto))
+    sin_marcas = ''.join(c for c in descompuesto if not unicodedata.combining(c))
+    return _ESPACIOS.sub(' ', sin_marcas).strip().lower()
+
+
+def solo_digitos(texto):
+    """Digitos de un documento o numero ('30.123.456' -> '30123456')."""
+    if not texto:
+        return ''
+    return ''.join(c for c in str(texto) if c.isdigit())
+
+
+def componer_texto_busqueda(partes):
+    """Une valores normalizados separados por '|' (sirve para detectar campos exactos o prefijos)."""
+    return '|' + '|'.join(normalizar(parte) for parte in partes if parte) + '|'
+
+
+def terminos(valor):
+    """Terminos normalizados (sin tildes, minusculas) de lo que escribio el usuario."""
+    return [termino for termino in normalizar(valor).replace('|', ' ').split(' ') if termino]
+
+
+def filtrar_por_texto(queryset, valor, campo='texto_busqueda', adicional=None):
+    """
+    Filtra por un campo de texto precalculado con componer_texto_busqueda: cada
+    termino debe aparecer en el texto, o cumplir `adicional(termino)` si se pasa
+    (una condicion sobre otra tabla, p. ej. un Exists). Anota `relevancia` para
+    ordenar, solo segun `campo`: 3 si la frase completa coincide con un campo, 2 si
+    algun campo empieza con ella, 1 si solo la contiene.
+
+    En PostgreSQL el LIKE '%...%' lo resuelve un indice GIN de trigramas sobre el
+    campo; en SQLite es un recorrido secuencial, suficiente para tests y desarrollo.
+    """
+    lista = terminos(valor)
+    if not lista:
+        return queryset
+    for termino in lista:
+        condicion = Q(**{f'{campo}__contains': termino})
+        if adicional is not None:
+            condicion |= Q(adicional(termino))
+        queryset = queryset.filter(condicion)
+    frase = ' '.join(lista)
+    return queryset.annotate(
+        relevancia=Case(
+            When(**{f'{campo}__contains': f'|{frase}|'}, then=Value(3)),
+            When(**{f'{campo}__contains': f'|{frase}'}, then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    )
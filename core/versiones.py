@@ -0,0 +1,59 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+# Version global de los datos de oficios (oficios, movimientos y respuestas).
+# Las vistas que cachean agregados la incluyen en la clave del cache.
+#
+# Las versiones viven en el cache de Django: para que una invalidacion hecha en
+# un comando o en otro worker de gunicorn se vea en todos, el cache tiene que ser
+# compartido (CACHE_URL en config/settings.py). Con el cache en memoria por
+# defecto cada proceso tiene sus propias versiones.
+OFICIOS = 'oficios'
+# Feriados y dias de cierre (core.calendario)
+CALENDARIO = 'calendario'
+# Niños y partes (autocompletado de personas)
+PERSONAS = 'personas'
+# Nombres de los sectores (core.roles)
+SECTORES = 'sectores'
+
+
+def _clave(nombre):
+    return f'version-datos:{nombre}'
+
+
+def version_datos(nombre):
+    """
+    Devuelve la version vigente de un conjunto de datos. Arranca en un valor
+    derivado del reloj para que, si el backend descarta la clave, no se vuelva a
+    un numero ya usado por snapshots viejos.
+    """
+    clave = _clave(nombre)
+    version = cache.get(clave)
+    if version is None:
+        cache.add(clave, time.time_ns(), timeout=None)
+        version = cache.get(clave)
+    return version
+
+
+def _incrementar(nombre):
+    clave = _clave(nombre)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        # La clave no existe (nunca se leyo o el backend la descarto)
+        cache.set(clave, time.time_ns(), timeout=None)
+    except Exception:
+        # Un cache caido no debe impedir guardar datos
+        pass
+
+
+def invalidar_datos(nombre):
+    """
+    Incrementa la version de inmediato (lecturas en la misma transaccion) y de
+    nuevo al confirmar, para descartar snapshots armados antes del commit.
+    """
+    _incrementar(nombre)
+    transaction.on_commit(lambda: _incrementar(nombre))
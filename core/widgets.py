@@ -0,0 +1,60 @@
+"""
+Selects con autocompletado remoto para relaciones con tablas grandes.
+
+El HTML solo lleva las opciones elegidas; el resto lo pide el navegador a un
+endpoint JSON acotado (`{"resultados": [{"id", "texto"}], "siguiente"}`) con
+`core/js/autocompletar.js`. Asi el tamaño de la pagina no crece con la tabla.
+"""
+from django import forms
+from django.urls import reverse
+
+
+class AutocompletarMixin:
+    def __init__(self, url_name, attrs=None, placeholder='', choices=()):
+        self.url_name = url_name
+        self.placeholder = placeholder
+        super().__init__(attrs, choices)
+
+    class Media:
+        js = ('core/js/autocompletar.js',)
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs['data-autocompletar'] = reverse(self.url_name)
+        if self.placeholder:
+            attrs.setdefault('data-placeholder', self.placeholder)
+        return attrs
+
+    def _seleccionados(self, value):
+        """Instancias elegidas, leidas con una consulta (solo las de `value`)."""
+        field = self.choices.field
+        valores = [str(v) for v in value if v is not None and str(v) not in field.empty_values]
+        if not valores:
+            return []
+        campo = field.to_field_name or 'pk'
+        try:
+            return list(self.choices.queryset.filter(**{f'{campo}__in': valores}))
+        except (ValueError, TypeError):
+            # Valor mal formado en el querystring: se muestra sin seleccion
+            return []
+
+    def optgroups(self, name, value, attrs=None):
+        # Reemplaza la iteracion de todo el queryset del ModelChoiceField
+        opciones = []
+        if not self.is_required and not self.allow_multiple_selected:
+            opciones.append(self.create_option(name, '', '', False, 0))
+        field = self.choices.field
+        for obj in self._seleccionados(value):
+            valor = field.prepare_value(obj)
+            opciones.append(self.create_option(
+                name, valor, field.label_from_instance(obj), True, len(opciones),
+            ))
+        return [(None, opciones, 0)]
+
+
+class AutocompletarSelect(AutocompletarMixin, forms.Select):
+    pass
+
+
+class AutocompletarSelectMultiple(AutocompletarMixin, forms.SelectMultiple):
+    pass
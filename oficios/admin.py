@@ -4,6 +4,7 @@ from django.contrib.auth.admin import UserAdmin
 from django.contrib.auth.models import User as DefaultUser
 from django.utils.translation import gettext_lazy as _
 from django.contrib import messages
+from django.utils import timezone
 from django.utils.html import format_html
 from core.models import UsuarioPerfil
 from simple_history.admin import SimpleHistoryAdmin
@@ -11,7 +12,7 @@ from simple_history.admin import SimpleHistoryAdmin
 from .models import (
     Institucion, Caratula,
     Juzgado, Oficio, CaratulaOficio, Respuesta,
-    CategoriaJuzgado,
+    CategoriaJuzgado, CorreoSaliente, AlertaOficio, ExportacionOficios,
 )
 
 User = get_user_model()
@@ -150,6 +151,46 @@ class RespuestaAdmin(admin.ModelAdmin):
     readonly_fields = ('creacion', 'modificacion')
 
 
+@admin.register(CorreoSaliente)
+class CorreoSalienteAdmin(admin.ModelAdmin):
+    list_display = ('creado', 'destinatario', 'asunto', 'oficio', 'estado', 'intentos', 'proximo_intento', 'enviado')
+    list_filter = ('estado',)
+    search_fields = ('destinatario', 'asunto')
+    raw_id_fields = ('oficio',)
+    actions = ['reintentar']
+
+    def reintentar(self, request, queryset):
+        actualizados = queryset.exclude(estado=CorreoSaliente.ESTADO_ENVIADO).update(
+            estado=CorreoSaliente.ESTADO_PENDIENTE, intentos=0, proximo_intento=timezone.now()
+        )
+        self.message_user(request, f"{actualizados} correos vuelven a la cola.", messages.SUCCESS)
+    reintentar.short_description = "Reintentar envío"
+
+
+@admin.register(AlertaOficio)
+class AlertaOficioAdmin(admin.ModelAdmin):
+    list_display = ('creado', 'oficio', 'tipo', 'fecha_vencimiento', 'correo')
+    list_filter = ('tipo',)
+    raw_id_fields = ('oficio', 'correo')
+    date_hierarchy = 'creado'
+
+
+@admin.register(ExportacionOficios)
+class ExportacionOficiosAdmin(admin.ModelAdmin):
+    list_display = ('creado', 'usuario', 'formato', 'estado', 'filas', 'terminado')
+    list_filter = ('estado', 'formato')
+    raw_id_fields = ('usuario',)
+    readonly_fields = ('filas', 'error', 'terminado')
+    actions = ['regenerar']
+
+    def regenerar(self, request, queryset):
+        actualizadas = queryset.exclude(estado=ExportacionOficios.ESTADO_PROCESANDO).update(
+            estado=ExportacionOficios.ESTADO_PENDIENTE, error=''
+        )
+        self.message_user(request, f"{actualizadas} exportaciones vuelven a la cola.", messages.SUCCESS)
+    regenerar.short_description = "Volver a generar"
+
+
 @admin.register(CategoriaJuzgado)
 class CategoriaJuzgadoAdmin(SimpleHistoryAdmin):
     list_display = ('id', 'nombre', 'creado', 'actualizado')
@@ -0,0 +1,153 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AlertaOficio, CorreoSaliente, MarcaAlertas, Oficio
+
+
+# Primera corrida (sin marca): cuanto hacia atras se buscan vencidos
+VENTANA_INICIAL = timedelta(days=1)
+# Los oficios guardados desde la corrida anterior se revisan aunque su vencimiento
+# ya haya quedado detras de la marca; el margen cubre los que se guardaron
+# mientras corria la revision anterior
+MARGEN_EDICIONES = timedelta(minutes=5)
+
+
+def _anticipacion():
+    return timedelta(hours=getattr(settings, 'ALERTAS_ANTICIPACION_HORAS', 48))
+
+
+def _destinatarios_generales():
+    """Direcciones que reciben el resumen completo (p. ej. coordinacion)."""
+    return list(getattr(settings, 'ALERTAS_VENCIMIENTO_DESTINATARIOS', []))
+
+
+def _umbrales(ahora):
+    """
+    {tipo: (inicio, piso, limite)}: un oficio entra en el tipo cuando su vencimiento
+    llega a `limite`. `inicio` es la marca de la primera corrida. Los que ya estan
+    por debajo de `piso` no corresponden al tipo (un oficio ya vencido no se avisa
+    como proximo a vencer); los vencidos no tienen piso, asi una corrida despues de
+    un tiempo sin revisar recorre todo lo que vencio desde la marca.
+    """
+    return {
+        AlertaOficio.TIPO_POR_VENCER: (ahora, ahora, ahora + _anticipacion()),
+        AlertaOficio.TIPO_VENCIDO: (ahora - VENTANA_INICIAL, None, ahora),
+    }
+
+
+def _cuerpo(tipo, oficios):
+    titulo = 'Oficios vencidos' if tipo == AlertaOficio.TIPO_VENCIDO else 'Oficios proximos a vencer'
+    lineas = [f'{titulo}:', '']
+    for oficio in oficios:
+        vencimiento = timezone.localtime(oficio.fecha_vencimiento).strftime('%d/%m/%Y %H:%M')
+        numero = f' (N° {oficio.nro_oficio})' if oficio.nro_oficio else ''
+        lineas.append(f'- {oficio.codigo}{numero}: vence {vencimiento} - {oficio.get_estado_display()}')
+    return '\n'.join(lineas)
+
+
+def _asunto(tipo, cantidad, institucion=None):
+    texto = 'vencidos' if tipo == AlertaOficio.TIPO_VENCIDO else 'proximos a vencer'
+    destino = f' - {institucion.nombre}' if institucion else ''
+    return f'{cantidad} oficio(s) {texto}{destino}'
+
+
+def _procesar_tipo(tipo, inicio, piso, limite):
+    """
+    Revisa los oficios abiertos cuyo vencimiento quedo en (marca, limite], mas los
+    guardados desde la corrida anterior con el vencimiento ya detras de la marca, y
+    arma un resumen por institucion. Devuelve (alertas, correos) creados.
+    """
+    # Sin marca, la primera corrida arranca en `inicio`
+    marca, creada = MarcaAlertas.objects.select_for_update().get_or_create(tipo=tipo, defaults={'hasta': inicio})
+    desde = marca.hasta if piso is None else max(marca.hasta, piso)
+    # Ventana nueva del indice parcial de pendientes (oficio_pendiente_venc_idx)
+    condicion = Q(fecha_vencimiento__gt=desde, fecha_vencimiento__lte=limite)
+    if not creada:
+        # Cargados o editados despues de la corrida anterior (oficio_actualizado_idx):
+        # AlertaOficio evita repetir los que ya se avisaron
+        editados = Q(actualizado__gte=marca.actualizado - MARGEN_EDICIONES, fecha_vencimiento__lte=limite)
+        if piso is not None:
+            editados &= Q(fecha_vencimiento__gt=piso)
+        condicion |= editados
+
+    candidatos = list(
+        Oficio.objects
+        .filter(condicion)
+        .exclude(estado='enviado')
+        .select_related('institucion')
+        .only(
+            'id', 'codigo', 'nro_oficio', 'estado', 'fecha_vencimiento',
+            'institucion__id', 'institucion__nombre', 'institucion__email',
+        )
+        .order_by('fecha_vencimiento', 'pk')
+    )
+    if candidatos:
+        emitidas = set(
+            AlertaOficio.objects
+            .filter(tipo=tipo, oficio_id__in=[oficio.pk for oficio in candidatos])
+            .values_list('oficio_id', 'fecha_vencimiento')
+        )
+        candidatos = [
+            oficio for oficio in candidatos
+            if (oficio.pk, oficio.fecha_vencimiento) not in emitidas
+        ]
+
+    por_institucion = defaultdict(list)
+    for oficio in candidatos:
+        if oficio.institucion_id and oficio.institucion.email:
+            por_institucion[oficio.institucion].append(oficio)
+
+    correos = [
+        CorreoSaliente(
+            destinatario=institucion.email,
+            asunto=_asunto(tipo, len(oficios), institucion),
+            cuerpo=_cuerpo(tipo, oficios),
+        )
+        for institucion, oficios in por_institucion.items()
+    ]
+    if candidatos:
+        cuerpo = _cuerpo(tipo, candidatos)
+        correos.extend(
+            CorreoSaliente(destinatario=destinatario, asunto=_asunto(tipo, len(candidatos)), cuerpo=cuerpo)
+            for destinatario in _destinatarios_generales()
+        )
+    correos = CorreoSaliente.objects.bulk_create(correos)
+
+    correo_por_institucion = dict(zip(por_institucion, correos))
+    AlertaOficio.objects.bulk_create(
+        [
+            AlertaOficio(
+                oficio=oficio,
+                tipo=tipo,
+                fecha_vencimiento=oficio.fecha_vencimiento,
+                correo=correo_por_institucion.get(oficio.institucion) if oficio.institucion_id else None,
+            )
+            for oficio in candidatos
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+    marca.hasta = max(marca.hasta, limite)
+    marca.save(update_fields=['hasta', 'actualizado'])
+    return len(candidatos), len(correos)
+
+
+def procesar_alertas(ahora=None):
+    """
+    Emite las alertas de vencimiento pendientes (proximos a vencer y vencidos) como
+    resumenes por institucion en la cola de correos. Cada tipo corre en su propia
+    transaccion con la marca bloqueada, asi dos corridas simultaneas no duplican.
+    Devuelve {tipo: (alertas, correos)}.
+    """
+    ahora = ahora or timezone.now()
+    resultado = {}
+    for tipo, (inicio, piso, limite) in _umbrales(ahora).items():
+        with transaction.atomic():
+            resultado[tipo] = _procesar_tipo(tipo, inicio, piso, limite)
+    return resultado
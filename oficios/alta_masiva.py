@@ -0,0 +1,101 @@
+from django.db import transaction
+from simple_history.utils import bulk_create_with_history
+
+from casos.models import Caso
+from core import archivos, versiones
+from core.codigos import reservar_codigos
+from reportes.models import ResumenDiarioOficio
+from .models import MovimientoOficio, Oficio, TextoArchivosOficio
+
+
+def guardar_pdf_compartido(archivo, storage=None):
+    """
+    Guarda el PDF una sola vez por contenido (core.archivos) y devuelve el nombre
+    en el storage. Si el mismo contenido ya fue subido, reutiliza el archivo.
+    """
+    storage = storage or Oficio._meta.get_field('archivo_pdf').storage
+    return archivos.guardar(archivo, storage)
+
+
+def crear_oficios_por_institucion(base, instituciones, usuario, archivo=None):
+    """
+    Crea una copia del oficio `base` (sin guardar, tal como sale de OficioForm) por
+    cada institucion, dentro de una sola transaccion:
+
+    - valida y calcula el vencimiento una vez sobre `base`;
+    - reserva todos los codigos con un unico UPDATE del contador;
+    - guarda el PDF una sola vez y lo comparte entre todas las copias;
+    - inserta oficios, historial y movimientos iniciales con bulk_create;
+    - actualiza contadores del caso y el resumen de reportes con un numero fijo de consultas.
+
+    Devuelve la lista de oficios creados, en el orden de `instituciones`.
+    """
+    instituciones = list(instituciones)
+    if not instituciones:
+        return []
+
+    with transaction.atomic():
+        base.usuario = usuario
+        base._normalizar_campos()
+        base._validar()
+        if base.plazo_horas or getattr(base, '_fecha_vencimiento_manual', None) is not None:
+            base.fecha_vencimiento = base._resolver_fecha_vencimiento()
+
+        nombre_pdf = guardar_pdf_compartido(archivo) if archivo is not None else None
+        codigos = reservar_codigos('OF', base._anio_codigo(), cantidad=len(instituciones), modelo=Oficio)
+
+        valores = {
+            field.attname: getattr(base, field.attname)
+            for field in Oficio._meta.concrete_fields
+            if not field.primary_key and field.attname not in ('archivo_pdf', 'codigo', 'institucion_id')
+        }
+        # Se resuelve una sola vez y se comparte (lo usa el texto de busqueda)
+        juzgado = base.juzgado if base.juzgado_id else None
+        oficios = []
+        for institucion, codigo in zip(instituciones, codigos):
+            obj = Oficio(**valores)
+            obj.codigo = codigo
+            obj.institucion = institucion
+            obj.juzgado = juzgado
+            obj.texto_busqueda = obj.componer_texto_busqueda()
+            if nombre_pdf:
+                obj.archivo_pdf.name = nombre_pdf
+            oficios.append(obj)
+
+        oficios = bulk_create_with_history(oficios, Oficio, default_user=usuario)
+        if nombre_pdf:
+            archivos.ajustar_referencias({nombre_pdf: len(oficios)})
+            TextoArchivosOficio.marcar(obj.pk for obj in oficios)
+
+        MovimientoOficio.objects.bulk_create([
+            MovimientoOficio(
+                oficio=obj,
+                usuario=usuario,
+                estado_anterior=None,
+                estado_nuevo='cargado',
+                validado_coord=obj.validado_coord,
+                validado_director=obj.validado_director,
+                detalle='OFICIO CREADO',
+                institucion=obj.institucion,
+            )
+            for obj in oficios
+        ])
+
+        for obj in oficios:
+            obj._guardar_snapshot()
+            obj._archivos_cargados = {'archivo_pdf': nombre_pdf or ''}
+
+        Caso.ajustar_contadores(
+            base.caso_id,
+            total=len(oficios),
+            pendientes=sum(1 for obj in oficios if obj.estado != 'enviado'),
+        )
+
+        deltas_resumen = {}
+        for obj in oficios:
+            clave = obj._clave_resumen(obj._valores_cargados)
+            deltas_resumen[clave] = deltas_resumen.get(clave, 0) + 1
+        ResumenDiarioOficio.ajustar(deltas_resumen)
+        versiones.invalidar_datos(versiones.OFICIOS)
+
+    return oficios
@@ -0,0 +1,218 @@
+import hashlib
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Count, Max
+from django.http import Http404, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views import View
+
+from core import versiones
+from core.autocompletar import AutocompletarView
+from core.paginacion import CursorPaginator, OrdenNoSoportado, PARAMETRO, claves_de_orden
+from .filters import OficioFilter
+from .models import Institucion, Juzgado, MovimientoOficio, Oficio, Respuesta
+
+
+LIMITE_POR_DEFECTO = 50
+LIMITE_MAXIMO = 200
+
+
+class ApiError(Exception):
+    pass
+
+
+class ApiLecturaView(LoginRequiredMixin, View):
+    """
+    Base de la API de solo lectura: `fields=` elige las columnas (se piden solo
+    esas con values()), `cursor=` pagina por cursor y `limite=` fija el tamaño de
+    pagina. Cada respuesta lleva un ETag; si el cliente lo reenvia en
+    If-None-Match y nada cambio, se responde 304 sin leer las filas.
+    """
+    raise_exception = True
+    modelo = None
+    # Columna que une las filas al oficio de la URL (`pk`); None si no dependen de uno
+    filtro_oficio = None
+    orden = ()
+    # Columna que se mueve con altas y ediciones
+    campo_marca = 'actualizado'
+    # {nombre en la API: ruta ORM}
+    campos = {}
+    campos_por_defecto = ()
+
+    def get_queryset(self):
+        queryset = self.modelo.objects.all()
+        if self.filtro_oficio:
+            queryset = queryset.filter(**{self.filtro_oficio: self.kwargs['pk']})
+        if self.orden:
+            queryset = queryset.order_by(*self.orden)
+        return queryset
+
+    def get_marca(self, queryset):
+        """
+        Valores que cambian cuando cambia el resultado (se usan para el ETag). Una
+        consulta: altas y ediciones mueven el maximo, las bajas el total. La version
+        de datos cubre los cambios masivos que no tocan `campo_marca`.
+        """
+        totales = queryset.order_by().aggregate(ultimo=Max(self.campo_marca), total=Count('pk'))
+        # Sin filas: se distingue un oficio sin registros de uno que no existe
+        if self.filtro_oficio and not totales['total'] and not Oficio.objects.filter(pk=self.kwargs['pk']).exists():
+            raise Http404
+        return totales['ultimo'], totales['total'], versiones.version_datos(versiones.OFICIOS)
+
+    def _campos_pedidos(self):
+        pedido = self.request.GET.get('fields', '').strip()
+        if not pedido:
+            return list(self.campos_por_defecto)
+        nombres = [nombre.strip() for nombre in pedido.split(',') if nombre.strip()]
+        desconocidos = [nombre for nombre in nombres if nombre not in self.campos]
+        if desconocidos:
+            raise ApiError(f"Campos desconocidos: {', '.join(desconocidos)}.")
+        return nombres
+
+    def _limite(self):
+        try:
+            limite = int(self.request.GET.get('limite', LIMITE_POR_DEFECTO))
+        except (TypeError, ValueError):
+            raise ApiError('limite debe ser un numero.')
+        return max(1, min(limite, LIMITE_MAXIMO))
+
+    def _etag(self, marca):
+        base = '|'.join(str(valor) for valor in (self.request.get_full_path(), *marca))
+        return quote_etag(hashlib.md5(base.encode('utf-8')).hexdigest())
+
+    def proyectar(self, queryset, nombres, claves=()):
+        # Las columnas de la clave del cursor se leen aunque no se pidan
+        rutas = {self.campos[nombre] for nombre in nombres}
+        rutas.update(clave.campo.attname for clave in claves)
+        return queryset.values(*rutas)
+
+    def fila(self, registro, nombres):
+        return {nombre: registro[self.campos[nombre]] for nombre in nombres}
+
+    def datos(self, queryset, nombres, limite):
+        paginator = CursorPaginator(queryset, limite)
+        paginator.object_list = self.proyectar(queryset, nombres, paginator.claves)
+        pagina = paginator.page(self.request.GET.get(PARAMETRO))
+        return {
+            'resultados': [self.fila(registro, nombres) for registro in pagina.object_list],
+            'siguiente': pagina.cursor_siguiente,
+            'anterior': pagina.cursor_anterior,
+        }
+
+    def get(self, request, *args, **kwargs):
+        try:
+            nombres = self._campos_pedidos()
+            limite = self._limite()
+        except ApiError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+        queryset = self.get_queryset()
+        etag = self._etag(self.get_marca(queryset))
+        respuesta = get_conditional_response(request, etag=etag)
+        if respuesta is None:
+            respuesta = JsonResponse(self.datos(queryset, nombres, limite))
+        respuesta['ETag'] = etag
+        # Siempre revalidar: el ETag hace barato el sondeo
+        patch_cache_control(respuesta, private=True, no_cache=True)
+        return respuesta
+
+
+class OficioAPIView(ApiLecturaView):
+    """Oficios con los mismos filtros que el listado (OficioFilter)."""
+    modelo = Oficio
+    campos = {
+        'id': 'id',
+        'codigo': 'codigo',
+        'nro_oficio': 'nro_oficio',
+        'denuncia': 'denuncia',
+        'legajo': 'legajo',
+        'estado': 'estado',
+        'fecha_emision': 'fecha_emision',
+        'plazo_horas': 'plazo_horas',
+        'plazo_unidad': 'plazo_unidad',
+        'fecha_vencimiento': 'fecha_vencimiento',
+        'fecha_envio': 'fecha_envio',
+        'caratula': 'caratula_oficio',
+        'validado_coord': 'validado_coord',
+        'validado_director': 'validado_director',
+        'incompetencia': 'incompetencia',
+        'institucion': 'institucion_id',
+        'institucion_nombre': 'institucion__nombre',
+        'juzgado': 'juzgado_id',
+        'juzgado_nombre': 'juzgado__nombre',
+        'caso': 'caso_id',
+        'caso_codigo': 'caso__codigo',
+        'creado': 'creado',
+        'actualizado': 'actualizado',
+    }
+    campos_por_defecto = (
+        'id', 'codigo', 'nro_oficio', 'estado', 'fecha_emision', 'fecha_vencimiento',
+        'institucion', 'institucion_nombre', 'juzgado', 'juzgado_nombre', 'caso', 'actualizado',
+    )
+
+    def get_queryset(self):
+        filterset = OficioFilter(self.request.GET, queryset=super().get_queryset())
+        queryset = filterset.ordenar(filterset.qs)
+        try:
+            claves_de_orden(queryset)
+        except OrdenNoSoportado:
+            # Con busqueda el orden por relevancia no se puede recorrer por cursor
+            queryset = queryset.order_by(*OficioFilter.ORDEN)
+        return queryset
+
+
+class OficioDetalleAPIView(ApiLecturaView):
+    modelo = Oficio
+    filtro_oficio = 'pk'
+    campos = OficioAPIView.campos
+    campos_por_defecto = tuple(OficioAPIView.campos)
+
+    def datos(self, queryset, nombres, limite):
+        return self.fila(self.proyectar(queryset, nombres).get(), nombres)
+
+
+class OficioMovimientosAPIView(ApiLecturaView):
+    modelo = MovimientoOficio
+    filtro_oficio = 'oficio_id'
+    orden = ('-fecha_creacion', '-id')
+    campo_marca = 'fecha_creacion'
+    campos = {
+        'id': 'id',
+        'fecha_creacion': 'fecha_creacion',
+        'estado_anterior': 'estado_anterior',
+        'estado_nuevo': 'estado_nuevo',
+        'detalle': 'detalle',
+        'validado_coord': 'validado_coord',
+        'validado_director': 'validado_director',
+        'institucion': 'institucion_id',
+        'institucion_nombre': 'institucion__nombre',
+        'usuario': 'usuario__username',
+    }
+    campos_por_defecto = ('id', 'fecha_creacion', 'estado_anterior', 'estado_nuevo', 'detalle', 'institucion_nombre')
+
+
+class OficioRespuestasAPIView(ApiLecturaView):
+    modelo = Respuesta
+    filtro_oficio = 'id_oficio_id'
+    orden = ('-fecha_hora', '-creacion', '-id')
+    campo_marca = 'modificacion'
+    campos = {
+        'id': 'id',
+        'fecha_hora': 'fecha_hora',
+        'respuesta': 'respuesta',
+        'institucion': 'id_institucion_id',
+        'institucion_nombre': 'id_institucion__nombre',
+        'usuario': 'id_usuario__username',
+        'creacion': 'creacion',
+        'modificacion': 'modificacion',
+    }
+    campos_por_defecto = ('id', 'fecha_hora', 'respuesta', 'institucion_nombre', 'modificacion')
+
+
+class InstitucionAutocompletarView(AutocompletarView):
+    model = Institucion
+
+
+class JuzgadoAutocompletarView(AutocompletarView):
+    model = Juzgado
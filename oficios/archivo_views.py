@@ -0,0 +1,56 @@
+from django.core.files.storage import default_storage
+from django.http import Http404
+
+from core.descargas import DescargaArchivoView
+from core.models import ContenidoPDF
+from .models import MovimientoOficio, Oficio, Respuesta
+
+
+class OficioPDFView(DescargaArchivoView):
+    model = Oficio
+    campo = 'archivo_pdf'
+
+    def get_queryset(self):
+        return Oficio.objects.only('pk', 'archivo_pdf', 'codigo')
+
+    def nombre_descarga(self, obj, nombre):
+        return f'{obj.codigo or obj.pk}.pdf'
+
+
+class OficioMiniaturaView(OficioPDFView):
+    """Miniatura PNG de la primera pagina del PDF del oficio (ver core/pdf.py)."""
+    content_type = 'image/png'
+
+    def archivo_de(self, obj):
+        miniatura = ContenidoPDF.objects.filter(
+            archivo__nombre=obj.archivo_pdf.name or '',
+            estado=ContenidoPDF.ESTADO_LISTO,
+        ).exclude(miniatura='').values_list('miniatura', flat=True).first()
+        if not miniatura:
+            raise Http404('El PDF todavía no tiene miniatura.')
+        return default_storage, miniatura
+
+    def nombre_descarga(self, obj, nombre):
+        return f'{obj.codigo or obj.pk}.png'
+
+
+class MovimientoPDFView(DescargaArchivoView):
+    model = MovimientoOficio
+    campo = 'archivo_pdf'
+
+    def get_queryset(self):
+        return MovimientoOficio.objects.select_related('oficio').only('pk', 'archivo_pdf', 'oficio__codigo')
+
+    def nombre_descarga(self, obj, nombre):
+        return f'{obj.oficio.codigo or obj.oficio_id}-movimiento-{obj.pk}.pdf'
+
+
+class RespuestaPDFView(DescargaArchivoView):
+    model = Respuesta
+    campo = 'respuesta_pdf'
+
+    def get_queryset(self):
+        return Respuesta.objects.select_related('id_oficio').only('pk', 'respuesta_pdf', 'id_oficio__codigo')
+
+    def nombre_descarga(self, obj, nombre):
+        return f'{obj.id_oficio.codigo or obj.id_oficio_id}-respuesta-{obj.pk}.pdf'
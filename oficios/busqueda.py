@@ -0,0 +1,23 @@
+from django.db.models import Exists, OuterRef
+
+from core.texto import filtrar_por_texto
+
+from .models import TextoArchivosOficio
+
+
+def _en_archivos(termino):
+    # Texto de los PDF del oficio (oficios/texto_archivos.py), fuera de texto_busqueda
+    # para que los listados no lo lean
+    return Exists(TextoArchivosOficio.objects.filter(oficio_id=OuterRef('pk'), texto__contains=termino))
+
+
+def buscar_oficios(queryset, valor):
+    """
+    Filtra por Oficio.texto_busqueda: cada termino debe aparecer en algun campo
+    (codigo, numero, denuncia, legajo, caratula, institucion o juzgado) o en el
+    texto de sus PDF (TextoArchivosOficio), y se anota `relevancia` (ver
+    core.texto.filtrar_por_texto).
+
+    En PostgreSQL usa los indices GIN de trigramas de las migraciones 0038 y 0049.
+    """
+    return filtrar_por_texto(queryset, valor, adicional=_en_archivos)
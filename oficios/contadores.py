@@ -0,0 +1,36 @@
+from django.core.paginator import Paginator
+from django.db.models import Count, Q
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+
+def contar_oficios(queryset, now=None):
+    """
+    Calcula en una sola consulta los totales que muestran los listados de oficios:
+    total general, vencidos (no enviados) y cantidad por estado.
+    """
+    now = now or timezone.now()
+    return queryset.order_by().aggregate(
+        total_oficios=Count('id'),
+        total_vencidos=Count('id', filter=Q(fecha_vencimiento__lt=now) & ~Q(estado='enviado')),
+        total_asignados=Count('id', filter=Q(estado='asignado')),
+        total_respondidos=Count('id', filter=Q(estado='respondido')),
+        total_enviados=Count('id', filter=Q(estado='enviado')),
+    )
+
+
+class ContadorPaginator(Paginator):
+    """
+    Paginator que reutiliza un total ya calculado (por ejemplo con contar_oficios)
+    en lugar de lanzar su propio COUNT(*).
+    """
+
+    def __init__(self, object_list, per_page, total=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._total = total
+
+    @cached_property
+    def count(self):
+        if self._total is not None:
+            return self._total
+        return super().count
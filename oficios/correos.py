@@ -0,0 +1,138 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import CorreoSaliente
+
+
+MAX_INTENTOS = 5
+# Espera antes del reintento n: 1, 2, 4, 8... minutos, con tope de una hora
+ESPERA_BASE = timedelta(minutes=1)
+ESPERA_MAXIMA = timedelta(hours=1)
+# Tiempo que un lote queda reservado para un worker; si el proceso muere,
+# los correos vuelven a estar disponibles pasado este plazo
+RESERVA = timedelta(minutes=10)
+
+
+def _remitente():
+    return getattr(settings, 'DEFAULT_FROM_EMAIL', None) or getattr(settings, 'EMAIL_HOST_USER', None)
+
+
+def encolar(destinatario, asunto, cuerpo='', adjunto='', oficio=None, nombre_adjunto=''):
+    return CorreoSaliente.objects.create(
+        oficio=oficio,
+        destinatario=destinatario,
+        asunto=asunto,
+        cuerpo=cuerpo,
+        adjunto=adjunto or '',
+        nombre_adjunto=nombre_adjunto or '',
+    )
+
+
+def encolar_asignacion(oficio, institucion):
+    """Encola el aviso de asignacion a la institucion con el PDF del oficio."""
+    return encolar(
+        destinatario=institucion.email,
+        asunto=f'Oficio #{oficio.id} asignado',
+        cuerpo=(
+            f'Se asigno el oficio #{oficio.id} a la institucion {institucion.nombre}.\n'
+            f'Adjunto PDF del oficio.'
+        ),
+        adjunto=oficio.archivo_pdf.name,
+        # Mismo nombre que la descarga del PDF (OficioPDFView)
+        nombre_adjunto=f'{oficio.codigo or oficio.pk}.pdf',
+        oficio=oficio,
+    )
+
+
+def espera_reintento(intentos):
+    return min(ESPERA_BASE * (2 ** max(intentos - 1, 0)), ESPERA_MAXIMA)
+
+
+def _reservar_lote(tamano, ahora):
+    """
+    Toma hasta `tamano` correos vencidos y corre su proximo intento al final de la
+    reserva, para que otro worker no los tome mientras se envian.
+    """
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    with transaction.atomic():
+        lote = list(
+            CorreoSaliente.objects
+            .select_for_update(skip_locked=skip_locked)
+            .filter(estado=CorreoSaliente.ESTADO_PENDIENTE, proximo_intento__lte=ahora)
+            .order_by('proximo_intento', 'pk')[:tamano]
+        )
+        if lote:
+            CorreoSaliente.objects.filter(pk__in=[c.pk for c in lote]).update(proximo_intento=ahora + RESERVA)
+    return lote
+
+
+def _mensaje(correo, conexion):
+    mensaje = EmailMessage(
+        subject=correo.asunto,
+        body=correo.cuerpo,
+        from_email=_remitente(),
+        to=[correo.destinatario],
+        connection=conexion,
+    )
+    if correo.adjunto:
+        with default_storage.open(correo.adjunto, 'rb') as archivo:
+            nombre = correo.nombre_adjunto or os.path.basename(correo.adjunto)
+            mensaje.attach(nombre, archivo.read(), 'application/pdf')
+    return mensaje
+
+
+def procesar_lote(tamano=50):
+    """
+    Envia un lote de correos pendientes con una sola conexion SMTP. Los que fallan
+    se reprograman con espera exponencial hasta MAX_INTENTOS; despues quedan en
+    estado error. Devuelve (enviados, fallidos).
+    """
+    lote = _reservar_lote(tamano, timezone.now())
+    if not lote:
+        return 0, 0
+
+    enviados = fallidos = 0
+    conexion = get_connection(fail_silently=False)
+    try:
+        conexion.open()
+    except Exception as e:
+        # Sin servidor no se intenta ninguno: todo el lote se reprograma
+        conexion = None
+        error_conexion = str(e) or e.__class__.__name__
+
+    for correo in lote:
+        try:
+            if conexion is None:
+                raise ConnectionError(error_conexion)
+            _mensaje(correo, conexion).send()
+        except Exception as e:
+            fallidos += 1
+            correo.intentos += 1
+            correo.ultimo_error = str(e) or e.__class__.__name__
+            if correo.intentos >= MAX_INTENTOS:
+                correo.estado = CorreoSaliente.ESTADO_ERROR
+            else:
+                correo.proximo_intento = timezone.now() + espera_reintento(correo.intentos)
+        else:
+            enviados += 1
+            correo.intentos += 1
+            correo.estado = CorreoSaliente.ESTADO_ENVIADO
+            correo.enviado = timezone.now()
+            correo.ultimo_error = ''
+
+    if conexion is not None:
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+    CorreoSaliente.objects.bulk_update(
+        lote, ['estado', 'intentos', 'proximo_intento', 'ultimo_error', 'enviado']
+    )
+    return enviados, fallidos
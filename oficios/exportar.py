@@ -0,0 +1,163 @@
+import tempfile
+
+from django.conf import settings
+from django.core.files.base import File
+from django.db import connection, transaction
+from django.db.models import OuterRef, Subquery
+from django.http import QueryDict
+from django.utils import timezone
+
+from core import planillas
+from .filters import OficioFilter
+from .models import ExportacionOficios, MovimientoOficio, Oficio
+
+
+# Filas por consulta al recorrer el listado con un cursor de servidor
+CHUNK = 2000
+
+# (titulo, campo de values()); los campos ultimo_* salen de una subconsulta
+COLUMNAS = (
+    ('Código', 'codigo'),
+    ('N° Oficio', 'nro_oficio'),
+    ('Denuncia', 'denuncia'),
+    ('Legajo', 'legajo'),
+    ('Estado', 'estado'),
+    ('Fecha de emisión', 'fecha_emision'),
+    ('Plazo (horas)', 'plazo_horas'),
+    ('Fecha de vencimiento', 'fecha_vencimiento'),
+    ('Fecha de envío', 'fecha_envio'),
+    ('Carátula', 'caratula_oficio'),
+    ('Institución', 'institucion__nombre'),
+    ('Juzgado', 'juzgado__nombre'),
+    ('Caso', 'caso__codigo'),
+    ('Expediente', 'caso__expte'),
+    ('Último movimiento', 'ultimo_movimiento_fecha'),
+    ('Estado del último movimiento', 'ultimo_movimiento_estado'),
+    ('Detalle del último movimiento', 'ultimo_movimiento_detalle'),
+)
+
+ESTADOS = dict(Oficio.ESTADO_CHOICES)
+MOVIMIENTO_ESTADOS = dict(MovimientoOficio.ESTADO_CHOICES)
+
+
+def limite_directo():
+    """Hasta cuantas filas se exporta en la misma respuesta; por encima, en segundo plano."""
+    return getattr(settings, 'EXPORTACION_LIMITE_DIRECTO', 100000)
+
+
+def oficios_filtrados(parametros):
+    """Mismo queryset (filtros y orden) que el listado de oficios."""
+    if isinstance(parametros, str):
+        parametros = QueryDict(parametros)
+    filterset = OficioFilter(parametros, queryset=Oficio.objects.all())
+    return filterset.ordenar(filterset.qs)
+
+
+def _proyeccion(queryset):
+    ultimo = MovimientoOficio.objects.filter(oficio=OuterRef('pk')).order_by('-fecha_creacion', '-id')
+    return queryset.annotate(
+        ultimo_movimiento_fecha=Subquery(ultimo.values('fecha_creacion')[:1]),
+        ultimo_movimiento_estado=Subquery(ultimo.values('estado_nuevo')[:1]),
+        ultimo_movimiento_detalle=Subquery(ultimo.values('detalle')[:1]),
+    ).values(*(campo for _, campo in COLUMNAS))
+
+
+def _valor(campo, valor):
+    if hasattr(valor, 'tzinfo') and valor.tzinfo is not None:
+        return timezone.localtime(valor)
+    if campo == 'estado':
+        return ESTADOS.get(valor, valor)
+    if campo == 'ultimo_movimiento_estado':
+        return MOVIMIENTO_ESTADOS.get(valor, valor)
+    return valor
+
+
+def filas(queryset):
+    """Filas de la planilla, leidas de a CHUNK sin cargar el listado en memoria."""
+    for registro in _proyeccion(queryset).iterator(chunk_size=CHUNK):
+        yield [_valor(campo, registro[campo]) for _, campo in COLUMNAS]
+
+
+def encabezados():
+    return [titulo for titulo, _ in COLUMNAS]
+
+
+def contenido(queryset, formato):
+    """Bloques de bytes del archivo exportado."""
+    return planillas.generar(formato, encabezados(), filas(queryset), hoja='Oficios')
+
+
+def nombre_archivo(formato):
+    return f"oficios_{timezone.localtime():%Y%m%d_%H%M}.{formato}"
+
+
+class _Contador:
+    """Iterable de filas que cuenta las que entrega."""
+
+    def __init__(self, filas):
+        self.filas = filas
+        self.total = 0
+
+    def __iter__(self):
+        for fila in self.filas:
+            self.total += 1
+            yield fila
+
+
+def generar_exportacion(exportacion):
+    """
+    Escribe el archivo de una exportacion en segundo plano. El contenido se vuelca
+    a un temporal en disco y de ahi al storage, sin armarlo en memoria.
+    """
+    queryset = oficios_filtrados(exportacion.parametros)
+    contador = _Contador(filas(queryset))
+    bloques = planillas.generar(exportacion.formato, encabezados(), contador, hoja='Oficios')
+    with tempfile.TemporaryFile() as temporal:
+        for bloque in bloques:
+            temporal.write(bloque)
+        temporal.seek(0)
+        exportacion.archivo.save(nombre_archivo(exportacion.formato), File(temporal), save=False)
+    exportacion.filas = contador.total
+    exportacion.estado = ExportacionOficios.ESTADO_LISTA
+    exportacion.error = ''
+    exportacion.terminado = timezone.now()
+    exportacion.save(update_fields=['archivo', 'filas', 'estado', 'error', 'terminado'])
+
+
+def _tomar_pendiente():
+    """Marca como procesando la exportacion pendiente mas antigua y la devuelve."""
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    with transaction.atomic():
+        exportacion = (
+            ExportacionOficios.objects
+            .select_for_update(skip_locked=skip_locked)
+            .filter(estado=ExportacionOficios.ESTADO_PENDIENTE)
+            .order_by('creado', 'pk')
+            .first()
+        )
+        if exportacion is not None:
+            exportacion.estado = ExportacionOficios.ESTADO_PROCESANDO
+            exportacion.save(update_fields=['estado'])
+    return exportacion
+
+
+def procesar_pendientes(maximo=None):
+    """Genera las exportaciones pendientes. Devuelve (listas, con_error)."""
+    listas = con_error = 0
+    while maximo is None or listas + con_error < maximo:
+        exportacion = _tomar_pendiente()
+        if exportacion is None:
+            break
+        try:
+            generar_exportacion(exportacion)
+        except Exception as e:
+            con_error += 1
+            if exportacion.archivo:
+                exportacion.archivo.delete(save=False)
+            exportacion.estado = ExportacionOficios.ESTADO_ERROR
+            exportacion.error = str(e) or e.__class__.__name__
+            exportacion.terminado = timezone.now()
+            exportacion.save(update_fields=['archivo', 'estado', 'error', 'terminado'])
+        else:
+            listas += 1
+    return listas, con_error
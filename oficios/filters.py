@@ -1,6 +1,8 @@
 import django_filters
 from django import forms
-from django.db.models import Q
+from django.db.models import F
+from core.widgets import AutocompletarSelect
+from .busqueda import buscar_oficios
 from .models import Oficio, Institucion, Juzgado, Caratula
 from personas.models import Nino
 
@@ -64,10 +66,11 @@ class OficioFilter(django_filters.FilterSet):
         queryset=Institucion.objects.all().order_by('nombre'),
         label='Institución',
         empty_label='Todas las instituciones',
-        widget=forms.Select(attrs={
-            'class': 'form-select form-select-sm select2-search',
-            'data-placeholder': 'Buscar institución...'
-        })
+        widget=AutocompletarSelect(
+            'oficios:autocompletar_instituciones',
+            attrs={'class': 'form-select form-select-sm'},
+            placeholder='Buscar institución...',
+        )
     )
     
     juzgado = django_filters.ModelChoiceFilter(
@@ -75,22 +78,24 @@ class OficioFilter(django_filters.FilterSet):
         queryset=Juzgado.objects.all().order_by('nombre'),
         label='Juzgado',
         empty_label='Todos los juzgados',
-        widget=forms.Select(attrs={
-            'class': 'form-select form-select-sm select2-search',
-            'data-placeholder': 'Buscar juzgado...'
-        })
+        widget=AutocompletarSelect(
+            'oficios:autocompletar_juzgados',
+            attrs={'class': 'form-select form-select-sm'},
+            placeholder='Buscar juzgado...',
+        )
     )
 
     # Filtro por Niño/a relacionado vía Caso
     nino = django_filters.ModelChoiceFilter(
         field_name='caso__ninos',
-        queryset=Nino.objects.all().order_by('apellido', 'nombre') if hasattr(Nino, 'apellido') else Nino.objects.all(),
+        queryset=Nino.objects.all(),
         label='Niño/a',
         empty_label='Todos',
-        widget=forms.Select(attrs={
-            'class': 'form-select form-select-sm select2',
-            'data-placeholder': 'Seleccionar niño/a...'
-        })
+        widget=AutocompletarSelect(
+            'personas:api_ninos',
+            attrs={'class': 'form-select form-select-sm'},
+            placeholder='Buscar niño/a...',
+        )
     )
     
     
@@ -106,17 +111,21 @@ class OficioFilter(django_filters.FilterSet):
             'nino'
         ]
     
+    # Orden de los listados: vencimiento ascendente (nulos al final), luego emisión desc
+    ORDEN = (F('fecha_vencimiento').asc(nulls_last=True), '-fecha_emision')
+
     def filtro_busqueda(self, queryset, name, value):
         """
-        Filtro personalizado para búsqueda en múltiples campos
+        Búsqueda sobre el texto precalculado del oficio (número, denuncia, legajo,
+        código, carátula, institución y juzgado), sin tildes ni mayúsculas.
         """
         if value:
-            return queryset.filter(
-                Q(denuncia__icontains=value) |
-                Q(legajo__icontains=value) |
-                Q(institucion__nombre__icontains=value) |
-                Q(juzgado__nombre__icontains=value) |
-                Q(nro_oficio__icontains=value)
-            ).distinct()
+            return buscar_oficios(queryset, value)
         return queryset
+
+    def ordenar(self, queryset):
+        """Aplica el orden de los listados; con búsqueda, primero por relevancia."""
+        if 'relevancia' in queryset.query.annotations:
+            return queryset.order_by('-relevancia', *self.ORDEN)
+        return queryset.order_by(*self.ORDEN)
     
@@ -1,5 +1,10 @@
+from datetime import timedelta
+
 from django import forms
 from django.utils import timezone
+
+from core.calendario import dias_no_habiles
+from core.widgets import AutocompletarSelect, AutocompletarSelectMultiple
 from .models import (
     Oficio, Institucion, Caratula, Juzgado, CaratulaOficio
 )
@@ -16,11 +21,13 @@ class OficioForm(forms.ModelForm):
         label='Unidad de plazo',
         widget=forms.Select(attrs={'class': 'form-control'})
     )
+    # Lo marca el formulario (JS) cuando el usuario escribe el vencimiento a mano
+    vencimiento_manual = forms.BooleanField(required=False, widget=forms.HiddenInput())
     instituciones = forms.ModelMultipleChoiceField(
         queryset=Institucion.objects.all().order_by('nombre'),
         required=False,
         label='Instituciones',
-        widget=forms.SelectMultiple(attrs={'class': 'form-control'})
+        widget=AutocompletarSelectMultiple('oficios:autocompletar_instituciones', attrs={'class': 'form-control'})
     )
 
     class Meta:
@@ -44,7 +51,7 @@ class OficioForm(forms.ModelForm):
             'denuncia': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ej: Denuncia 5678'}),
             'legajo': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Ej: Legajo 9012'}),
             'plazo_horas': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Horas de plazo (opcional)'}),
-            'juzgado': forms.Select(attrs={'class': 'form-control'}),
+            'juzgado': AutocompletarSelect('oficios:autocompletar_juzgados', attrs={'class': 'form-control'}),
             'archivo_pdf': forms.FileInput(attrs={'class': 'form-control', 'accept': '.pdf'}),
             'caso': forms.HiddenInput(),
         }
@@ -72,6 +79,12 @@ class OficioForm(forms.ModelForm):
         if not self.instance.pk:
             local_now = timezone.localtime(timezone.now())
             self.initial['fecha_emision'] = local_now.strftime('%Y-%m-%dT%H:%M')
+        if self.instance.pk:
+            # El plazo en dias se guarda en horas: mostrarlo en la unidad elegida
+            self.initial['plazo_unidad'] = self.instance.plazo_unidad
+            self.initial['vencimiento_manual'] = self.instance.vencimiento_manual
+            if self.instance.plazo_unidad == 'dias' and self.instance.plazo_horas:
+                self.initial['plazo_horas'] = self.instance.plazo_horas // 24
         self.initial.setdefault('plazo_unidad', 'dias')
         self.initial.setdefault('plazo_horas', 5)
         if self.instance.pk and self.instance.fecha_vencimiento:
@@ -90,8 +103,8 @@ class OficioForm(forms.ModelForm):
         self.fields['caratula_oficio'].required = False
         self.fields['archivo_pdf'].required = False
         if (
-            (self.is_bound and self.data.get('fecha_vencimiento'))
-            or (self.instance.pk and self.instance.fecha_vencimiento)
+            (self.is_bound and self.data.get('vencimiento_manual') in ('True', 'true', '1', 'on'))
+            or (not self.is_bound and self.instance.pk and self.instance.vencimiento_manual)
         ):
             self.fields['fecha_vencimiento'].widget.attrs['data-manual'] = 'true'
 
@@ -122,6 +135,15 @@ class OficioForm(forms.ModelForm):
             existing = field.widget.attrs.get('class', '')
             field.widget.attrs['class'] = (existing + ' form-control').strip()
 
+    def dias_no_habiles(self):
+        """Feriados y cierres (de lunes a viernes) de un año atras a un año adelante, para la vista previa."""
+        hoy = timezone.localdate()
+        return [
+            fecha.isoformat()
+            for fecha in dias_no_habiles(hoy - timedelta(days=366), hoy + timedelta(days=366))
+            if fecha.weekday() < 5
+        ]
+
     def clean(self):
         cleaned = super().clean()
         # No exigir instituciones: permitir crear sin institucion
@@ -133,8 +155,14 @@ class OficioForm(forms.ModelForm):
 
     def save(self, commit=True):
         instance = super().save(commit=False)
-        instance._plazo_unidad = self.cleaned_data.get('plazo_unidad') or 'horas'
-        instance._fecha_vencimiento_manual = self.cleaned_data.get('fecha_vencimiento')
+        instance.plazo_unidad = self.cleaned_data.get('plazo_unidad') or 'horas'
+        fecha_vencimiento = self.cleaned_data.get('fecha_vencimiento')
+        # Sin plazo, la fecha escrita es la unica fuente del vencimiento
+        manual = bool(fecha_vencimiento) and (
+            self.cleaned_data.get('vencimiento_manual') or not self.cleaned_data.get('plazo_horas')
+        )
+        instance.vencimiento_manual = manual
+        instance._fecha_vencimiento_manual = fecha_vencimiento if manual else None
         if commit:
             instance.save()
             self.save_m2m()
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from oficios.alertas import procesar_alertas
+from oficios.models import AlertaOficio
+
+
+class Command(BaseCommand):
+    help = (
+        'Encola resumenes por institucion de los oficios que pasaron a estar proximos '
+        'a vencer o vencidos desde la corrida anterior.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Sigue corriendo y revisa cada --espera segundos.',
+        )
+        parser.add_argument('--espera', type=float, default=300, help='Segundos entre corridas (con --continuo).')
+
+    def handle(self, *args, **options):
+        nombres = dict(AlertaOficio.TIPO_CHOICES)
+        while True:
+            for tipo, (alertas, correos) in procesar_alertas().items():
+                self.stdout.write(f'{nombres[tipo]}: {alertas} oficios, {correos} correos encolados.')
+            if not options['continuo']:
+                break
+            time.sleep(options['espera'])
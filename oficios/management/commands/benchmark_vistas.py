@@ -0,0 +1,186 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.db.models import F
+from django.utils import timezone
+
+from oficios.models import Institucion, Juzgado, MovimientoOficio, Oficio, Respuesta
+from reportes.resumen import reconstruir as reconstruir_resumen
+
+
+# (nombre, url_name, kwargs o funcion(oficio) -> kwargs, querystring)
+ESCENARIOS = [
+    ('Listado de oficios', 'oficios:list', {}, ''),
+    ('Listado filtrado por texto', 'oficios:list', {}, 'busqueda=institucion 1'),
+    ('Listado buscando un numero', 'oficios:list', {}, 'busqueda=4242/'),
+    ('Listado por estado', 'oficios:list_by_estado', {'estado': 'asignado'}, ''),
+    ('Detalle de oficio (300 movimientos)', 'oficios:detail', lambda oficio: {'pk': oficio.pk}, ''),
+    ('Tablero de reportes', 'reportes:dashboard', {}, ''),
+    ('Tablero de reportes (rango)', 'reportes:dashboard', {}, 'desde=2000-01-01&hasta=2099-12-31'),
+]
+
+_ORDEN_LISTADO = (F('fecha_vencimiento').asc(nulls_last=True), '-fecha_emision')
+
+# Consultas de vistas que dependen del sector del usuario o de un oficio puntual
+# (nombre, funcion(oficio) -> queryset)
+CONSULTAS = [
+    ('Listado: primera pagina', lambda oficio: Oficio.objects.order_by(*_ORDEN_LISTADO)[:20]),
+    ('Listado por estado: primera pagina', lambda oficio: (
+        Oficio.objects.filter(estado='asignado').order_by(*_ORDEN_LISTADO)[:20]
+    )),
+    ('Inicio: respondidos sin validar', lambda oficio: (
+        Oficio.objects.filter(estado='respondido', validado_coord=False, validado_director=False)
+        .order_by('-creado')[:8]
+    )),
+    ('Inicio: cargados', lambda oficio: Oficio.objects.filter(estado='cargado').order_by('-creado')[:8]),
+    ('Pendientes vencidos', lambda oficio: (
+        Oficio.objects.filter(fecha_vencimiento__lt=timezone.now()).exclude(estado='enviado').order_by('fecha_vencimiento')[:20]
+    )),
+    ('Detalle: movimientos del oficio', lambda oficio: MovimientoOficio.objects.filter(oficio=oficio)[:50]),
+    ('Detalle: respuestas del oficio', lambda oficio: Respuesta.objects.filter(id_oficio=oficio)[:50]),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Carga oficios sinteticos dentro de una transaccion, mide consultas SQL y '
+        'tiempo por request de las vistas principales y descarta los datos al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--oficios', type=int, default=2000, help='Cantidad de oficios sinteticos.')
+        parser.add_argument('--repeticiones', type=int, default=5, help='Requests por escenario.')
+        parser.add_argument(
+            '--explain',
+            action='store_true',
+            help='Muestra el plan de ejecucion (EXPLAIN) de cada consulta medida.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._cargar_datos(options['oficios'])
+                self._medir(options['repeticiones'], options['explain'])
+                self._medir_consultas(options['repeticiones'], options['explain'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _cargar_datos(self, cantidad):
+        User = get_user_model()
+        self.usuario = User.objects.create_user(username='benchmark_vistas', password='x')
+        instituciones = Institucion.objects.bulk_create(
+            [Institucion(nombre=f'INSTITUCION {i}') for i in range(20)]
+        )
+        juzgados = Juzgado.objects.bulk_create(
+            [Juzgado(nombre=f'JUZGADO {i}') for i in range(10)]
+        )
+        estados = [clave for clave, _ in Oficio.ESTADO_CHOICES]
+        ahora = timezone.now()
+        anio = timezone.localtime(ahora).year
+        oficios = []
+        for i in range(cantidad):
+            emision = ahora - timedelta(days=random.randint(0, 365))
+            oficio = Oficio(
+                codigo=f'BM-{i:07d}',
+                nro_oficio=f'{i}/{anio}',
+                estado=random.choice(estados),
+                institucion=random.choice(instituciones),
+                juzgado=random.choice(juzgados),
+                fecha_emision=emision,
+                fecha_vencimiento=emision + timedelta(days=random.randint(1, 30)),
+                validado_coord=random.random() < 0.5,
+                validado_director=random.random() < 0.3,
+            )
+            oficio.texto_busqueda = oficio.componer_texto_busqueda()
+            oficios.append(oficio)
+        oficios = Oficio.objects.bulk_create(oficios, batch_size=1000)
+        movimientos = []
+        respuestas = []
+        for oficio in oficios:
+            for _ in range(3):
+                movimientos.append(MovimientoOficio(
+                    oficio=oficio, estado_nuevo=random.choice(estados), institucion_id=oficio.institucion_id,
+                ))
+            if random.random() < 0.5:
+                respuestas.append(Respuesta(
+                    id_oficio=oficio, respuesta='RESPUESTA', fecha_hora=oficio.fecha_emision + timedelta(days=1),
+                ))
+        # Un oficio con historial largo para medir el detalle
+        self.oficio_muestra = random.choice(oficios)
+        movimientos.extend(
+            MovimientoOficio(oficio=self.oficio_muestra, estado_nuevo=random.choice(estados), usuario=self.usuario)
+            for _ in range(300)
+        )
+        MovimientoOficio.objects.bulk_create(movimientos, batch_size=1000)
+        Respuesta.objects.bulk_create(respuestas, batch_size=1000)
+        # Estadisticas frescas para que el planificador elija indices como en produccion
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        # bulk_create no pasa por save(): el resumen de reportes se arma de una vez
+        reconstruir_resumen()
+        self.stdout.write(
+            f'Datos sinteticos: {cantidad} oficios, {len(movimientos)} movimientos, '
+            f'{len(respuestas)} respuestas.'
+        )
+
+    def _explain(self, sql):
+        prefijo = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefijo + sql)
+            return '\n'.join(' '.join(str(col) for col in fila) for fila in cursor.fetchall())
+
+    def _escribir_plan(self, plan):
+        for linea in plan.splitlines():
+            self.stdout.write(f'        {linea}')
+
+    def _medir(self, repeticiones, explain=False):
+        client = Client()
+        client.force_login(self.usuario)
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for nombre, url_name, kwargs, querystring in ESCENARIOS:
+                if callable(kwargs):
+                    kwargs = kwargs(self.oficio_muestra)
+                url = reverse(url_name, kwargs=kwargs)
+                if querystring:
+                    url = f'{url}?{querystring}'
+                consultas = 0
+                inicio = time.perf_counter()
+                for _ in range(repeticiones):
+                    # Con muchos datos el log de consultas (acotado) ya esta lleno
+                    reset_queries()
+                    with CaptureQueriesContext(connection) as ctx:
+                        response = client.get(url)
+                    consultas = len(ctx.captured_queries)
+                duracion = (time.perf_counter() - inicio) * 1000 / repeticiones
+                self.stdout.write(
+                    f'{nombre:<35} status={response.status_code} '
+                    f'consultas={consultas:<4} tiempo={duracion:.1f} ms'
+                )
+                if explain:
+                    for query in ctx.captured_queries:
+                        if not query['sql'].lstrip().upper().startswith('SELECT'):
+                            continue
+                        self.stdout.write(f"    [{float(query['time']) * 1000:.1f} ms] {query['sql'][:150]}")
+                        self._escribir_plan(self._explain(query['sql']))
+
+    def _medir_consultas(self, repeticiones, explain=False):
+        for nombre, consulta in CONSULTAS:
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                filas = len(list(consulta(self.oficio_muestra)))
+            duracion = (time.perf_counter() - inicio) * 1000 / repeticiones
+            self.stdout.write(f'{nombre:<35} filas={filas:<5} tiempo={duracion:.2f} ms')
+            if explain:
+                self._escribir_plan(consulta(self.oficio_muestra).explain())
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from oficios.correos import procesar_lote
+
+
+class Command(BaseCommand):
+    help = (
+        'Envia los correos pendientes de la cola (CorreoSaliente) por lotes, con una '
+        'conexion SMTP por lote y reintentos con espera exponencial.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50, help='Correos por lote.')
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Sigue corriendo y revisa la cola cada --espera segundos.',
+        )
+        parser.add_argument('--espera', type=float, default=10, help='Segundos entre revisiones (con --continuo).')
+
+    def handle(self, *args, **options):
+        total_enviados = total_fallidos = 0
+        while True:
+            # Drenar lo que haya vencido antes de esperar
+            while True:
+                enviados, fallidos = procesar_lote(options['lote'])
+                total_enviados += enviados
+                total_fallidos += fallidos
+                if enviados or fallidos:
+                    self.stdout.write(f'Lote: {enviados} enviados, {fallidos} con error.')
+                if enviados + fallidos < options['lote']:
+                    break
+            if not options['continuo']:
+                break
+            time.sleep(options['espera'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_enviados} correos enviados, {total_fallidos} con error.'
+        ))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from oficios.exportar import procesar_pendientes
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera los archivos de las exportaciones de oficios pendientes (las que superan '
+        'EXPORTACION_LIMITE_DIRECTO filas y no se envian en la misma respuesta).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Sigue corriendo y revisa las pendientes cada --espera segundos.',
+        )
+        parser.add_argument('--espera', type=float, default=30, help='Segundos entre revisiones (con --continuo).')
+
+    def handle(self, *args, **options):
+        total_listas = total_error = 0
+        while True:
+            listas, con_error = procesar_pendientes()
+            total_listas += listas
+            total_error += con_error
+            if listas or con_error:
+                self.stdout.write(f'{listas} exportaciones generadas, {con_error} con error.')
+            if not options['continuo']:
+                break
+            time.sleep(options['espera'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_listas} exportaciones generadas, {total_error} con error.'
+        ))
@@ -0,0 +1,50 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from core.pdf import procesar_lote
+from oficios.texto_archivos import indexar_pendientes, marcar_por_archivos
+
+
+class Command(BaseCommand):
+    help = (
+        'Procesa los PDF subidos (paginas, texto y miniatura) en un pool de procesos y '
+        'actualiza el texto de busqueda de los oficios que los usan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--procesos', type=int, default=2, help='Procesos del pool de extraccion.')
+        parser.add_argument('--lote', type=int, default=10, help='PDFs por lote.')
+        parser.add_argument(
+            '--continuo',
+            action='store_true',
+            help='Sigue corriendo y revisa la cola cada --espera segundos.',
+        )
+        parser.add_argument('--espera', type=float, default=10, help='Segundos entre revisiones (con --continuo).')
+
+    def handle(self, *args, **options):
+        total_listos = total_fallidos = total_indexados = 0
+        with ProcessPoolExecutor(max_workers=options['procesos']) as ejecutor:
+            while True:
+                # Drenar lo que haya vencido antes de esperar
+                while True:
+                    listos, fallidos = procesar_lote(options['lote'], ejecutor)
+                    total_listos += len(listos)
+                    total_fallidos += fallidos
+                    if listos or fallidos:
+                        self.stdout.write(f'Lote: {len(listos)} procesados, {fallidos} con error.')
+                    marcar_por_archivos(listos)
+                    if len(listos) + fallidos < options['lote']:
+                        break
+                while True:
+                    indexados = indexar_pendientes()
+                    total_indexados += indexados
+                    if not indexados:
+                        break
+                if not options['continuo']:
+                    break
+                time.sleep(options['espera'])
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_listos} PDFs procesados, {total_fallidos} con error, {total_indexados} oficios reindexados.'
+        ))
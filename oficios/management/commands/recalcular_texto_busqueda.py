@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from oficios.models import Oficio
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula el texto de busqueda normalizado de los oficios (codigo, numero, '
+        'denuncia, legajo, caratula, institucion y juzgado).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Oficios por lote.')
+
+    def handle(self, *args, **options):
+        actualizados = Oficio.recalcular_texto_busqueda(Oficio.objects.all(), batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{actualizados} oficios actualizados.'))
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from oficios.models import Oficio
+
+
+def _fecha(valor):
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Fecha invalida: {valor} (usar AAAA-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Recalcula el vencimiento de los oficios abiertos con plazo en dias habiles '
+        'segun el calendario vigente (feriados y dias de cierre).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            type=_fecha,
+            help='Solo los oficios afectados por un cambio de calendario en esta fecha (AAAA-MM-DD).',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Oficios por lote.')
+
+    def handle(self, *args, **options):
+        actualizados = Oficio.recalcular_vencimientos(desde=options['desde'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{actualizados} oficios actualizados.'))
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casos', '0005_caso_contadores_oficios'),
+        ('oficios', '0036_alter_historicaloficio_codigo_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movimientooficio',
+            index=models.Index(fields=['oficio', '-fecha_creacion'], name='movimiento_oficio_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='oficio',
+            index=models.Index(fields=['fecha_vencimiento', '-fecha_emision'], name='oficio_venc_emision_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='oficio',
+            index=models.Index(fields=['estado', 'fecha_vencimiento', '-fecha_emision'], name='oficio_estado_venc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='oficio',
+            index=models.Index(fields=['estado', '-creado'], name='oficio_estado_creado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='oficio',
+            index=models.Index(condition=models.Q(('estado', 'respondido')), fields=['validado_coord', 'validado_director', '-creado'], name='oficio_respondido_panel_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='oficio',
+            index=models.Index(condition=models.Q(('fecha_vencimiento__isnull', False), models.Q(('estado', 'enviado'), _negated=True)), fields=['fecha_vencimiento'], name='oficio_pendiente_venc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='respuesta',
+            index=models.Index(fields=['id_oficio', '-fecha_hora', '-creacion'], name='respuesta_oficio_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:59
+
+from django.db import migrations, models
+
+from core.texto import normalizar
+
+
+def poblar_texto_busqueda(apps, schema_editor):
+    Oficio = apps.get_model('oficios', 'Oficio')
+    oficios = Oficio.objects.select_related('institucion', 'juzgado').order_by('pk')
+    pendientes = []
+    for oficio in oficios.iterator(chunk_size=1000):
+        partes = [
+            oficio.codigo,
+            oficio.nro_oficio,
+            oficio.denuncia,
+            oficio.legajo,
+            oficio.caratula_oficio,
+            oficio.institucion.nombre if oficio.institucion_id else None,
+            oficio.juzgado.nombre if oficio.juzgado_id else None,
+        ]
+        oficio.texto_busqueda = '|' + '|'.join(normalizar(parte) for parte in partes if parte) + '|'
+        pendientes.append(oficio)
+        if len(pendientes) >= 1000:
+            Oficio.objects.bulk_update(pendientes, ['texto_busqueda'])
+            pendientes = []
+    if pendientes:
+        Oficio.objects.bulk_update(pendientes, ['texto_busqueda'])
+
+
+def crear_indice_trigramas(apps, schema_editor):
+    # Solo PostgreSQL: indice GIN de trigramas para LIKE '%...%'. En SQLite la
+    # busqueda funciona igual, sin indice.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS oficio_texto_busqueda_trgm '
+        'ON oficios_oficio USING gin (texto_busqueda gin_trgm_ops)'
+    )
+
+
+def borrar_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS oficio_texto_busqueda_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oficios', '0037_indices_listados_paneles'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='oficio',
+            name='texto_busqueda',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Texto de búsqueda'),
+        ),
+        migrations.RunPython(poblar_texto_busqueda, migrations.RunPython.noop),
+        migrations.RunPython(crear_indice_trigramas, borrar_indice_trigramas),
+    ]
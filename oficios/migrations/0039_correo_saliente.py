@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oficios', '0038_oficio_texto_busqueda'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorreoSaliente',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destinatario', models.EmailField(max_length=254, verbose_name='Destinatario')),
+                ('asunto', models.CharField(max_length=255, verbose_name='Asunto')),
+                ('cuerpo', models.TextField(blank=True, verbose_name='Cuerpo')),
+                ('adjunto', models.CharField(blank=True, max_length=255, verbose_name='Adjunto')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviado', 'Enviado'), ('error', 'Error')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('intentos', models.PositiveIntegerField(default=0, verbose_name='Intentos')),
+                ('proximo_intento', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Próximo intento')),
+                ('ultimo_error', models.TextField(blank=True, verbose_name='Último error')),
+                ('creado', models.DateTimeField(auto_now_add=True, verbose_name='Creado')),
+                ('enviado', models.DateTimeField(blank=True, null=True, verbose_name='Enviado')),
+                ('oficio', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='correos', to='oficios.oficio', verbose_name='Oficio')),
+            ],
+            options={
+                'verbose_name': 'Correo saliente',
+                'verbose_name_plural': 'Correos salientes',
+                'ordering': ['-creado'],
+                'indexes': [models.Index(condition=models.Q(('estado', 'pendiente')), fields=['proximo_intento'], name='correo_pendiente_idx'), models.Index(fields=['oficio', '-creado'], name='correo_oficio_idx')],
+            },
+        ),
+    ]
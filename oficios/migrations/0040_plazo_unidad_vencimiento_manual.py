@@ -0,0 +1,83 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:21
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def _sumar_dias_habiles_sin_feriados(fecha, dias):
+    # Calculo anterior (solo fines de semana), con el que se generaron los vencimientos
+    agregados = 0
+    while agregados < dias:
+        fecha += timedelta(days=1)
+        if fecha.weekday() < 5:
+            agregados += 1
+    return fecha
+
+
+def clasificar_vencimientos(apps, schema_editor):
+    """
+    La unidad del plazo no se guardaba: se deduce comparando el vencimiento con el
+    calculo en horas corridas y en dias habiles (a minuto, como el formulario).
+    Si no coincide con ninguno, el vencimiento se cargo a mano.
+    """
+    Oficio = apps.get_model('oficios', 'Oficio')
+    tolerancia = timedelta(minutes=1)
+    oficios = (
+        Oficio.objects.filter(fecha_vencimiento__isnull=False)
+        .only('id', 'plazo_horas', 'fecha_emision', 'fecha_vencimiento')
+        .order_by('pk')
+    )
+    pendientes = []
+    for oficio in oficios.iterator(chunk_size=1000):
+        emision = timezone.localtime(oficio.fecha_emision) if oficio.fecha_emision else None
+        vencimiento = timezone.localtime(oficio.fecha_vencimiento)
+        if emision and oficio.plazo_horas:
+            if abs(emision + timedelta(hours=oficio.plazo_horas) - vencimiento) < tolerancia:
+                continue
+            if oficio.plazo_horas % 24 == 0 and abs(
+                _sumar_dias_habiles_sin_feriados(emision, oficio.plazo_horas // 24) - vencimiento
+            ) < tolerancia:
+                oficio.plazo_unidad = 'dias'
+            else:
+                oficio.vencimiento_manual = True
+        else:
+            oficio.vencimiento_manual = True
+        pendientes.append(oficio)
+        if len(pendientes) >= 1000:
+            Oficio.objects.bulk_update(pendientes, ['plazo_unidad', 'vencimiento_manual'])
+            pendientes = []
+    if pendientes:
+        Oficio.objects.bulk_update(pendientes, ['plazo_unidad', 'vencimiento_manual'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oficios', '0039_correo_saliente'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicaloficio',
+            name='plazo_unidad',
+            field=models.CharField(choices=[('horas', 'Horas corridas'), ('dias', 'Días hábiles')], default='horas', max_length=10, verbose_name='Unidad de plazo'),
+        ),
+        migrations.AddField(
+            model_name='historicaloficio',
+            name='vencimiento_manual',
+            field=models.BooleanField(default=False, verbose_name='Vencimiento manual'),
+        ),
+        migrations.AddField(
+            model_name='oficio',
+            name='plazo_unidad',
+            field=models.CharField(choices=[('horas', 'Horas corridas'), ('dias', 'Días hábiles')], default='horas', max_length=10, verbose_name='Unidad de plazo'),
+        ),
+        migrations.AddField(
+            model_name='oficio',
+            name='vencimiento_manual',
+            field=models.BooleanField(default=False, verbose_name='Vencimiento manual'),
+        ),
+        migrations.RunPython(clasificar_vencimientos, migrations.RunPython.noop),
+    ]
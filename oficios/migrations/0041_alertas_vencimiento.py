@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oficios', '0040_plazo_unidad_vencimiento_manual'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaAlertas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(max_length=20, unique=True, verbose_name='Tipo de alerta')),
+                ('hasta', models.DateTimeField(verbose_name='Revisado hasta')),
+                ('actualizado', models.DateTimeField(auto_now=True, verbose_name='Última corrida')),
+            ],
+            options={
+                'verbose_name': 'Marca de alertas',
+                'verbose_name_plural': 'Marcas de alertas',
+            },
+        ),
+        migrations.CreateModel(
+            name='AlertaOficio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('por_vencer', 'Por vencer'), ('vencido', 'Vencido')], max_length=20, verbose_name='Tipo')),
+                ('fecha_vencimiento', models.DateTimeField(verbose_name='Vencimiento alertado')),
+                ('creado', models.DateTimeField(auto_now_add=True, verbose_name='Creado')),
+                ('correo', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='alertas', to='oficios.correosaliente', verbose_name='Correo')),
+                ('oficio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas', to='oficios.oficio', verbose_name='Oficio')),
+            ],
+            options={
+                'verbose_name': 'Alerta de vencimiento',
+                'verbose_name_plural': 'Alertas de vencimiento',
+                'ordering': ['-creado'],
+                'constraints': [models.UniqueConstraint(fields=('oficio', 'tipo', 'fecha_vencimiento'), name='alerta_oficio_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:26
+
+import django.db.models.deletion
+import oficios.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oficios', '0041_alertas_vencimiento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportacionOficios',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('formato', models.CharField(choices=[('csv', 'CSV'), ('xlsx', 'Excel (XLSX)')], default='csv', max_length=10, verbose_name='Formato')),
+                ('parametros', models.TextField(blank=True, verbose_name='Filtros')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('lista', 'Lista'), ('error', 'Error')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('archivo', models.FileField(blank=True, upload_to=oficios.models.exportacion_upload_path, verbose_name='Archivo')),
+                ('filas', models.PositiveIntegerField(default=0, verbose_name='Filas')),
+                ('error', models.TextField(blank=True, verbose_name='Error')),
+                ('creado', models.DateTimeField(auto_now_add=True, verbose_name='Creado')),
+                ('terminado', models.DateTimeField(blank=True, null=True, verbose_name='Terminado')),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exportaciones_oficios', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Exportación de oficios',
+                'verbose_name_plural': 'Exportaciones de oficios',
+                'ordering': ['-creado'],
+                'indexes': [models.Index(fields=['usuario', '-creado'], name='exportacion_usuario_idx'), models.Index(condition=models.Q(('estado', 'pendiente')), fields=['creado'], name='exportacion_pendiente_idx')],
+            },
+        ),
+    ]
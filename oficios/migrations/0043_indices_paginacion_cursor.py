@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casos', '0007_indices_paginacion_cursor'),
+        ('oficios', '0042_exportacion_oficios'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='oficio',
+            name='oficio_venc_emision_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='oficio',
+            name='oficio_estado_venc_idx',
+        ),
+        migrations.AddIndex(
+            model_name='oficio',
+            index=models.Index(fields=['fecha_vencimiento', '-fecha_emision', '-id'], name='oficio_venc_emision_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='oficio',
+            index=models.Index(fields=['estado', 'fecha_vencimiento', '-fecha_emision', '-id'], name='oficio_estado_venc_idx'),
+        ),
+    ]
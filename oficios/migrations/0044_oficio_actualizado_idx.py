@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('casos', '0007_indices_paginacion_cursor'),
+        ('oficios', '0043_indices_paginacion_cursor'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='oficio',
+            index=models.Index(fields=['actualizado'], name='oficio_actualizado_idx'),
+        ),
+    ]
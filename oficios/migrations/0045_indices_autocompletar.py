@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oficios', '0044_oficio_actualizado_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='institucion',
+            index=models.Index(fields=['nombre', 'id'], name='institucion_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='juzgado',
+            index=models.Index(fields=['nombre', 'id'], name='juzgado_nombre_idx'),
+        ),
+    ]
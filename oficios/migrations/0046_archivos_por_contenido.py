@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:58
+
+import core.archivos
+import django.core.validators
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oficios', '0045_indices_autocompletar'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='movimientooficio',
+            name='archivo_pdf',
+            field=core.archivos.ArchivoContenidoField(blank=True, null=True, upload_to='', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf'], message='Solo se permiten archivos PDF.')], verbose_name='Archivo PDF del movimiento'),
+        ),
+        migrations.AlterField(
+            model_name='oficio',
+            name='archivo_pdf',
+            field=core.archivos.ArchivoContenidoField(blank=True, help_text='Sube el archivo PDF del oficio. Tamaño máximo: 10MB.', null=True, upload_to='', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf'], message='Solo se permiten archivos PDF.')], verbose_name='Archivo PDF del oficio'),
+        ),
+        migrations.AlterField(
+            model_name='respuesta',
+            name='respuesta_pdf',
+            field=core.archivos.ArchivoContenidoField(blank=True, help_text='Sube el archivo PDF de la respuesta. Tamaño máximo: 10MB.', null=True, upload_to='', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf'], message='Solo se permiten archivos PDF.')], verbose_name='Archivo PDF de la respuesta'),
+        ),
+    ]
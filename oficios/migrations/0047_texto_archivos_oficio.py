@@ -0,0 +1,29 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oficios', '0046_archivos_por_contenido'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TextoArchivosOficio',
+            fields=[
+                ('oficio', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='texto_archivos', serialize=False, to='oficios.oficio', verbose_name='Oficio')),
+                ('texto', models.TextField(blank=True, verbose_name='Texto')),
+                ('pendiente', models.BooleanField(default=True, verbose_name='Pendiente')),
+                ('marcado', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Marcado')),
+            ],
+            options={
+                'verbose_name': 'Texto de archivos del oficio',
+                'verbose_name_plural': 'Textos de archivos de oficios',
+                'indexes': [models.Index(condition=models.Q(('pendiente', True)), fields=['marcado'], name='texto_archivos_pendiente_idx')],
+            },
+        ),
+    ]
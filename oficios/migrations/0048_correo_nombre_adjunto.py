@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oficios', '0047_texto_archivos_oficio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='correosaliente',
+            name='nombre_adjunto',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Nombre del adjunto'),
+        ),
+    ]
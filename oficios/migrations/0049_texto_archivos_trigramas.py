@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def crear_indice_trigramas(apps, schema_editor):
+    # Solo PostgreSQL (ver 0038): LIKE '%...%' sobre el texto de los PDF de cada oficio
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS texto_archivos_oficio_trgm '
+        'ON oficios_textoarchivosoficio USING gin (texto gin_trgm_ops)'
+    )
+
+
+def borrar_indice_trigramas(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS texto_archivos_oficio_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oficios', '0048_correo_nombre_adjunto'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice_trigramas, borrar_indice_trigramas),
+    ]
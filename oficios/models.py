@@ -1,7 +1,6 @@
-﻿import os
-import uuid
-from datetime import timedelta
-from django.db import models
+﻿import uuid
+from datetime import datetime, time, timedelta
+from django.db import models, transaction
 from django.db.models import Q
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -10,7 +9,15 @@ from django.contrib.auth import get_user_model
 from django.conf import settings
 from simple_history.models import HistoricalRecords
 from casos.models import Caso
+from core import versiones
+from core.archivos import ArchivoContenidoField, ReferenciasArchivoMixin, es_contenido
+from core.calendario import sumar_dias_habiles
+from core.codigos import reservar_codigos
+from core.texto import componer_texto_busqueda
+from reportes.models import ResumenDiarioOficio
 
+# Rutas de los archivos subidos antes de guardarlos por contenido (core.archivos);
+# las siguen usando las migraciones anteriores
 def oficio_upload_path(instance, filename):
     # Guarda el archivo en: MEDIA_ROOT/oficios/<year>/<month>/oficio_<uuid>/<filename>
     fecha = instance.fecha_emision or timezone.now()
@@ -33,22 +40,12 @@ def movimiento_upload_path(instance, filename):
     oficio_id = instance.oficio_id or (instance.oficio.id if getattr(instance, 'oficio', None) else 'sin_oficio')
     return f'movimientos/oficio_{oficio_id}/{filename}'
 
-User = get_user_model()
-
-
-def sumar_dias_habiles(fecha_base, dias_habiles):
-    if dias_habiles <= 0:
-        return fecha_base
+def exportacion_upload_path(instance, filename):
+    # Guarda el archivo en: MEDIA_ROOT/exportaciones/usuario_<usuario_id>/<filename>
+    return f'exportaciones/usuario_{instance.usuario_id}/{filename}'
 
-    fecha_resultado = fecha_base
-    dias_sumados = 0
-
-    while dias_sumados < dias_habiles:
-        fecha_resultado += timedelta(days=1)
-        if fecha_resultado.weekday() < 5:
-            dias_sumados += 1
+User = get_user_model()
 
-    return fecha_resultado
 
 # Se han eliminado los modelos intermedios OficioParte y OficioNino
 # ya que la relación ahora se manejará a través del modelo Caso
@@ -65,10 +62,24 @@ class Institucion(models.Model):
         verbose_name = 'Institución'
         verbose_name_plural = 'Instituciones'
         ordering = ['nombre']
+        indexes = [
+            # Orden (y cursor) del autocompletado de instituciones
+            models.Index(fields=['nombre', 'id'], name='institucion_nombre_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
 
+    def save(self, *args, **kwargs):
+        nombre_anterior = (
+            Institucion.objects.filter(pk=self.pk).values_list('nombre', flat=True).first()
+            if self.pk else None
+        )
+        super().save(*args, **kwargs)
+        if nombre_anterior is not None and nombre_anterior != self.nombre:
+            # El nombre forma parte del texto de busqueda de sus oficios
+            Oficio.recalcular_texto_busqueda(Oficio.objects.filter(institucion=self))
+
 class Caratula(models.Model):
     nombre = models.CharField(max_length=100, verbose_name='Nombre de la Carátula')
     nota = models.TextField(verbose_name='Notas', blank=True, null=True)
@@ -120,6 +131,9 @@ class Juzgado(models.Model):
         verbose_name = 'Juzgado'
         verbose_name_plural = 'Juzgados'
         ordering = ['nombre']
+        indexes = [
+            models.Index(fields=['nombre', 'id'], name='juzgado_nombre_idx'),
+        ]
 
     def __str__(self):
         return self.nombre
@@ -136,7 +150,13 @@ class Juzgado(models.Model):
             self.nombre = self.nombre.upper().strip()
         if self.direccion:
             self.direccion = self.direccion.upper().strip()
+        nombre_anterior = (
+            Juzgado.objects.filter(pk=self.pk).values_list('nombre', flat=True).first()
+            if self.pk else None
+        )
         super().save(*args, **kwargs)
+        if nombre_anterior is not None and nombre_anterior != self.nombre:
+            Oficio.recalcular_texto_busqueda(Oficio.objects.filter(juzgado=self))
 
 
 class CategoriaJuzgado(models.Model):
@@ -157,7 +177,7 @@ class CategoriaJuzgado(models.Model):
             self.nombre = self.nombre.upper().strip()
         super().save(*args, **kwargs)
 
-class Oficio(models.Model):
+class Oficio(ReferenciasArchivoMixin, models.Model):
     ESTADO_CHOICES = [
         ('cargado', 'Cargado'),
         ('asignado', 'Asignado'),
@@ -231,6 +251,17 @@ class Oficio(models.Model):
         null=True,
         blank=True
     )
+    PLAZO_UNIDAD_CHOICES = [
+        ('horas', 'Horas corridas'),
+        ('dias', 'Días hábiles'),
+    ]
+    # 'dias': plazo_horas es un multiplo de 24 que se cuenta en dias habiles (core.calendario)
+    plazo_unidad = models.CharField(
+        max_length=10,
+        choices=PLAZO_UNIDAD_CHOICES,
+        default='horas',
+        verbose_name='Unidad de plazo'
+    )
     fecha_emision = models.DateTimeField(
         default=timezone.now,
         verbose_name='Fecha de emisión'
@@ -240,6 +271,8 @@ class Oficio(models.Model):
         null=True,
         verbose_name='Fecha de vencimiento'
     )
+    # Vencimiento cargado a mano: no se recalcula desde el plazo ni por cambios de feriados
+    vencimiento_manual = models.BooleanField(default=False, verbose_name='Vencimiento manual')
     fecha_envio = models.DateTimeField(
         blank=True,
         null=True,
@@ -271,7 +304,15 @@ class Oficio(models.Model):
         default=False,
         verbose_name='Incompetencia'
     )
-    history = HistoricalRecords()
+    # Texto normalizado (sin tildes, minusculas) para la busqueda del listado;
+    # lo recalcula save(). Ver oficios/busqueda.py
+    texto_busqueda = models.TextField(
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Texto de búsqueda'
+    )
+    history = HistoricalRecords(excluded_fields=['texto_busqueda'])
     creado = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Creado'
@@ -296,33 +337,44 @@ class Oficio(models.Model):
         verbose_name = 'Oficio'
         verbose_name_plural = 'Oficios'
         ordering = ['-fecha_emision']
+        indexes = [
+            # Listados: vencimiento ascendente (nulos al final, el default de un
+            # indice ASC en PostgreSQL), luego emision descendente y el id para
+            # desempatar la paginacion por cursor (core.paginacion)
+            models.Index(fields=['fecha_vencimiento', '-fecha_emision', '-id'], name='oficio_venc_emision_idx'),
+            # Listado por estado con el mismo orden
+            models.Index(fields=['estado', 'fecha_vencimiento', '-fecha_emision', '-id'], name='oficio_estado_venc_idx'),
+            # Paneles del inicio: ultimos creados por estado y, para los respondidos,
+            # segun las validaciones de coordinacion/direccion
+            models.Index(fields=['estado', '-creado'], name='oficio_estado_creado_idx'),
+            models.Index(
+                fields=['validado_coord', 'validado_director', '-creado'],
+                name='oficio_respondido_panel_idx',
+                condition=Q(estado='respondido'),
+            ),
+            # Vencidos / proximos a vencer: solo oficios pendientes con vencimiento
+            models.Index(
+                fields=['fecha_vencimiento'],
+                name='oficio_pendiente_venc_idx',
+                condition=Q(fecha_vencimiento__isnull=False) & ~Q(estado='enviado'),
+            ),
+            # ETag de la API de lectura: ultima modificacion del listado
+            models.Index(fields=['actualizado'], name='oficio_actualizado_idx'),
+        ]
 
     def clean(self):
         super().clean()
         # Validar que si se proporciona un número de denuncia, no exista otro con el mismo número
         # Validar que si se proporciona un número de legajo, no exista otro con el mismo número
 
-    def _generar_codigo(self):
+    def _anio_codigo(self):
         fecha_base = self.fecha_emision or timezone.now()
         if timezone.is_aware(fecha_base):
             fecha_base = timezone.localtime(fecha_base)
-        anio = fecha_base.year
-        ultimo = (
-            Oficio.objects
-            .filter(codigo__startswith='OF-', codigo__endswith=f'-{anio}')
-            .exclude(pk=self.pk)
-            .order_by('-codigo')
-            .first()
-        )
-        siguiente = 1
-
-        if ultimo and ultimo.codigo:
-            try:
-                siguiente = int(ultimo.codigo.split('-')[1]) + 1
-            except (IndexError, ValueError):
-                siguiente = 1
+        return fecha_base.year
 
-        return f"OF-{siguiente:05d}-{anio}"
+    def _generar_codigo(self):
+        return reservar_codigos('OF', self._anio_codigo(), modelo=Oficio)[0]
 
     def _calcular_fecha_vencimiento(self):
         if not self.plazo_horas:
@@ -332,8 +384,7 @@ class Oficio(models.Model):
         if timezone.is_aware(fecha_base):
             fecha_base = timezone.localtime(fecha_base)
 
-        plazo_unidad = getattr(self, '_plazo_unidad', 'horas')
-        if plazo_unidad == 'dias' and self.plazo_horas % 24 == 0:
+        if self.plazo_unidad == 'dias' and self.plazo_horas % 24 == 0:
             dias_habiles = self.plazo_horas // 24
             return sumar_dias_habiles(fecha_base, dias_habiles)
 
@@ -342,90 +393,306 @@ class Oficio(models.Model):
     def _resolver_fecha_vencimiento(self):
         fecha_manual = getattr(self, '_fecha_vencimiento_manual', None)
         if fecha_manual:
+            self.vencimiento_manual = True
             if timezone.is_aware(fecha_manual):
                 return timezone.localtime(fecha_manual)
             return timezone.make_aware(fecha_manual, timezone.get_current_timezone())
+        self.vencimiento_manual = False
         return self._calcular_fecha_vencimiento()
 
-    def save(self, *args, **kwargs):
+    # Campos de los que depende un vencimiento calculado
+    CAMPOS_PLAZO = ('plazo_horas', 'plazo_unidad', 'fecha_emision', 'fecha_vencimiento', 'vencimiento_manual')
+
+    def _debe_recalcular_vencimiento(self, anteriores, es_nuevo):
+        fecha_manual = getattr(self, '_fecha_vencimiento_manual', None) is not None
+        if not self.plazo_horas:
+            return fecha_manual
+        if es_nuevo or fecha_manual:
+            return True
+        # Sin vencimiento manual, la fecha se deriva siempre del plazo
+        return not self.vencimiento_manual and any(
+            anteriores.get(campo) != getattr(self, campo) for campo in self.CAMPOS_PLAZO
+        )
+
+    @classmethod
+    def recalcular_vencimientos(cls, desde=None, batch_size=1000):
+        """
+        Recalcula en bloque el vencimiento de los oficios abiertos con plazo en dias
+        habiles (sin save(): no genera historial). Con `desde` (fecha) solo toma los
+        emitidos antes de ese dia que vencen ese dia o despues, que son los unicos
+        que cambia un feriado en esa fecha. Reconstruye el resumen de reportes de
+        las fechas de emision tocadas. Devuelve la cantidad de oficios actualizados.
+        """
+        from reportes.resumen import reconstruir
+
+        oficios = (
+            cls.objects
+            .exclude(estado='enviado')
+            .filter(plazo_unidad='dias', vencimiento_manual=False, plazo_horas__isnull=False)
+            .only('id', 'plazo_horas', 'plazo_unidad', 'fecha_emision', 'fecha_vencimiento')
+            .order_by('pk')
+        )
+        if desde:
+            inicio = timezone.make_aware(datetime.combine(desde, time.min))
+            oficios = oficios.filter(fecha_emision__lt=inicio, fecha_vencimiento__gte=inicio)
+
+        pendientes = []
+        actualizados = 0
+        emisiones = []
+        for oficio in oficios.iterator(chunk_size=batch_size):
+            vencimiento = oficio._calcular_fecha_vencimiento()
+            if vencimiento == oficio.fecha_vencimiento:
+                continue
+            oficio.fecha_vencimiento = vencimiento
+            pendientes.append(oficio)
+            emisiones.append(timezone.localtime(oficio.fecha_emision).date())
+            if len(pendientes) >= batch_size:
+                cls.objects.bulk_update(pendientes, ['fecha_vencimiento'])
+                actualizados += len(pendientes)
+                pendientes = []
+        if pendientes:
+            cls.objects.bulk_update(pendientes, ['fecha_vencimiento'])
+            actualizados += len(pendientes)
+        if emisiones:
+            # El vencimiento es parte de la clave del resumen diario (y de su cache)
+            reconstruir(min(emisiones), max(emisiones))
+        return actualizados
+
+    # Campos cuyo valor persistido se compara en save() para detectar cambios
+    CAMPOS_SEGUIDOS = (
+        'estado', 'plazo_horas', 'plazo_unidad', 'fecha_emision', 'archivo_pdf', 'caso_id',
+        'institucion_id', 'juzgado_id', 'fecha_vencimiento', 'vencimiento_manual',
+        'nro_oficio', 'denuncia', 'legajo', 'codigo', 'caratula_oficio',
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Snapshot de los valores cargados: save() compara en memoria sin releer la fila
+        cargados = dict(zip(field_names, values))
+        instance._valores_cargados = {
+            campo: cargados[campo] for campo in cls.CAMPOS_SEGUIDOS if campo in cargados
+        }
+        return instance
+
+    def _guardar_snapshot(self):
+        self._valores_cargados = {
+            'estado': self.estado,
+            'plazo_horas': self.plazo_horas,
+            'plazo_unidad': self.plazo_unidad,
+            'fecha_emision': self.fecha_emision,
+            'archivo_pdf': self.archivo_pdf.name if self.archivo_pdf else None,
+            'caso_id': self.caso_id,
+            'institucion_id': self.institucion_id,
+            'juzgado_id': self.juzgado_id,
+            'fecha_vencimiento': self.fecha_vencimiento,
+            'vencimiento_manual': self.vencimiento_manual,
+            'nro_oficio': self.nro_oficio,
+            'denuncia': self.denuncia,
+            'legajo': self.legajo,
+            'codigo': self.codigo,
+            'caratula_oficio': self.caratula_oficio,
+        }
+
+    def _valores_anteriores(self):
+        """
+        Valores persistidos de CAMPOS_SEGUIDOS. Si la instancia no se cargo desde la
+        base (o se cargo con .only()/.defer()) se relee la fila una unica vez.
+        """
+        anteriores = self.__dict__.setdefault('_valores_cargados', {})
+        faltantes = [campo for campo in self.CAMPOS_SEGUIDOS if campo not in anteriores]
+        if faltantes and self.pk:
+            fila = Oficio.objects.filter(pk=self.pk).values(*faltantes).first()
+            if fila:
+                anteriores.update(fila)
+        return anteriores
+
+    def _normalizar_campos(self):
         if self.legajo:
             self.legajo = self.legajo.upper()
         if self.caratula_oficio:
             self.caratula_oficio = self.caratula_oficio.upper()
-        codigo_en_uso = (
-            not self.pk
-            and self.codigo
-            and Oficio.objects.filter(codigo=self.codigo).exists()
+
+    def _validar(self):
+        # La unicidad y las FK las garantiza la base: se omiten para no lanzar
+        # un SELECT por cada relacion y por `codigo`.
+        self.full_clean(
+            exclude=[field.name for field in self._meta.concrete_fields if field.is_relation],
+            validate_unique=False,
         )
-        if not self.codigo or codigo_en_uso:
+
+    # Campos que componen texto_busqueda (los *_id aportan el nombre relacionado)
+    CAMPOS_BUSQUEDA = (
+        'codigo', 'nro_oficio', 'denuncia', 'legajo', 'caratula_oficio', 'institucion_id', 'juzgado_id',
+    )
+
+    def componer_texto_busqueda(self):
+        """
+        Une los campos buscables, normalizados y separados por '|', para que la
+        busqueda pueda distinguir coincidencias exactas o por prefijo de un campo.
+        """
+        return componer_texto_busqueda([
+            self.codigo,
+            self.nro_oficio,
+            self.denuncia,
+            self.legajo,
+            self.caratula_oficio,
+            self.institucion.nombre if self.institucion_id else None,
+            self.juzgado.nombre if self.juzgado_id else None,
+        ])
+
+    @classmethod
+    def recalcular_texto_busqueda(cls, queryset, batch_size=1000):
+        """Recalcula texto_busqueda en bloque (sin save(): no genera historial)."""
+        pendientes = []
+        actualizados = 0
+        oficios = queryset.select_related('institucion', 'juzgado').order_by('pk')
+        for oficio in oficios.iterator(chunk_size=batch_size):
+            texto = oficio.componer_texto_busqueda()
+            if texto != oficio.texto_busqueda:
+                oficio.texto_busqueda = texto
+                pendientes.append(oficio)
+            if len(pendientes) >= batch_size:
+                cls.objects.bulk_update(pendientes, ['texto_busqueda'])
+                actualizados += len(pendientes)
+                pendientes = []
+        if pendientes:
+            cls.objects.bulk_update(pendientes, ['texto_busqueda'])
+            actualizados += len(pendientes)
+        return actualizados
+
+    def _actualizar_texto_busqueda(self, anteriores, es_nuevo, kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            campos = {self._meta.get_field(nombre).attname for nombre in update_fields}
+            if not campos & set(self.CAMPOS_BUSQUEDA):
+                return
+        elif not es_nuevo and all(
+            anteriores.get(campo) == getattr(self, campo) for campo in self.CAMPOS_BUSQUEDA
+        ):
+            return
+        self.texto_busqueda = self.componer_texto_busqueda()
+        if update_fields is not None:
+            kwargs['update_fields'] = list(update_fields) + ['texto_busqueda']
+
+    def _archivo_compartido_en_uso(self, nombre):
+        # PDF de altas masivas anteriores a core.archivos, compartidos entre oficios
+        if not nombre or not nombre.startswith('oficios/compartidos/'):
+            return False
+        return Oficio.objects.filter(archivo_pdf=nombre).exclude(pk=self.pk).exists()
+
+    def _archivos_modificados(self):
+        # Al borrar el oficio su texto se va en cascada
+        if self.pk:
+            TextoArchivosOficio.marcar([self.pk])
+
+    def _borrar_archivo_legado(self, nombre):
+        # Solo rutas anteriores a core.archivos: los archivos por contenido los borra `limpiar_archivos` al quedar sin referencias
+        if not nombre or es_contenido(nombre) or self._archivo_compartido_en_uso(nombre):
+            return
+        try:
+            self.archivo_pdf.storage.delete(nombre)
+        except Exception:
+            pass
+
+    def save(self, *args, **kwargs):
+        self._normalizar_campos()
+        # El codigo sale del contador atomico (core.codigos), que garantiza unicidad
+        if not self.codigo:
             self.codigo = self._generar_codigo()
         # Validar el modelo antes de guardar
-        self.full_clean()
-        
-        # Si es un oficio nuevo (no tiene ID) y tiene plazo_horas, calcula la fecha de vencimiento
-        if not self.id and self.plazo_horas:
-            self.fecha_vencimiento = self._resolver_fecha_vencimiento()
+        self._validar()
+
+        anteriores = self._valores_anteriores() if self.id else {}
+        es_nuevo = not self.id or not anteriores
+        self._actualizar_texto_busqueda(anteriores, es_nuevo, kwargs)
         
-        # Si el oficio ya existe, verifica si se modificó el plazo_horas
-        elif self.id and self.plazo_horas:
-            # Obtener el oficio actual de la base de datos
-            old_instance = Oficio.objects.get(pk=self.id)
-            if (
-                old_instance.plazo_horas != self.plazo_horas
-                or old_instance.fecha_emision != self.fecha_emision
-                or getattr(self, '_fecha_vencimiento_manual', None) is not None
-            ):
-                self.fecha_vencimiento = self._resolver_fecha_vencimiento()
-        elif getattr(self, '_fecha_vencimiento_manual', None) is not None:
+        # Vencimiento: manual si viene del formulario; si no, derivado del plazo
+        if self._debe_recalcular_vencimiento(anteriores, es_nuevo):
             self.fecha_vencimiento = self._resolver_fecha_vencimiento()
         
-        # Si no se especifica un usuario, usar el usuario actual
-
         # Completar fecha_envio cuando cambia a 'enviado'
-        try:
-            if self.id:
-                prev = Oficio.objects.get(pk=self.id)
-                if prev.estado != 'enviado' and self.estado == 'enviado' and not getattr(self, 'fecha_envio', None):
-                    self.fecha_envio = timezone.now()
-        except Oficio.DoesNotExist:
-            pass
+        if (
+            not es_nuevo
+            and anteriores.get('estado') != 'enviado'
+            and self.estado == 'enviado'
+            and not getattr(self, 'fecha_envio', None)
+        ):
+            self.fecha_envio = timezone.now()
 
+        # Si no se especifica un usuario, usar el usuario actual
         if not self.usuario_id and hasattr(self, '_current_user'):
             self.usuario = self._current_user
         
-        # Si el oficio ya existe y tiene un archivo PDF, verificar si se está actualizando
-        if self.id and self.archivo_pdf:
-            try:
-                # Obtener el oficio actual de la base de datos
-                old_instance = Oficio.objects.get(pk=self.id)
-                # Si el archivo ha cambiado, eliminar el archivo anterior
-                if old_instance.archivo_pdf and old_instance.archivo_pdf != self.archivo_pdf:
-                    # Eliminar el archivo anterior del sistema de archivos
-                    if os.path.isfile(old_instance.archivo_pdf.path):
-                        os.remove(old_instance.archivo_pdf.path)
-            except Oficio.DoesNotExist:
-                pass  # Es un nuevo oficio, no hay archivo anterior que eliminar
-        
-        super().save(*args, **kwargs)
+        # Si el archivo PDF cambió, eliminar el archivo anterior del almacenamiento
+        archivo_anterior = anteriores.get('archivo_pdf')
+        if archivo_anterior and self.archivo_pdf and archivo_anterior != self.archivo_pdf.name:
+            self._borrar_archivo_legado(archivo_anterior)
 
-        # Actualizar estado del caso segun estados de sus oficios
-        try:
-            if self.caso_id:
-                caso = self.caso
-                qs = caso.oficios.all()
-                # Si todos los oficios del caso estan 'enviado' => CERRADO
-                if qs.exists() and not qs.filter(~Q(estado='enviado')).exists():
-                    if caso.estado != 'CERRADO':
-                        caso.estado = 'CERRADO'
-                        caso.save(update_fields=['estado'])
-                else:
-                    # Si estaba CERRADO y se agrega/cambia un oficio a otro estado => EN_PROCESO
-                    if caso.estado == 'CERRADO':
-                        caso.estado = 'EN_PROCESO'
-                        caso.save(update_fields=['estado'])
-        except Exception:
-            # No bloquear el guardado del oficio por errores al actualizar el caso
-            pass
+        # Mantener los contadores del caso (y su estado) y el resumen de reportes
+        # con deltas O(1), en la misma transaccion que el guardado del oficio
+        deltas = self._deltas_caso(anteriores, es_nuevo, kwargs.get('update_fields'))
+        deltas_resumen = self._deltas_resumen(anteriores, es_nuevo, kwargs.get('update_fields'))
+        if deltas or deltas_resumen:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                for caso_id, total, pendientes in deltas:
+                    Caso.ajustar_contadores(caso_id, total=total, pendientes=pendientes)
+                ResumenDiarioOficio.ajustar(deltas_resumen)
+        else:
+            super().save(*args, **kwargs)
+        self._guardar_snapshot()
+        versiones.invalidar_datos(versiones.OFICIOS)
+
+    def _deltas_caso(self, anteriores, es_nuevo, update_fields=None):
+        """
+        Devuelve [(caso_id, delta_total, delta_pendientes)] segun como cambiaron el
+        caso y el estado del oficio respecto de los valores persistidos.
+        """
+        campos = set(update_fields) if update_fields is not None else None
+        nuevo_caso = self.caso_id if campos is None or {'caso', 'caso_id'} & campos else anteriores.get('caso_id')
+        nuevo_estado = self.estado if campos is None or 'estado' in campos else anteriores.get('estado')
+        pendiente_nuevo = int(nuevo_estado != 'enviado')
+        if es_nuevo:
+            return [(nuevo_caso, 1, pendiente_nuevo)] if nuevo_caso else []
+
+        caso_anterior = anteriores.get('caso_id')
+        pendiente_anterior = int(anteriores.get('estado') != 'enviado')
+        if caso_anterior == nuevo_caso:
+            if nuevo_caso and pendiente_nuevo != pendiente_anterior:
+                return [(nuevo_caso, 0, pendiente_nuevo - pendiente_anterior)]
+            return []
+        deltas = []
+        if caso_anterior:
+            deltas.append((caso_anterior, -1, -pendiente_anterior))
+        if nuevo_caso:
+            deltas.append((nuevo_caso, 1, pendiente_nuevo))
+        return deltas
+
+    # Campos que definen la fila del oficio en reportes.ResumenDiarioOficio
+    CAMPOS_RESUMEN = ('fecha_emision', 'estado', 'institucion_id', 'juzgado_id', 'fecha_vencimiento')
+
+    def _clave_resumen(self, valores):
+        return ResumenDiarioOficio.clave_de_oficio(*(valores.get(campo) for campo in self.CAMPOS_RESUMEN))
+
+    def _deltas_resumen(self, anteriores, es_nuevo, update_fields=None):
+        """Devuelve {clave: delta} para ResumenDiarioOficio segun lo que se guarda."""
+        # Con update_fields (o campos diferidos) el resto de la fila queda como estaba
+        if update_fields is not None:
+            campos = {self._meta.get_field(nombre).attname for nombre in update_fields}
+        else:
+            campos = set(self.CAMPOS_RESUMEN) - self.get_deferred_fields()
+        guardados = {
+            campo: getattr(self, campo) if campo in campos else anteriores.get(campo)
+            for campo in self.CAMPOS_RESUMEN
+        }
+        nueva = self._clave_resumen(guardados)
+        if es_nuevo:
+            return {nueva: 1}
+        anterior = self._clave_resumen(anteriores)
+        if anterior == nueva:
+            return {}
+        return {anterior: -1, nueva: 1}
 
     def get_estado_badge_class(self):
         """Devuelve la clase de Bootstrap para el badge de estado."""
@@ -440,8 +707,7 @@ class Oficio(models.Model):
         }
         return estado_map.get(self.estado, 'light')
 
-    archivo_pdf = models.FileField(
-        upload_to=oficio_upload_path,
+    archivo_pdf = ArchivoContenidoField(
         verbose_name='Archivo PDF del oficio',
         null=True,
         blank=True,
@@ -461,18 +727,21 @@ class Oficio(models.Model):
     # Nota: Se removió el segundo save duplicado que sobrescribía el cálculo de fecha_vencimiento
 
     def delete(self, *args, **kwargs):
-        # Eliminar el archivo físico si existe
+        # Eliminar el archivo físico si existe (y ningun otro oficio lo comparte)
         if self.archivo_pdf:
-            if os.path.isfile(self.archivo_pdf.path):
-                os.remove(self.archivo_pdf.path)
-                # Eliminar el directorio si está vacío
-                directory = os.path.dirname(self.archivo_pdf.path)
-                if os.path.exists(directory) and not os.listdir(directory):
-                    os.rmdir(directory)
-        super().delete(*args, **kwargs)
+            self._borrar_archivo_legado(self.archivo_pdf.name)
+        caso_id = self.caso_id
+        pendiente = int(self.estado != 'enviado')
+        clave = self._clave_resumen(self._valores_anteriores())
+        with transaction.atomic():
+            resultado = super().delete(*args, **kwargs)
+            Caso.ajustar_contadores(caso_id, total=-1, pendientes=-pendiente)
+            ResumenDiarioOficio.ajustar({clave: -1})
+        versiones.invalidar_datos(versiones.OFICIOS)
+        return resultado
 
 
-class MovimientoOficio(models.Model):
+class MovimientoOficio(ReferenciasArchivoMixin, models.Model):
     """
     Modelo para rastrear los movimientos y cambios de estado de los oficios.
     """
@@ -547,8 +816,7 @@ class MovimientoOficio(models.Model):
         related_name='movimientos_oficios'
     )
     
-    archivo_pdf = models.FileField(
-        upload_to=movimiento_upload_path,
+    archivo_pdf = ArchivoContenidoField(
         verbose_name='Archivo PDF del movimiento',
         null=True,
         blank=True,
@@ -564,6 +832,9 @@ class MovimientoOficio(models.Model):
         verbose_name = 'Movimiento de Oficio'
         verbose_name_plural = 'Movimientos de Oficios'
         ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['oficio', '-fecha_creacion'], name='movimiento_oficio_fecha_idx'),
+        ]
     
     def __str__(self):
         return f"Movimiento {self.id} - {self.get_estado_nuevo_display()} - {self.fecha_creacion.strftime('%d/%m/%Y %H:%M')}"
@@ -581,9 +852,13 @@ class MovimientoOficio(models.Model):
             self.detalle = self.detalle.upper()
             
         super().save(*args, **kwargs)
+        versiones.invalidar_datos(versiones.OFICIOS)
+
+    def _archivos_modificados(self):
+        TextoArchivosOficio.marcar([self.oficio_id])
 
 
-class Respuesta(models.Model):
+class Respuesta(ReferenciasArchivoMixin, models.Model):
     """
     Modelo para registrar respuestas a un Oficio.
     Campos: id, id_oficio, id_usuario, id_institucion, respuesta, respuesta_pdf, fecha_hora, creacion, modificacion.
@@ -614,8 +889,7 @@ class Respuesta(models.Model):
         verbose_name='Respuesta',
         blank=True
     )
-    respuesta_pdf = models.FileField(
-        upload_to=respuesta_upload_path,
+    respuesta_pdf = ArchivoContenidoField(
         verbose_name='Archivo PDF de la respuesta',
         null=True,
         blank=True,
@@ -653,6 +927,9 @@ class Respuesta(models.Model):
         verbose_name = 'Respuesta'
         verbose_name_plural = 'Respuestas'
         ordering = ['-fecha_hora', '-creacion']
+        indexes = [
+            models.Index(fields=['id_oficio', '-fecha_hora', '-creacion'], name='respuesta_oficio_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"Respuesta {self.id} de Oficio {self.id_oficio_id}"
@@ -661,16 +938,237 @@ class Respuesta(models.Model):
         if self.respuesta:
             self.respuesta = self.respuesta.upper()
         super().save(*args, **kwargs)
+        versiones.invalidar_datos(versiones.OFICIOS)
+
+    def _archivos_modificados(self):
+        TextoArchivosOficio.marcar([self.id_oficio_id])
 
     def delete(self, *args, **kwargs):
-        # Eliminar el archivo fÃ­sico si existe
-        if self.respuesta_pdf and hasattr(self.respuesta_pdf, 'path'):
+        # Eliminar el archivo físico si existe (los guardados por contenido los
+        # borra `limpiar_archivos` al quedar sin referencias)
+        if self.respuesta_pdf and not es_contenido(self.respuesta_pdf.name):
             try:
-                if os.path.isfile(self.respuesta_pdf.path):
-                    os.remove(self.respuesta_pdf.path)
-                    directory = os.path.dirname(self.respuesta_pdf.path)
-                    if os.path.exists(directory) and not os.listdir(directory):
-                        os.rmdir(directory)
+                self.respuesta_pdf.storage.delete(self.respuesta_pdf.name)
             except Exception:
                 pass
         super().delete(*args, **kwargs)
+        versiones.invalidar_datos(versiones.OFICIOS)
+
+
+class TextoArchivosOficio(models.Model):
+    """
+    Texto extraido de los PDF de un oficio (el suyo, los de sus respuestas y los
+    de sus movimientos) para la busqueda del listado. `pendiente` indica
+    que cambio algun archivo y `procesar_pdfs` debe recalcularlo (ver
+    oficios/texto_archivos.py).
+    """
+    oficio = models.OneToOneField(
+        'Oficio',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='texto_archivos',
+        verbose_name='Oficio'
+    )
+    texto = models.TextField(blank=True, verbose_name='Texto')
+    pendiente = models.BooleanField(default=True, verbose_name='Pendiente')
+    # Ultima marca: el recalculo solo baja `pendiente` si no hubo otra mientras tanto
+    marcado = models.DateTimeField(default=timezone.now, verbose_name='Marcado')
+
+    class Meta:
+        verbose_name = 'Texto de archivos del oficio'
+        verbose_name_plural = 'Textos de archivos de oficios'
+        indexes = [
+            models.Index(fields=['marcado'], name='texto_archivos_pendiente_idx', condition=Q(pendiente=True)),
+        ]
+
+    def __str__(self):
+        return f"Texto de archivos del oficio {self.oficio_id}"
+
+    @classmethod
+    def marcar(cls, oficio_ids):
+        """Marca los oficios para recalcular su texto, en una sola sentencia."""
+        oficio_ids = {oficio_id for oficio_id in oficio_ids if oficio_id}
+        if not oficio_ids:
+            return
+        ahora = timezone.now()
+        cls.objects.bulk_create(
+            [cls(oficio_id=oficio_id, pendiente=True, marcado=ahora) for oficio_id in oficio_ids],
+            update_conflicts=True,
+            unique_fields=['oficio'],
+            update_fields=['pendiente', 'marcado'],
+        )
+
+
+class CorreoSaliente(models.Model):
+    """
+    Cola persistente de correos salientes. Las vistas solo encolan; el comando
+    `manage.py procesar_correos` los envia por lotes (ver oficios/correos.py).
+    Un correo pendiente se toma cuando vence `proximo_intento`.
+    """
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_ENVIADO = 'enviado'
+    ESTADO_ERROR = 'error'
+    ESTADO_CHOICES = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_ENVIADO, 'Enviado'),
+        (ESTADO_ERROR, 'Error'),
+    ]
+
+    oficio = models.ForeignKey(
+        'Oficio',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='correos',
+        verbose_name='Oficio'
+    )
+    destinatario = models.EmailField(verbose_name='Destinatario')
+    asunto = models.CharField(max_length=255, verbose_name='Asunto')
+    cuerpo = models.TextField(blank=True, verbose_name='Cuerpo')
+    # Nombre del archivo en el storage de medios (se lee al enviar)
+    adjunto = models.CharField(max_length=255, blank=True, verbose_name='Adjunto')
+    # Nombre con el que llega el adjunto (el del storage es el SHA-256 del contenido)
+    nombre_adjunto = models.CharField(max_length=255, blank=True, verbose_name='Nombre del adjunto')
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default=ESTADO_PENDIENTE,
+        verbose_name='Estado'
+    )
+    intentos = models.PositiveIntegerField(default=0, verbose_name='Intentos')
+    proximo_intento = models.DateTimeField(default=timezone.now, verbose_name='Próximo intento')
+    ultimo_error = models.TextField(blank=True, verbose_name='Último error')
+    creado = models.DateTimeField(auto_now_add=True, verbose_name='Creado')
+    enviado = models.DateTimeField(null=True, blank=True, verbose_name='Enviado')
+
+    class Meta:
+        verbose_name = 'Correo saliente'
+        verbose_name_plural = 'Correos salientes'
+        ordering = ['-creado']
+        indexes = [
+            # Cola: solo los pendientes, por fecha de proximo intento
+            models.Index(
+                fields=['proximo_intento'],
+                name='correo_pendiente_idx',
+                condition=Q(estado='pendiente'),
+            ),
+            models.Index(fields=['oficio', '-creado'], name='correo_oficio_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} -> {self.destinatario} ({self.get_estado_display()})"
+
+
+class MarcaAlertas(models.Model):
+    """
+    Hasta donde se revisaron los vencimientos para cada tipo de alerta. La
+    proxima corrida de `manage.py alertas_vencimiento` solo mira los oficios
+    cuyo umbral se cruzo despues de esta marca y los guardados desde la corrida
+    anterior (`actualizado`).
+    """
+    tipo = models.CharField(max_length=20, unique=True, verbose_name='Tipo de alerta')
+    hasta = models.DateTimeField(verbose_name='Revisado hasta')
+    actualizado = models.DateTimeField(auto_now=True, verbose_name='Última corrida')
+
+    class Meta:
+        verbose_name = 'Marca de alertas'
+        verbose_name_plural = 'Marcas de alertas'
+
+    def __str__(self):
+        return f"{self.tipo}: {self.hasta}"
+
+
+class AlertaOficio(models.Model):
+    """
+    Alerta de vencimiento ya emitida: una por oficio, tipo y fecha de vencimiento
+    (si el vencimiento cambia, el oficio puede volver a alertarse).
+    """
+    TIPO_POR_VENCER = 'por_vencer'
+    TIPO_VENCIDO = 'vencido'
+    TIPO_CHOICES = [
+        (TIPO_POR_VENCER, 'Por vencer'),
+        (TIPO_VENCIDO, 'Vencido'),
+    ]
+
+    oficio = models.ForeignKey(
+        'Oficio',
+        on_delete=models.CASCADE,
+        related_name='alertas',
+        verbose_name='Oficio'
+    )
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES, verbose_name='Tipo')
+    fecha_vencimiento = models.DateTimeField(verbose_name='Vencimiento alertado')
+    correo = models.ForeignKey(
+        CorreoSaliente,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='alertas',
+        verbose_name='Correo'
+    )
+    creado = models.DateTimeField(auto_now_add=True, verbose_name='Creado')
+
+    class Meta:
+        verbose_name = 'Alerta de vencimiento'
+        verbose_name_plural = 'Alertas de vencimiento'
+        ordering = ['-creado']
+        constraints = [
+            models.UniqueConstraint(fields=['oficio', 'tipo', 'fecha_vencimiento'], name='alerta_oficio_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_tipo_display()} - Oficio {self.oficio_id}"
+
+
+class ExportacionOficios(models.Model):
+    """
+    Exportacion grande del listado de oficios, generada en segundo plano por
+    `manage.py procesar_exportaciones` (ver oficios/exportar.py).
+    """
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_PROCESANDO = 'procesando'
+    ESTADO_LISTA = 'lista'
+    ESTADO_ERROR = 'error'
+    ESTADO_CHOICES = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_PROCESANDO, 'Procesando'),
+        (ESTADO_LISTA, 'Lista'),
+        (ESTADO_ERROR, 'Error'),
+    ]
+    FORMATO_CHOICES = [
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel (XLSX)'),
+    ]
+
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='exportaciones_oficios',
+        verbose_name='Usuario'
+    )
+    formato = models.CharField(max_length=10, choices=FORMATO_CHOICES, default='csv', verbose_name='Formato')
+    # Querystring de filtros del listado (OficioFilter)
+    parametros = models.TextField(blank=True, verbose_name='Filtros')
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default=ESTADO_PENDIENTE,
+        verbose_name='Estado'
+    )
+    archivo = models.FileField(upload_to=exportacion_upload_path, blank=True, verbose_name='Archivo')
+    filas = models.PositiveIntegerField(default=0, verbose_name='Filas')
+    error = models.TextField(blank=True, verbose_name='Error')
+    creado = models.DateTimeField(auto_now_add=True, verbose_name='Creado')
+    terminado = models.DateTimeField(null=True, blank=True, verbose_name='Terminado')
+
+    class Meta:
+        verbose_name = 'Exportación de oficios'
+        verbose_name_plural = 'Exportaciones de oficios'
+        ordering = ['-creado']
+        indexes = [
+            models.Index(fields=['usuario', '-creado'], name='exportacion_usuario_idx'),
+            models.Index(fields=['creado'], name='exportacion_pendiente_idx', condition=Q(estado='pendiente')),
+        ]
+
+    def __str__(self):
+        return f"Exportación {self.pk} ({self.formato}) - {self.get_estado_display()}"
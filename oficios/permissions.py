@@ -1,18 +1,11 @@
-import unicodedata
-
 from django.contrib import messages
 from django.shortcuts import redirect
 
+from core import roles
+
 
 def is_coordinacion_opd(user):
-    try:
-        sector = getattr(getattr(user, 'perfil', None), 'id_sector', None)
-        raw_nombre = getattr(sector, 'nombre', '') or ''
-        norm = unicodedata.normalize('NFKD', raw_nombre)
-        sector_nombre = ''.join(c for c in norm if not unicodedata.combining(c)).lower()
-        return 'coordinacion opd' in sector_nombre
-    except Exception:
-        return False
+    return roles.tiene_rol(user, roles.COORDINACION_OPD)
 
 
 class CoordinacionOPDWriteBlockMixin:
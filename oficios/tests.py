@@ -1,3 +1,695 @@
-from django.test import TestCase
+import csv
+import io
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from casos.models import Caso, CasoNino
+from core import pdf, versiones
+from core.models import Archivo, ContadorCodigo
+from core.texto import normalizar
+from personas.models import Nino
+
+from .alta_masiva import crear_oficios_por_institucion
+from .busqueda import buscar_oficios
+from .filters import OficioFilter
+from .forms import OficioForm
+from . import alertas, correos, texto_archivos, views
+from .contadores import contar_oficios
+from .models import (
+    AlertaOficio, CorreoSaliente, ExportacionOficios, Institucion, Juzgado, MovimientoOficio, Oficio, Respuesta,
+    TextoArchivosOficio,
+)
+
+
+class ContadoresOficiosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        ahora = timezone.now()
+        Oficio.objects.bulk_create([
+            Oficio(codigo='T-1', estado='asignado', fecha_vencimiento=ahora - timedelta(days=1)),
+            Oficio(codigo='T-2', estado='asignado', fecha_vencimiento=ahora + timedelta(days=1)),
+            Oficio(codigo='T-3', estado='respondido'),
+            Oficio(codigo='T-4', estado='enviado', fecha_vencimiento=ahora - timedelta(days=1)),
+        ])
+
+    def test_contar_oficios_una_consulta(self):
+        with self.assertNumQueries(1):
+            totales = contar_oficios(Oficio.objects.all())
+        self.assertEqual(totales, {
+            'total_oficios': 4,
+            'total_vencidos': 1,
+            'total_asignados': 2,
+            'total_respondidos': 1,
+            'total_enviados': 1,
+        })
+
+    def test_listado_reutiliza_totales_en_paginador(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('oficios:list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_oficios'], 4)
+        self.assertEqual(response.context['paginator'].count, 4)
+        self.assertEqual(response.context['total_vencidos'], 1)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class OficioSaveConsultasTest(TestCase):
+    """save() compara contra los valores cargados en memoria, sin releer la fila."""
+
+    @classmethod
+    def setUpTestData(cls):
+        user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.caso = Caso.objects.create(usuario=user)
+        ContadorCodigo.objects.create(prefijo='OF', anio=timezone.localdate().year, ultimo=0)
+
+    def _crear(self, **kwargs):
+        return Oficio.objects.create(caso=self.caso, plazo_horas=48, **kwargs)
+
+    def test_alta(self):
+        self._crear()
+        # contador de codigos (savepoint + UPDATE + release) y, en una transaccion:
+        # INSERT, historial, UPDATE F() de contadores del caso, lectura del caso y
+        # lectura + UPDATE del resumen de reportes
+        with self.assertNumQueries(11):
+            self._crear()
+
+    def test_cambio_de_estado(self):
+        oficio = Oficio.objects.get(pk=self._crear().pk)
+        oficio.estado = 'enviado'
+        # transaccion: UPDATE, historial, contadores del caso, lectura del caso,
+        # UPDATE + historial del caso (pasa a CERRADO) y lectura, UPDATE e INSERT
+        # del resumen de reportes (la clave del oficio cambia de estado)
+        with self.assertNumQueries(11):
+            oficio.save()
+        self.assertIsNotNone(oficio.fecha_envio)
+        self.caso.refresh_from_db()
+        self.assertEqual(self.caso.estado, 'CERRADO')
+
+    def test_reemplazo_de_pdf(self):
+        oficio = Oficio.objects.get(pk=self._crear(archivo_pdf=SimpleUploadedFile('a.pdf', b'%PDF-1')).pk)
+        anterior = oficio.archivo_pdf.name
+        oficio.archivo_pdf = SimpleUploadedFile('b.pdf', b'%PDF-2')
+        # alta del contenido (upsert) y su ContenidoPDF pendiente, UPDATE + historial,
+        # un UPDATE de referencias y la marca del texto de archivos del oficio;
+        # el PDF anterior queda sin referencias hasta `limpiar_archivos`
+        with self.assertNumQueries(6):
+            oficio.save()
+        self.assertEqual(
+            dict(Archivo.objects.values_list('nombre', 'referencias')),
+            {anterior: 0, oficio.archivo_pdf.name: 1},
+        )
+        self.assertTrue(oficio.archivo_pdf.storage.exists(oficio.archivo_pdf.name))
+
+    def test_instancia_recien_creada_no_relee(self):
+        oficio = self._crear()
+        oficio.denuncia = '123'
+        # el snapshot se actualiza tras el alta: solo UPDATE + historial
+        with self.assertNumQueries(2):
+            oficio.save()
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class AltaMasivaTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.caso = Caso.objects.create(usuario=cls.user, estado='EN_PROCESO')
+        cls.instituciones = Institucion.objects.bulk_create(
+            [Institucion(nombre=f'INSTITUCION {i}') for i in range(30)]
+        )
+        ContadorCodigo.objects.create(prefijo='OF', anio=timezone.localdate().year, ultimo=0)
+
+    def _alta(self, instituciones, contenido=b'%PDF-1.4 oficio'):
+        base = Oficio(caso=self.caso, plazo_horas=48, legajo='leg-1')
+        archivo = SimpleUploadedFile('oficio.pdf', contenido)
+        return crear_oficios_por_institucion(base, instituciones, self.user, archivo)
+
+    def test_crea_una_copia_por_institucion_con_pdf_compartido(self):
+        creados = self._alta(self.instituciones)
+        self.assertEqual(len(creados), 30)
+        self.assertEqual(len({o.codigo for o in creados}), 30)
+        self.assertEqual({o.archivo_pdf.name for o in creados}, {creados[0].archivo_pdf.name})
+        self.assertTrue(all(o.legajo == 'LEG-1' and o.fecha_vencimiento for o in creados))
+        self.assertEqual(MovimientoOficio.objects.filter(estado_nuevo='cargado').count(), 30)
+        self.assertEqual(Oficio.history.filter(history_type='+').count(), 30)
+
+    def test_cantidad_de_consultas_no_depende_de_instituciones(self):
+        with CaptureQueriesContext(connection) as pocas:
+            self._alta(self.instituciones[:3], contenido=b'%PDF a')
+        with CaptureQueriesContext(connection) as muchas:
+            self._alta(self.instituciones[3:], contenido=b'%PDF b')
+        self.assertEqual(len(pocas.captured_queries), len(muchas.captured_queries))
+
+    def test_borrar_una_copia_no_borra_el_pdf_compartido(self):
+        creados = self._alta(self.instituciones[:2])
+        nombre = creados[0].archivo_pdf.name
+        creados[0].delete()
+        self.assertTrue(creados[1].archivo_pdf.storage.exists(nombre))
+        self.assertEqual(Archivo.objects.get(nombre=nombre).referencias, 1)
+
+    def test_mismo_pdf_se_guarda_una_vez(self):
+        primeros = self._alta(self.instituciones[:3])
+        oficio = Oficio.objects.create(
+            caso=self.caso, plazo_horas=48, archivo_pdf=SimpleUploadedFile('otro nombre.pdf', b'%PDF-1.4 oficio'),
+        )
+        self.assertEqual(oficio.archivo_pdf.name, primeros[0].archivo_pdf.name)
+        self.assertEqual(Archivo.objects.get().referencias, 4)
+
+
+class BusquedaOficiosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.hospital = Institucion.objects.create(nombre='Hospital Pediátrico')
+        cls.juzgado = Juzgado.objects.create(nombre='Juzgado de Niñez 2')
+        cls.exacto = Oficio.objects.create(nro_oficio='1234', institucion=cls.hospital)
+        cls.prefijo = Oficio.objects.create(nro_oficio='12345/2026', juzgado=cls.juzgado)
+        cls.contiene = Oficio.objects.create(denuncia='DEN-991234')
+
+    def _buscar(self, valor):
+        return list(buscar_oficios(Oficio.objects.all(), valor).order_by('-relevancia', 'pk'))
+
+    def test_ignora_tildes_y_mayusculas(self):
+        self.assertEqual(self._buscar('PEDIATRICO'), [self.exacto])
+        self.assertEqual(self._buscar('niñez'), [self.prefijo])
+        self.assertEqual(self._buscar('juzgado ninez'), [self.prefijo])
+
+    def test_ordena_por_relevancia(self):
+        self.assertEqual(self._buscar('1234'), [self.exacto, self.prefijo, self.contiene])
+
+    def test_save_y_renombre_actualizan_el_texto(self):
+        self.contiene.legajo = 'leg-77'
+        self.contiene.save()
+        self.assertEqual(self._buscar('leg-77'), [self.contiene])
+        self.hospital.nombre = 'Centro de Salud'
+        self.hospital.save()
+        self.assertEqual(self._buscar('centro salud'), [self.exacto])
+        self.assertEqual(self._buscar('pediatrico'), [])
+
+    def test_listado_ordena_por_relevancia(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('oficios:list'), {'busqueda': '1234'})
+        self.assertEqual(list(response.context['oficios']), [self.exacto, self.prefijo, self.contiene])
+        self.assertEqual(response.context['total_oficios'], 3)
+
+
+class OficioDetalleTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.institucion = Institucion.objects.create(nombre='Escuela 1')
+        caso = Caso.objects.create(usuario=cls.user)
+        for i in range(7):
+            CasoNino.objects.create(caso=caso, nino=Nino.objects.create(nombre=f'Niño {i}', apellido='Gómez'))
+        cls.oficio = Oficio.objects.create(codigo='T-DET', institucion=cls.institucion, caso=caso)
+        cls.otro = Oficio.objects.create(codigo='T-DET-2', institucion=cls.institucion, caso=caso)
+
+    def _movimientos(self, oficio, cantidad):
+        MovimientoOficio.objects.bulk_create([
+            MovimientoOficio(oficio=oficio, usuario=self.user, institucion=self.institucion, estado_nuevo='asignado')
+            for _ in range(cantidad)
+        ])
+
+    def _consultas_detalle(self, oficio):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('oficios:detail', args=[oficio.pk]))
+        self.assertEqual(response.status_code, 200)
+        return len(ctx), response
+
+    def test_consultas_no_dependen_del_historial(self):
+        self._movimientos(self.oficio, 2)
+        self._movimientos(self.otro, 60)
+        pocas, _ = self._consultas_detalle(self.oficio)
+        muchas, response = self._consultas_detalle(self.otro)
+        self.assertEqual(pocas, muchas)
+        self.assertEqual(len(response.context['movimientos']), views.DETALLE_MOVIMIENTOS_POR_PAGINA)
+        self.assertTrue(response.context['hay_mas_movimientos'])
+        self.assertEqual(len(response.context['oficio'].caso.ninos_muestra), 5)
+        self.assertEqual(response.context['ninos_restantes'], 2)
+        self.assertEqual(response.context['partes_restantes'], 0)
+
+    def test_paginas_siguientes_de_movimientos(self):
+        self._movimientos(self.otro, views.DETALLE_MOVIMIENTOS_POR_PAGINA + 5)
+        self.client.force_login(self.user)
+        url = reverse('oficios:movimientos', args=[self.otro.pk])
+        datos = self.client.get(url, {'desde': views.DETALLE_MOVIMIENTOS_POR_PAGINA}).json()
+        self.assertEqual(datos['html'].count('<tr>'), 5)
+        self.assertIsNone(datos['siguiente'])
+        datos = self.client.get(url, {'desde': 0}).json()
+        self.assertEqual(datos['siguiente'], views.DETALLE_MOVIMIENTOS_POR_PAGINA)
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class CorreosSalientesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.institucion = Institucion.objects.create(nombre='Escuela 1', email='escuela@example.com')
+
+    def _oficio(self):
+        return Oficio.objects.create(
+            codigo='T-MAIL',
+            archivo_pdf=SimpleUploadedFile('oficio.pdf', b'%PDF-1.4 prueba', content_type='application/pdf'),
+        )
+
+    def test_asignar_solo_encola(self):
+        oficio = self._oficio()
+        self.client.force_login(self.user)
+        self.client.post(
+            reverse('oficios:enviar', args=[oficio.pk]),
+            {'nuevo_estado': 'asignado', 'institucion': self.institucion.pk},
+        )
+        self.assertEqual(len(mail.outbox), 0)
+        correo = oficio.correos.get()
+        self.assertEqual(correo.estado, CorreoSaliente.ESTADO_PENDIENTE)
+        self.assertEqual(correo.destinatario, 'escuela@example.com')
+
+        call_command('procesar_correos', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].attachments[0][1], b'%PDF-1.4 prueba')
+        # El blob se guarda por su SHA-256; el adjunto llega con el codigo del oficio
+        self.assertEqual(mail.outbox[0].attachments[0][0], 'T-MAIL.pdf')
+        correo.refresh_from_db()
+        self.assertEqual(correo.estado, CorreoSaliente.ESTADO_ENVIADO)
+        self.assertContains(self.client.get(reverse('oficios:detail', args=[oficio.pk])), 'Envíos por email')
+
+    def test_lote_con_una_conexion(self):
+        for i in range(3):
+            correos.encolar(f'destino{i}@example.com', f'Aviso {i}')
+        with mock.patch('oficios.correos.get_connection', wraps=correos.get_connection) as conexion:
+            self.assertEqual(correos.procesar_lote(10), (3, 0))
+        conexion.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_reintentos_con_espera_hasta_error(self):
+        correo = correos.encolar('destino@example.com', 'Aviso')
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('smtp caido')):
+            self.assertEqual(correos.procesar_lote(), (0, 1))
+            correo.refresh_from_db()
+            self.assertEqual((correo.estado, correo.intentos, correo.ultimo_error), ('pendiente', 1, 'smtp caido'))
+            self.assertGreater(correo.proximo_intento, timezone.now())
+            # Todavia no vencio la espera
+            self.assertEqual(correos.procesar_lote(), (0, 0))
+            for _ in range(correos.MAX_INTENTOS - 1):
+                CorreoSaliente.objects.update(proximo_intento=timezone.now())
+                correos.procesar_lote()
+        correo.refresh_from_db()
+        self.assertEqual((correo.estado, correo.intentos), ('error', correos.MAX_INTENTOS))
+
+
+@override_settings(ALERTAS_ANTICIPACION_HORAS=48, ALERTAS_VENCIMIENTO_DESTINATARIOS=['coordinacion@example.com'])
+class AlertasVencimientoTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.escuela = Institucion.objects.create(nombre='Escuela 1', email='escuela@example.com')
+        cls.hospital = Institucion.objects.create(nombre='Hospital', email='hospital@example.com')
+
+    def _oficio(self, codigo, vence, institucion, **kwargs):
+        return Oficio.objects.create(codigo=codigo, institucion=institucion, fecha_vencimiento=vence, **kwargs)
+
+    def test_resumen_por_institucion_sin_repetir(self):
+        ahora = timezone.now()
+        self._oficio('T-V1', ahora - timedelta(hours=1), self.escuela)
+        self._oficio('T-V2', ahora - timedelta(hours=2), self.escuela)
+        self._oficio('T-P1', ahora + timedelta(hours=24), self.hospital)
+        self._oficio('T-E1', ahora - timedelta(hours=1), self.hospital, estado='enviado')
+        self._oficio('T-L1', ahora + timedelta(days=10), self.hospital)
+
+        resultado = alertas.procesar_alertas(ahora)
+        # Un correo por institucion y uno con el resumen completo
+        self.assertEqual(resultado[AlertaOficio.TIPO_VENCIDO], (2, 2))
+        self.assertEqual(resultado[AlertaOficio.TIPO_POR_VENCER], (1, 2))
+        correo = CorreoSaliente.objects.get(destinatario='escuela@example.com', asunto__contains='vencidos')
+        self.assertIn('T-V1', correo.cuerpo)
+        self.assertIn('T-V2', correo.cuerpo)
+        self.assertEqual(correo.alertas.count(), 2)
+
+        # Segunda corrida: nada nuevo cruzo el umbral
+        self.assertEqual(alertas.procesar_alertas(ahora + timedelta(minutes=5)), {
+            AlertaOficio.TIPO_POR_VENCER: (0, 0),
+            AlertaOficio.TIPO_VENCIDO: (0, 0),
+        })
+
+        # Pasado el vencimiento del proximo, solo se alerta ese
+        resultado = alertas.procesar_alertas(ahora + timedelta(hours=25))
+        self.assertEqual(resultado[AlertaOficio.TIPO_VENCIDO], (1, 2))
+
+    def test_cargados_detras_de_la_marca(self):
+        ahora = timezone.now()
+        alertas.procesar_alertas(ahora)
+        self._oficio('T-V9', ahora - timedelta(hours=1), self.escuela)
+        self._oficio('T-P9', ahora + timedelta(hours=24), self.escuela)
+        # Sus vencimientos ya quedaron detras de las marcas, pero se cargaron despues de la corrida
+        resultado = alertas.procesar_alertas(ahora + timedelta(minutes=5))
+        self.assertEqual(resultado[AlertaOficio.TIPO_VENCIDO], (1, 2))
+        self.assertEqual(resultado[AlertaOficio.TIPO_POR_VENCER], (1, 2))
+        # Ya avisados: no se repiten
+        self.assertEqual(alertas.procesar_alertas(ahora + timedelta(minutes=10)), {
+            AlertaOficio.TIPO_POR_VENCER: (0, 0),
+            AlertaOficio.TIPO_VENCIDO: (0, 0),
+        })
+
+    def test_corrida_despues_de_varios_dias(self):
+        ahora = timezone.now()
+        oficio = self._oficio('T-V8', ahora + timedelta(hours=6), self.escuela)
+        # Guardado antes de la primera corrida, que lo avisa como proximo a vencer
+        Oficio.objects.filter(pk=oficio.pk).update(actualizado=ahora - timedelta(hours=1))
+        self.assertEqual(alertas.procesar_alertas(ahora)[AlertaOficio.TIPO_POR_VENCER], (1, 2))
+        # El scheduler estuvo tres dias sin correr: el vencido igual se avisa
+        resultado = alertas.procesar_alertas(ahora + timedelta(days=3))
+        self.assertEqual(resultado[AlertaOficio.TIPO_VENCIDO], (1, 2))
+        self.assertTrue(AlertaOficio.objects.filter(oficio=oficio, tipo=AlertaOficio.TIPO_VENCIDO).exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExportacionOficiosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.escuela = Institucion.objects.create(nombre='Escuela 1')
+        cls.caso = Caso.objects.create(expte='EXP-9', usuario=cls.user)
+        cls.oficio = Oficio.objects.create(codigo='T-EXP1', institucion=cls.escuela, caso=cls.caso)
+        MovimientoOficio.objects.create(oficio=cls.oficio, estado_nuevo='asignado', detalle='primero')
+        MovimientoOficio.objects.create(oficio=cls.oficio, estado_nuevo='respondido', detalle='ultimo')
+        Oficio.objects.create(codigo='T-EXP2', estado='enviado')
+
+    def _leer_csv(self, response):
+        contenido = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(io.StringIO(contenido), delimiter=';'))
+
+    def test_csv_respeta_filtros_y_trae_ultimo_movimiento(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('oficios:exportar'), {'institucion': self.escuela.pk, 'formato': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        encabezados, *filas = self._leer_csv(response)
+        self.assertEqual(len(filas), 1)
+        fila = dict(zip(encabezados, filas[0]))
+        self.assertEqual(fila['Código'], 'T-EXP1')
+        self.assertEqual(fila['Institución'], 'Escuela 1')
+        self.assertEqual(fila['Expediente'], 'EXP-9')
+        self.assertEqual(fila['Estado del último movimiento'], 'Respondido')
+        self.assertEqual(fila['Detalle del último movimiento'], 'ULTIMO')
+
+    def test_xlsx_y_consultas_constantes(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(reverse('oficios:exportar'), {'formato': 'xlsx'})
+            contenido = b''.join(response.streaming_content)
+        # Una sola consulta para las filas (el ultimo movimiento va como subconsulta)
+        filas = [q['sql'] for q in consultas.captured_queries if q['sql'].startswith('SELECT "oficios_oficio"')]
+        self.assertEqual(len(filas), 1)
+        with zipfile.ZipFile(io.BytesIO(contenido)) as libro:
+            hoja = libro.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertIn('T-EXP1', hoja)
+        self.assertIn('T-EXP2', hoja)
+
+    @override_settings(EXPORTACION_LIMITE_DIRECTO=1)
+    def test_exportacion_grande_en_segundo_plano(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('oficios:exportar'), {'estado': 'enviado', 'formato': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ExportacionOficios.objects.exists())
+
+        response = self.client.get(reverse('oficios:exportar'), {'formato': 'csv'})
+        self.assertRedirects(response, reverse('oficios:exportaciones'))
+        exportacion = ExportacionOficios.objects.get()
+        self.assertEqual(exportacion.estado, ExportacionOficios.ESTADO_PENDIENTE)
+
+        call_command('procesar_exportaciones', stdout=StringIO())
+        exportacion.refresh_from_db()
+        self.assertEqual((exportacion.estado, exportacion.filas), (ExportacionOficios.ESTADO_LISTA, 2))
+
+        descarga = reverse('oficios:exportacion_descargar', args=[exportacion.pk])
+        response = self.client.get(descarga)
+        self.assertEqual(len(self._leer_csv(response)), 3)
+        # Solo el dueño la descarga
+        otro = get_user_model().objects.create_user(username='otro', password='x')
+        self.client.force_login(otro)
+        self.assertEqual(self.client.get(descarga).status_code, 404)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class DescargaPDFTest(TestCase):
+    CONTENIDO = b'%PDF-1.4 ' + bytes(range(256)) * 400
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.oficio = Oficio.objects.create(
+            codigo='OF-00001-2025', archivo_pdf=SimpleUploadedFile('scan.pdf', cls.CONTENIDO),
+        )
+        cls.url = reverse('oficios:pdf', args=[cls.oficio.pk])
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_requiere_sesion(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_completo_y_condicional(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENIDO)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('OF-00001-2025.pdf', response['Content-Disposition'])
+        # El nombre por contenido es el SHA-256: sirve de ETag fuerte
+        self.assertIn(response['ETag'].strip('"'), self.oficio.archivo_pdf.name)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304
+        )
+
+    def test_rangos(self):
+        tamanio = len(self.CONTENIDO)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{tamanio}')
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENIDO[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(response.streaming_content), self.CONTENIDO[-10:])
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE=f'bytes={tamanio}-').status_code, 416)
+        # If-Range con otra version: archivo completo
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"viejo"')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(DESCARGAS_ENVIO='x-accel', DESCARGAS_PREFIJO_INTERNO='/protegido/')
+    def test_delegar_al_servidor_web(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protegido/{self.oficio.archivo_pdf.name}')
+        self.assertEqual(response.content, b'')
+
+    def test_movimientos_y_respuestas(self):
+        movimiento = MovimientoOficio.objects.create(
+            oficio=self.oficio, estado_nuevo='asignado', archivo_pdf=SimpleUploadedFile('m.pdf', b'%PDF mov'),
+        )
+        respuesta = Respuesta.objects.create(id_oficio=self.oficio)
+        response = self.client.get(reverse('oficios:movimiento_pdf', args=[movimiento.pk]))
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF mov')
+        self.assertEqual(self.client.get(reverse('oficios:respuesta_pdf', args=[respuesta.pk])).status_code, 404)
+
+
+def _extraer_falso(datos, *args):
+    # El "texto" del PDF de prueba es su propio contenido
+    return 1, normalizar(datos.decode()), b'png'
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+@mock.patch('core.pdf.extraer', side_effect=_extraer_falso)
+class TextoArchivosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+
+    def _procesar(self):
+        # Pool de hilos en lugar de procesos: el mock de la extraccion se comparte
+        with mock.patch('oficios.management.commands.procesar_pdfs.ProcessPoolExecutor', ThreadPoolExecutor):
+            call_command('procesar_pdfs', '--procesos', '1', stdout=StringIO())
+
+    def _encontrados(self, texto):
+        return list(buscar_oficios(Oficio.objects.all(), texto).values_list('pk', flat=True))
+
+    def test_busqueda_por_texto_de_los_pdf(self, extraer):
+        oficio = Oficio.objects.create(archivo_pdf=SimpleUploadedFile('a.pdf', b'Denuncia por ABANDONO'))
+        respuesta = Respuesta.objects.create(
+            id_oficio=oficio, respuesta_pdf=SimpleUploadedFile('r.pdf', b'Informe socioambiental'),
+        )
+        self.assertTrue(TextoArchivosOficio.objects.get(pk=oficio.pk).pendiente)
+        self.assertEqual(self._encontrados('abandono'), [])
+
+        self._procesar()
+        self.assertEqual(extraer.call_count, 2)
+        self.assertEqual(self._encontrados('abandono socioambiental'), [oficio.pk])
+        fila = TextoArchivosOficio.objects.get(pk=oficio.pk)
+        self.assertFalse(fila.pendiente)
+        self.assertEqual(fila.texto, 'denuncia por abandono informe socioambiental')
+        # Los listados leen texto_busqueda: el texto de los PDF queda fuera
+        self.assertNotIn('abandono', Oficio.objects.get(pk=oficio.pk).texto_busqueda)
+
+        # Cambiar el PDF de la respuesta vuelve a marcar el oficio
+        respuesta.respuesta_pdf = SimpleUploadedFile('r2.pdf', b'Informe final')
+        respuesta.save()
+        self._procesar()
+        self.assertEqual(self._encontrados('socioambiental'), [])
+        self.assertEqual(self._encontrados('informe final'), [oficio.pk])
+        # Editar el oficio conserva el texto de los PDF
+        oficio.refresh_from_db()
+        oficio.caratula_oficio = 'Otra caratula'
+        oficio.save()
+        self.assertEqual(self._encontrados('abandono'), [oficio.pk])
+
+    def test_indexar_con_consultas_fijas(self, extraer):
+        oficios = [
+            Oficio.objects.create(archivo_pdf=SimpleUploadedFile(f'{nombre}.pdf', nombre.encode()))
+            for nombre in ('alfa', 'beta', 'gamma')
+        ]
+        listos, _ = pdf.procesar_lote()
+        texto_archivos.marcar_por_archivos(listos)
+        # Pendientes, nombres (oficio, respuestas, movimientos), textos y en una
+        # transaccion (savepoint) el bulk_update y la baja de la marca
+        with self.assertNumQueries(9):
+            self.assertEqual(texto_archivos.indexar_pendientes(), 3)
+        self.assertEqual(self._encontrados('gamma'), [oficios[2].pk])
+
+    def test_miniatura(self, extraer):
+        self.client.force_login(self.user)
+        oficio = Oficio.objects.create(codigo='OF-00009-2025', archivo_pdf=SimpleUploadedFile('a.pdf', b'pdf'))
+        url = reverse('oficios:pdf_miniatura', args=[oficio.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        pdf.procesar_lote()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(b''.join(response.streaming_content), b'png')
+        detalle = self.client.get(reverse('oficios:detail', args=[oficio.pk]))
+        self.assertContains(detalle, url)
+        self.assertContains(detalle, '1 página')
+
+
+class OficiosAPITest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.escuela = Institucion.objects.create(nombre='Escuela 1')
+        ahora = timezone.now()
+        for i in range(5):
+            Oficio.objects.create(
+                codigo=f'T-API{i}', institucion=cls.escuela if i % 2 else None,
+                fecha_vencimiento=ahora + timedelta(days=i),
+            )
+        cls.oficio = Oficio.objects.get(codigo='T-API1')
+        MovimientoOficio.objects.create(oficio=cls.oficio, estado_nuevo='asignado', detalle='a la escuela')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_campos_filtros_y_cursor(self):
+        url = reverse('oficios:api_oficios')
+        datos = self.client.get(url, {'institucion': self.escuela.pk, 'fields': 'codigo,institucion_nombre', 'limite': 1}).json()
+        self.assertEqual(datos['resultados'], [{'codigo': 'T-API1', 'institucion_nombre': 'Escuela 1'}])
+        siguiente = self.client.get(url, {
+            'institucion': self.escuela.pk, 'fields': 'codigo', 'limite': 1, 'cursor': datos['siguiente'],
+        }).json()
+        self.assertEqual(siguiente['resultados'], [{'codigo': 'T-API3'}])
+        self.assertIsNone(siguiente['siguiente'])
+
+        self.assertEqual(self.client.get(url, {'fields': 'codigo,clave'}).status_code, 400)
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_etag_responde_304_sin_leer_filas(self):
+        url = reverse('oficios:api_oficios')
+        response = self.client.get(url)
+        etag = response['ETag']
+        with CaptureQueriesContext(connection) as consultas:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len([q for q in consultas.captured_queries if 'oficios_oficio' in q['sql']]), 1)
+
+        self.oficio.nro_oficio = '123'
+        self.oficio.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detalle_y_movimientos(self):
+        datos = self.client.get(reverse('oficios:api_oficio', args=[self.oficio.pk]), {'fields': 'codigo,estado'}).json()
+        self.assertEqual(datos, {'codigo': 'T-API1', 'estado': 'cargado'})
+
+        url = reverse('oficios:api_movimientos', args=[self.oficio.pk])
+        response = self.client.get(url, {'fields': 'estado_nuevo,detalle'})
+        self.assertEqual(response.json()['resultados'], [{'estado_nuevo': 'asignado', 'detalle': 'A LA ESCUELA'}])
+        self.assertEqual(
+            self.client.get(url, {'fields': 'estado_nuevo,detalle'}, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304
+        )
+        self.assertEqual(self.client.get(reverse('oficios:api_respuestas', args=[self.oficio.pk])).json()['resultados'], [])
+        self.assertEqual(self.client.get(reverse('oficios:api_movimientos', args=[999999])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('oficios:api_respuestas', args=[999999])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('oficios:api_oficio', args=[999999])).status_code, 404)
+
+    def test_etag_de_las_secciones_sigue_la_version_de_datos(self):
+        for nombre in ('api_oficio', 'api_movimientos', 'api_respuestas'):
+            url = reverse(f'oficios:{nombre}', args=[self.oficio.pk])
+            etag = self.client.get(url)['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            versiones.invalidar_datos(versiones.OFICIOS)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class AutocompletarTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        Institucion.objects.bulk_create([Institucion(nombre=f'Escuela {i:02d}') for i in range(30)])
+        cls.elegida = Institucion.objects.get(nombre='Escuela 07')
+        cls.nino = Nino.objects.create(nombre='ANA', apellido='SOSA')
+
+    def test_solo_se_renderizan_los_elegidos(self):
+        filtro = OficioFilter({'institucion': self.elegida.pk, 'nino': self.nino.pk}, queryset=Oficio.objects.all())
+        html = str(filtro.form['institucion'])
+        self.assertEqual(html.count('<option'), 2)
+        self.assertIn(f'value="{self.elegida.pk}" selected>Escuela 07<', html)
+        self.assertIn(f'data-autocompletar="{reverse("oficios:autocompletar_instituciones")}"', html)
+        self.assertIn('ANA SOSA', str(filtro.form['nino']))
+        # Valor invalido en el querystring: sin opcion elegida y sin error
+        self.assertEqual(str(OficioFilter({'juzgado': 'x'}).form['juzgado']).count('<option'), 1)
+
+        with CaptureQueriesContext(connection) as ctx:
+            html = str(OficioForm()['instituciones'])
+        self.assertNotIn('<option', html)
+        self.assertEqual(len(ctx.captured_queries), 0)
+
+    def test_endpoint_acotado_con_cursor(self):
+        url = reverse('oficios:autocompletar_instituciones')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.user)
+
+        datos = self.client.get(url).json()
+        self.assertEqual(len(datos['resultados']), 20)
+        self.assertEqual(datos['resultados'][0]['texto'], 'Escuela 00')
+        resto = self.client.get(url, {'cursor': datos['siguiente']}).json()
+        self.assertEqual([r['texto'] for r in resto['resultados']][:1], ['Escuela 20'])
+        self.assertEqual(len(resto['resultados']), 10)
+        self.assertIsNone(resto['siguiente'])
+
+        datos = self.client.get(url, {'search': 'la 07'}).json()
+        self.assertEqual(datos['resultados'], [{'id': self.elegida.pk, 'texto': 'Escuela 07'}])
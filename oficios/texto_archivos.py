@@ -0,0 +1,89 @@
+"""
+Texto de los PDF en la busqueda de oficios.
+
+El texto de un oficio es el de su PDF, el de sus respuestas y el de sus
+movimientos (core.ContenidoPDF, en ese orden y sin repetir blobs), recortado a
+LIMITE_TEXTO. Se guarda solo en TextoArchivosOficio (no en Oficio.texto_busqueda,
+que leen todos los listados) y la busqueda lo consulta con un EXISTS sobre su
+indice de trigramas (ver oficios/busqueda.py). Un oficio se marca pendiente cuando cambia alguno de sus PDF o cuando
+termina de procesarse un blob que usa; `procesar_pdfs` lo recalcula por lotes.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from core import versiones
+from core.models import ContenidoPDF
+from .models import MovimientoOficio, Oficio, Respuesta, TextoArchivosOficio
+
+
+LIMITE_TEXTO = 20000
+
+
+def _fuentes():
+    # (queryset, columna del oficio, columna del archivo), en el orden en que se une el texto
+    return (
+        (Oficio.objects.order_by(), 'pk', 'archivo_pdf'),
+        (Respuesta.objects.order_by('fecha_hora', 'pk'), 'id_oficio_id', 'respuesta_pdf'),
+        (MovimientoOficio.objects.order_by('fecha_creacion', 'pk'), 'oficio_id', 'archivo_pdf'),
+    )
+
+
+def marcar_por_archivos(nombres):
+    """Marca los oficios que usan alguno de los blobs `nombres` (ya procesados)."""
+    nombres = list(nombres)
+    if not nombres:
+        return
+    oficio_ids = set()
+    for queryset, oficio, archivo in _fuentes():
+        oficio_ids.update(queryset.filter(**{f'{archivo}__in': nombres}).order_by().values_list(oficio, flat=True))
+    TextoArchivosOficio.marcar(oficio_ids)
+
+
+def _nombres_por_oficio(oficio_ids):
+    nombres = defaultdict(list)
+    for queryset, oficio, archivo in _fuentes():
+        for oficio_id, nombre in queryset.filter(**{f'{oficio}__in': oficio_ids}).values_list(oficio, archivo):
+            if nombre and nombre not in nombres[oficio_id]:
+                nombres[oficio_id].append(nombre)
+    return nombres
+
+
+def indexar_pendientes(tamano=200):
+    """
+    Recalcula el texto de hasta `tamano` oficios pendientes con un numero fijo de
+    consultas. Devuelve la cantidad de oficios.
+    """
+    lote = list(
+        TextoArchivosOficio.objects.filter(pendiente=True)
+        .order_by('marcado')
+        .values_list('oficio_id', 'marcado')[:tamano]
+    )
+    if not lote:
+        return 0
+
+    oficio_ids = [oficio_id for oficio_id, _ in lote]
+    nombres = _nombres_por_oficio(oficio_ids)
+    textos = dict(
+        ContenidoPDF.objects.filter(
+            archivo__nombre__in={nombre for lista in nombres.values() for nombre in lista},
+            estado=ContenidoPDF.ESTADO_LISTO,
+        ).values_list('archivo__nombre', 'texto')
+    )
+
+    filas = []
+    for oficio_id in oficio_ids:
+        # Sin '|': el texto del PDF no debe parecer un limite de campo para la relevancia
+        texto = ' '.join(textos[nombre] for nombre in nombres[oficio_id] if textos.get(nombre))
+        filas.append(TextoArchivosOficio(oficio_id=oficio_id, texto=texto.replace('|', ' ')[:LIMITE_TEXTO]))
+
+    # Solo deja de estar pendiente si nadie lo volvio a marcar mientras tanto
+    sin_cambios = Q()
+    for oficio_id, marcado in lote:
+        sin_cambios |= Q(oficio_id=oficio_id, marcado=marcado)
+    with transaction.atomic():
+        TextoArchivosOficio.objects.bulk_update(filas, ['texto'])
+        TextoArchivosOficio.objects.filter(sin_cambios).update(pendiente=False)
+    versiones.invalidar_datos(versiones.OFICIOS)
+    return len(lote)
@@ -1,5 +1,14 @@
 from django.urls import path
 from . import views
+from .api_views import (
+    InstitucionAutocompletarView,
+    JuzgadoAutocompletarView,
+    OficioAPIView,
+    OficioDetalleAPIView,
+    OficioMovimientosAPIView,
+    OficioRespuestasAPIView,
+)
+from .archivo_views import MovimientoPDFView, OficioMiniaturaView, OficioPDFView, RespuestaPDFView
 from .juzgado_views import (
     JuzgadoListView, JuzgadoCreateView, JuzgadoDetailView, JuzgadoUpdateView, JuzgadoDeleteView
 )
@@ -22,12 +31,30 @@ urlpatterns = [
     path('<int:pk>/editar/', views.OficioUpdateView.as_view(), name='update'),
     path('<int:pk>/eliminar/', views.OficioDeleteView.as_view(), name='delete'),
     path('<int:pk>/responder/', views.RespuestaCreateView.as_view(), name='responder'),
+    path('<int:pk>/movimientos/', views.OficioMovimientosView.as_view(), name='movimientos'),
+    path('<int:pk>/respuestas/', views.OficioRespuestasView.as_view(), name='respuestas'),
+    # PDF con sesion iniciada (core.descargas)
+    path('<int:pk>/pdf/', OficioPDFView.as_view(), name='pdf'),
+    path('<int:pk>/pdf/miniatura/', OficioMiniaturaView.as_view(), name='pdf_miniatura'),
+    path('movimientos/<int:pk>/pdf/', MovimientoPDFView.as_view(), name='movimiento_pdf'),
+    path('respuestas/<int:pk>/pdf/', RespuestaPDFView.as_view(), name='respuesta_pdf'),
     # Listados por estado
     path('estado/<str:estado>/', views.OficioEstadoListView.as_view(), name='list_by_estado'),
+    # Exportacion del listado filtrado
+    path('exportar/', views.OficioExportarView.as_view(), name='exportar'),
+    path('exportaciones/', views.ExportacionListView.as_view(), name='exportaciones'),
+    path('exportaciones/<int:pk>/descargar/', views.ExportacionDescargarView.as_view(), name='exportacion_descargar'),
     path('referencias/', views.referencias_home, name='referencias_home'),
     
-    # API para búsqueda de niños
-    path('api/ninos/buscar/', views.buscar_ninos, name='buscar_ninos'),
+    # API de lectura (JSON con ETag, paginada por cursor)
+    path('api/', OficioAPIView.as_view(), name='api_oficios'),
+    path('api/<int:pk>/', OficioDetalleAPIView.as_view(), name='api_oficio'),
+    path('api/<int:pk>/movimientos/', OficioMovimientosAPIView.as_view(), name='api_movimientos'),
+    path('api/<int:pk>/respuestas/', OficioRespuestasAPIView.as_view(), name='api_respuestas'),
+
+    # Opciones de los selects con autocompletado (core.widgets)
+    path('api/instituciones/', InstitucionAutocompletarView.as_view(), name='autocompletar_instituciones'),
+    path('api/juzgados/', JuzgadoAutocompletarView.as_view(), name='autocompletar_juzgados'),
     
     # Acción para marcar oficio como enviado
     path('<int:pk>/enviar/', views.OficioEnviarView.as_view(), name='enviar'),
@@ -4,53 +4,32 @@ from django.urls import reverse_lazy, reverse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.utils import timezone
-from django.http import JsonResponse, HttpResponseRedirect
-from django.conf import settings
-from django.core.mail import EmailMessage
-from django.db.models import Q, F
+from django.http import FileResponse, Http404, JsonResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.db.models import Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.template.loader import render_to_string
 from django.views.decorators.http import require_http_methods
-import unicodedata
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
 from django.shortcuts import render
 
 from .models import (
-    Oficio, Institucion, Caratula, Juzgado, MovimientoOficio, Respuesta
+    Oficio, Institucion, Caratula, Juzgado, MovimientoOficio, Respuesta, CorreoSaliente,
+    ExportacionOficios
 )
-from casos.models import Caso
+from casos.models import Caso, CasoNino, CasoParte
+from personas.models import Nino, Parte
 from .forms import OficioForm
 from .forms_respuesta import RespuestaForm
 from .filters import OficioFilter
+from .contadores import ContadorPaginator, contar_oficios
+from .alta_masiva import crear_oficios_por_institucion
+from .correos import encolar_asignacion
+from . import exportar
 from .permissions import is_coordinacion_opd
-
-
-def buscar_ninos(request):
-    """
-    Vista para buscar niños por nombre, apellido o documento.
-    Devuelve resultados en formato JSON para ser usados en autocompletado.
-    """
-    query = request.GET.get('q', '').strip()
-    
-    if not query or len(query) < 2:
-        return JsonResponse([], safe=False)
-    
-    # Buscar por nombre, apellido o documento
-    ninos = Nino.objects.filter(
-        Q(nombres__icontains=query) |
-        Q(apellidos__icontains=query) |
-        Q(documento_identidad__icontains=query)
-    ).distinct()[:10]  # Limitar a 10 resultados
-    
-    # Preparar los datos para la respuesta JSON
-    results = [{
-        'id': nino.id,
-        'nombres': nino.nombres,
-        'apellidos': nino.apellidos,
-        'documento_identidad': nino.documento_identidad or '',
-        'fecha_nacimiento': nino.fecha_nacimiento.strftime('%d/%m/%Y') if nino.fecha_nacimiento else ''
-    } for nino in ninos]
-    
-    return JsonResponse(results, safe=False)
+from core import planillas, roles
+from core.models import ContenidoPDF
+from core.paginacion import PaginacionCursorMixin
 
 
 @login_required
@@ -64,8 +43,55 @@ def referencias_home(request):
     }
     return render(request, 'oficios/referencias_home.html', context)
 
+class OficioContadoresMixin:
+    """
+    Calcula los contadores del listado (total, vencidos y por estado) en una sola
+    consulta y reutiliza el total en el paginador y en la plantilla.
+    """
+    paginator_class = ContadorPaginator
+
+    def get_totales(self, queryset):
+        if not hasattr(self, '_totales'):
+            self.now = timezone.now()
+            try:
+                self._totales = contar_oficios(queryset, now=self.now)
+            except Exception:
+                self._totales = {
+                    'total_oficios': None,
+                    'total_vencidos': 0,
+                    'total_asignados': 0,
+                    'total_respondidos': 0,
+                    'total_enviados': 0,
+                }
+        return self._totales
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        totales = self.get_totales(queryset)
+        return self.paginator_class(
+            queryset,
+            per_page,
+            total=totales['total_oficios'],
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            **kwargs
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        totales = self.get_totales(self.object_list)
+        context['now'] = self.now
+        context.update(totales)
+        if totales['total_oficios'] is None and context.get('paginator') is not None:
+            context['total_oficios'] = context['paginator'].count
+        return context
+
+    def get_total_cursor(self, queryset):
+        # Con paginacion por cursor el total sale de los mismos contadores
+        return self.get_totales(queryset)['total_oficios']
+
+
 # Vista de listado de oficios
-class OficioListView(LoginRequiredMixin, ListView):
+class OficioListView(LoginRequiredMixin, OficioContadoresMixin, PaginacionCursorMixin, ListView):
     model = Oficio
     template_name = 'oficios/oficio_list.html'
     context_object_name = 'oficios'
@@ -74,33 +100,19 @@ class OficioListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         queryset = super().get_queryset()
         self.filterset = OficioFilter(self.request.GET, queryset=queryset)
-        # Orden por fecha de vencimiento ascendente (nulos al final), luego por emisiÃƒÂ³n desc
-        return (
-            self.filterset.qs
-            .select_related('institucion', 'juzgado', 'usuario')
-            .order_by(F('fecha_vencimiento').asc(nulls_last=True), '-fecha_emision')
+        # Orden por fecha de vencimiento ascendente (nulos al final), luego por emisión desc;
+        # si hay búsqueda, primero por relevancia
+        return self.filterset.ordenar(
+            self.filterset.qs.select_related('institucion', 'juzgado', 'usuario')
         )
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        now = timezone.now()
-        context['now'] = now
         context['filter'] = getattr(self, 'filterset', OficioFilter(queryset=self.get_queryset()))
-        try:
-            qs = self.filterset.qs if hasattr(self, 'filterset') else self.get_queryset()
-            context['total_vencidos'] = qs.filter(fecha_vencimiento__lt=now).exclude(estado='enviado').count()
-            context['total_asignados'] = qs.filter(estado='asignado').count()
-            context['total_respondidos'] = qs.filter(estado='respondido').count()
-            context['total_enviados'] = qs.filter(estado='enviado').count()
-        except Exception:
-            context['total_vencidos'] = 0
-            context['total_asignados'] = 0
-            context['total_respondidos'] = 0
-            context['total_enviados'] = 0
         return context
 
 
-class OficioEstadoListView(LoginRequiredMixin, ListView):
+class OficioEstadoListView(LoginRequiredMixin, OficioContadoresMixin, PaginacionCursorMixin, ListView):
     model = Oficio
     template_name = 'oficios/oficio_list.html'
     context_object_name = 'oficios'
@@ -111,40 +123,88 @@ class OficioEstadoListView(LoginRequiredMixin, ListView):
         base_qs = Oficio.objects.select_related('institucion', 'juzgado', 'usuario').filter(estado=estado)
         # Aplicar filtros enviados por GET sobre el queryset ya filtrado por estado
         self.filterset = OficioFilter(self.request.GET, queryset=base_qs)
-        return self.filterset.qs.order_by(F('fecha_vencimiento').asc(nulls_last=True), '-fecha_emision')
+        return self.filterset.ordenar(self.filterset.qs)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        now = timezone.now()
-        context['now'] = now
         # Reusar el mismo formulario de filtros, mostrando el filterset aplicado
         estado = self.kwargs.get('estado')
         context['filter'] = getattr(self, 'filterset', OficioFilter(self.request.GET, queryset=self.get_queryset()))
         context['estado_actual'] = estado
-        try:
-            qs = self.filterset.qs if hasattr(self, 'filterset') else self.get_queryset()
-            context['total_vencidos'] = qs.filter(fecha_vencimiento__lt=now).exclude(estado='enviado').count()
-            context['total_asignados'] = qs.filter(estado='asignado').count()
-            context['total_respondidos'] = qs.filter(estado='respondido').count()
-            context['total_enviados'] = qs.filter(estado='enviado').count()
-        except Exception:
-            context['total_vencidos'] = 0
-            context['total_asignados'] = 0
-            context['total_respondidos'] = 0
-            context['total_enviados'] = 0
         return context
 
+
+class OficioExportarView(LoginRequiredMixin, View):
+    """
+    Exporta el listado filtrado (mismos parametros que el listado) a CSV o XLSX.
+    Hasta EXPORTACION_LIMITE_DIRECTO filas se envia en la misma respuesta, fila
+    por fila; por encima se encola una ExportacionOficios para generar en segundo plano.
+    """
+
+    def get(self, request):
+        formato = request.GET.get('formato', 'csv')
+        if formato not in planillas.CONTENT_TYPES:
+            formato = 'csv'
+        parametros = request.GET.copy()
+        parametros.pop('formato', None)
+        parametros.pop('page', None)
+
+        queryset = exportar.oficios_filtrados(parametros)
+        if queryset.count() > exportar.limite_directo():
+            ExportacionOficios.objects.create(
+                usuario=request.user,
+                formato=formato,
+                parametros=parametros.urlencode(),
+            )
+            messages.info(
+                request,
+                'La exportación es grande y se está generando en segundo plano. '
+                'Podrá descargarla desde "Mis exportaciones" cuando esté lista.'
+            )
+            return redirect('oficios:exportaciones')
+
+        response = StreamingHttpResponse(
+            exportar.contenido(queryset, formato),
+            content_type=planillas.CONTENT_TYPES[formato],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{exportar.nombre_archivo(formato)}"'
+        return response
+
+
+class ExportacionListView(LoginRequiredMixin, ListView):
+    model = ExportacionOficios
+    template_name = 'oficios/exportacion_list.html'
+    context_object_name = 'exportaciones'
+    paginate_by = 20
+
+    def get_queryset(self):
+        return ExportacionOficios.objects.filter(usuario=self.request.user).order_by('-creado')
+
+
+class ExportacionDescargarView(LoginRequiredMixin, View):
+    def get(self, request, pk):
+        exportacion = get_object_or_404(
+            ExportacionOficios, pk=pk, usuario=request.user, estado=ExportacionOficios.ESTADO_LISTA
+        )
+        try:
+            archivo = exportacion.archivo.open('rb')
+        except (FileNotFoundError, ValueError):
+            raise Http404('El archivo de la exportación ya no está disponible.')
+        return FileResponse(
+            archivo,
+            as_attachment=True,
+            filename=exportacion.archivo.name.rsplit('/', 1)[-1],
+            content_type=planillas.CONTENT_TYPES.get(exportacion.formato),
+        )
+
+
 class OficioCreateView(LoginRequiredMixin, CreateView):
     model = Oficio
     form_class = OficioForm
     template_name = 'oficios/oficio_form.html'
     
     def dispatch(self, request, *args, **kwargs):
-        perfil = getattr(request.user, 'perfil', None)
-        raw_nombre = getattr(getattr(perfil, 'id_sector', None), 'nombre', '') or ''
-        norm = unicodedata.normalize('NFKD', raw_nombre)
-        sector_nombre = ''.join(c for c in norm if not unicodedata.combining(c)).lower()
-        if 'coordinacion opd' in sector_nombre:
+        if is_coordinacion_opd(request.user):
             messages.error(request, 'No tiene permisos para crear oficios.')
             return redirect('oficios:list')
         return super().dispatch(request, *args, **kwargs)
@@ -187,48 +247,11 @@ class OficioCreateView(LoginRequiredMixin, CreateView):
                 )
             except Exception:
                 pass
-            try:
-                if obj.caso and getattr(obj.caso, 'estado', None) == 'ABIERTO':
-                    obj.caso.estado = 'EN_PROCESO'
-                    obj.caso.save()
-            except Exception:
-                pass
             creados.append(obj)
         else:
-            for inst in instituciones:
-                obj = form.save(commit=False)
-                obj.pk = None
-                obj.usuario = self.request.user
-                obj.institucion = inst
-                if archivo is not None:
-                    try:
-                        archivo.seek(0)
-                    except Exception:
-                        pass
-                    obj.archivo_pdf = archivo
-                obj.save()
-
-                try:
-                    MovimientoOficio.objects.create(
-                        oficio=obj,
-                        usuario=self.request.user,
-                        estado_anterior=None,
-                        estado_nuevo='cargado',
-                        validado_coord=obj.validado_coord,
-                        validado_director=obj.validado_director,
-                        detalle='OFICIO CREADO',
-                        institucion=obj.institucion
-                    )
-                except Exception:
-                    pass
-
-                try:
-                    if obj.caso and getattr(obj.caso, 'estado', None) == 'ABIERTO':
-                        obj.caso.estado = 'EN_PROCESO'
-                        obj.caso.save()
-                except Exception:
-                    pass
-                creados.append(obj)
+            # Alta masiva: codigos, PDF, historial y movimientos en una sola transaccion
+            base = form.save(commit=False)
+            creados = crear_oficios_por_institucion(base, instituciones, self.request.user, archivo)
 
         if len(creados) == 1:
             self.object = creados[0]
@@ -245,29 +268,164 @@ class OficioCreateView(LoginRequiredMixin, CreateView):
             if caso:
                 return HttpResponseRedirect(reverse('casos:detail', kwargs={'pk': caso.pk}))
             return HttpResponseRedirect(reverse('oficios:list'))
+# Filas que se muestran de cada seccion del detalle; el resto se pide por AJAX
+DETALLE_MOVIMIENTOS_POR_PAGINA = 20
+DETALLE_RESPUESTAS_POR_PAGINA = 20
+DETALLE_MUESTRA_PERSONAS = 5
+DETALLE_CORREOS = 5
+
+
+def _movimientos_detalle():
+    return MovimientoOficio.objects.select_related('usuario', 'institucion').order_by('-fecha_creacion', '-id')
+
+
+def _respuestas_detalle():
+    return Respuesta.objects.select_related('id_usuario', 'id_profesional', 'id_institucion').order_by(
+        '-fecha_hora', '-creacion', '-id'
+    )
+
+
+def _contar_vinculos(modelo):
+    return Coalesce(
+        Subquery(
+            modelo.objects.filter(caso_id=OuterRef('caso_id'))
+            .order_by()
+            .values('caso_id')
+            .annotate(total=Count('id'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def _contenido_pdf(columna):
+    # Lo que extrajo `procesar_pdfs` del PDF del oficio (core/pdf.py); NULL si todavia no
+    return Subquery(
+        ContenidoPDF.objects.filter(archivo__nombre=OuterRef('archivo_pdf'), estado=ContenidoPDF.ESTADO_LISTO)
+        .values(columna)[:1]
+    )
+
+
+def _pagina(filas, por_pagina):
+    """Recorta una lista leida con una fila extra; devuelve (filas, hay_mas)."""
+    filas = list(filas)
+    return filas[:por_pagina], len(filas) > por_pagina
+
+
 class OficioDetailView(LoginRequiredMixin, DetailView):
     model = Oficio
     template_name = 'oficios/oficio_detail.html'
     context_object_name = 'oficio'
     
     def get_queryset(self):
-        return super().get_queryset().select_related('institucion', 'juzgado', 'usuario')
+        # Solo la primera pagina de movimientos y respuestas (con una fila extra para
+        # saber si hay mas) y una muestra de niños/partes del caso: el detalle corre
+        # con un numero fijo de consultas sin importar el historial del oficio.
+        return (
+            super().get_queryset()
+            .select_related('institucion', 'juzgado', 'usuario', 'caso__usuario')
+            .annotate(
+                total_ninos_caso=_contar_vinculos(CasoNino),
+                total_partes_caso=_contar_vinculos(CasoParte),
+                pdf_paginas=_contenido_pdf('paginas'),
+                pdf_miniatura=_contenido_pdf('miniatura'),
+            )
+            .prefetch_related(
+                Prefetch(
+                    'movimientos',
+                    queryset=_movimientos_detalle()[:DETALLE_MOVIMIENTOS_POR_PAGINA + 1],
+                    to_attr='movimientos_pagina',
+                ),
+                Prefetch(
+                    'respuestas',
+                    queryset=_respuestas_detalle()[:DETALLE_RESPUESTAS_POR_PAGINA + 1],
+                    to_attr='respuestas_pagina',
+                ),
+                Prefetch(
+                    'correos',
+                    queryset=CorreoSaliente.objects.order_by('-creado')[:DETALLE_CORREOS],
+                    to_attr='correos_recientes',
+                ),
+                Prefetch(
+                    'caso__ninos',
+                    queryset=Nino.objects.order_by('apellido', 'nombre', 'pk')[:DETALLE_MUESTRA_PERSONAS],
+                    to_attr='ninos_muestra',
+                ),
+                Prefetch(
+                    'caso__partes',
+                    queryset=Parte.objects.order_by('apellido', 'nombre', 'pk')[:DETALLE_MUESTRA_PERSONAS],
+                    to_attr='partes_muestra',
+                ),
+            )
+        )
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # Agregar la fecha actual para comparar con la fecha de vencimiento
-        from django.utils import timezone
-        from .models import Institucion
+        oficio = self.object
+        movimientos, hay_mas_movimientos = _pagina(oficio.movimientos_pagina, DETALLE_MOVIMIENTOS_POR_PAGINA)
+        respuestas, hay_mas_respuestas = _pagina(oficio.respuestas_pagina, DETALLE_RESPUESTAS_POR_PAGINA)
         
         context.update({
+            # Agregar la fecha actual para comparar con la fecha de vencimiento
             'now': timezone.now(),
-            'instituciones': Institucion.objects.all().order_by('nombre'),
+            'movimientos': movimientos,
+            'hay_mas_movimientos': hay_mas_movimientos,
+            'respuestas': respuestas,
+            'hay_mas_respuestas': hay_mas_respuestas,
+            'ninos_restantes': max(oficio.total_ninos_caso - DETALLE_MUESTRA_PERSONAS, 0),
+            'partes_restantes': max(oficio.total_partes_caso - DETALLE_MUESTRA_PERSONAS, 0),
+            # Una sola lectura para los tres modales que eligen institucion
+            'instituciones': list(Institucion.objects.only('id', 'nombre', 'email').order_by('nombre')),
             # Casos para asignar desde modal (últimos 50)
-            'casos_opciones': Caso.objects.all().order_by('-creado')[:50],
+            'casos_opciones': list(Caso.objects.only('id', 'expte', 'estado').order_by('-creado')[:50]),
         })
         return context
 
 
+class OficioSeccionDetalleView(LoginRequiredMixin, View):
+    """
+    Paginas siguientes de una seccion del detalle (movimientos o respuestas), como
+    filas HTML para agregar a la tabla. Se pagina por offset (`?desde=N`) leyendo
+    una fila extra, sin COUNT.
+    """
+    template_name = None
+    por_pagina = None
+    # Funcion que devuelve el queryset base de la seccion y columna que la une al oficio
+    consulta = None
+    filtro_oficio = 'oficio_id'
+
+    def get_queryset(self, oficio_id):
+        return self.consulta().filter(**{self.filtro_oficio: oficio_id})
+
+    def get(self, request, *args, **kwargs):
+        try:
+            desde = max(int(request.GET.get('desde', 0)), 0)
+        except (TypeError, ValueError):
+            desde = 0
+        filas, hay_mas = _pagina(
+            self.get_queryset(kwargs['pk'])[desde:desde + self.por_pagina + 1],
+            self.por_pagina,
+        )
+        html = render_to_string(self.template_name, {'filas': filas}, request=request)
+        return JsonResponse({
+            'html': html,
+            'siguiente': desde + len(filas) if hay_mas else None,
+        })
+
+
+class OficioMovimientosView(OficioSeccionDetalleView):
+    template_name = 'oficios/_movimientos_filas.html'
+    por_pagina = DETALLE_MOVIMIENTOS_POR_PAGINA
+    consulta = staticmethod(_movimientos_detalle)
+
+
+class OficioRespuestasView(OficioSeccionDetalleView):
+    template_name = 'oficios/_respuestas_filas.html'
+    por_pagina = DETALLE_RESPUESTAS_POR_PAGINA
+    consulta = staticmethod(_respuestas_detalle)
+    filtro_oficio = 'id_oficio_id'
+
+
 class OficioAsignarCasoView(LoginRequiredMixin, View):
     def post(self, request, *args, **kwargs):
         oficio = get_object_or_404(Oficio, pk=kwargs['pk'])
@@ -420,25 +578,13 @@ class OficioEnviarView(LoginRequiredMixin, View):
                     messages.warning(request, 'El oficio no tiene PDF adjunto para enviar.')
                 else:
                     try:
-                        subject = f'Oficio #{oficio.id} asignado'
-                        cuerpo = (
-                            f'Se asigno el oficio #{oficio.id} a la institucion {institucion.nombre}.\\n'
-                            f'Adjunto PDF del oficio.'
-                        )
-                        from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', None) or getattr(settings, 'EMAIL_HOST_USER', None)
-                        correo = EmailMessage(
-                            subject=subject,
-                            body=cuerpo,
-                            from_email=from_email,
-                            to=[institucion.email],
-                        )
-                        correo.attach_file(oficio.archivo_pdf.path)
-                        correo.send(fail_silently=False)
-                        messages.success(request, 'Se envio el oficio por email a la institucion.')
+                        # El envio lo hace `manage.py procesar_correos`; el estado queda en el detalle
+                        encolar_asignacion(oficio, institucion)
+                        messages.success(request, 'El email a la institucion quedo en cola de envio.')
                     except Exception:
                         messages.warning(
                             request,
-                            'Se asigno el oficio, pero hubo un error al enviar el email.'
+                            'Se asigno el oficio, pero no se pudo encolar el email.'
                         )
             
         except Institucion.DoesNotExist:
@@ -635,46 +781,16 @@ class RespuestaCreateView(LoginRequiredMixin, CreateView):
         return HttpResponseRedirect(reverse('oficios:detail', kwargs={'pk': self.oficio.pk}))
 
 def _is_admin_like(user):
-    try:
-        sector = getattr(getattr(user, 'perfil', None), 'id_sector', None)
-        nombre = getattr(sector, 'nombre', '') or ''
-        nombre = nombre.strip().lower()
-        folded = ''.join(c for c in unicodedata.normalize('NFD', nombre) if unicodedata.category(c) != 'Mn')
-        if folded in ('informatica', 'coordinador'):
-            return True
-        return ('director' in folded) and ('ninez' in folded)
-    except Exception:
-        return False
+    return roles.tiene_rol(user, roles.ADMINISTRACION)
 
 
 def _is_coordinador(user):
-    try:
-        sector = getattr(getattr(user, 'perfil', None), 'id_sector', None)
-        nombre = getattr(sector, 'nombre', '') or ''
-        nombre = nombre.strip().lower()
-        folded = ''.join(c for c in unicodedata.normalize('NFD', nombre) if unicodedata.category(c) != 'Mn')
-        return folded == 'coordinador'
-    except Exception:
-        return False
+    return roles.tiene_rol(user, roles.COORDINADOR)
 
 
 def _is_director(user):
-    try:
-        sector = getattr(getattr(user, 'perfil', None), 'id_sector', None)
-        nombre = getattr(sector, 'nombre', '') or ''
-        nombre = nombre.strip().lower()
-        folded = ''.join(c for c in unicodedata.normalize('NFD', nombre) if unicodedata.category(c) != 'Mn')
-        return ('director' in folded) and ('ninez' in folded)
-    except Exception:
-        return False
+    return roles.tiene_rol(user, roles.DIRECTOR_NINEZ)
 
 
 def _is_despacho(user):
-    try:
-        sector = getattr(getattr(user, 'perfil', None), 'id_sector', None)
-        nombre = (getattr(sector, 'nombre', '') or '').strip()
-        name_lower = nombre.lower()
-        folded = ''.join(c for c in unicodedata.normalize('NFD', name_lower) if unicodedata.category(c) != 'Mn')
-        return ('despacho' in name_lower) and ('ninez' in folded)
-    except Exception:
-        return False
+    return roles.tiene_rol(user, roles.DESPACHO_NINEZ)
@@ -1,55 +1,104 @@
-from django.views import View
+import hashlib
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
 from django.http import JsonResponse
-from django.db.models import Q
+from django.urls import reverse
+from django.views import View
+
+from core import versiones
+from core.paginacion import CursorPaginator, PARAMETRO
+from .busqueda import buscar_personas, filtro_personas
 from .models import Nino, Parte
 
-class NinoAPIView(View):
-    """API view para obtener la lista de niños con búsqueda"""
-    def get(self, request, *args, **kwargs):
-        search = request.GET.get('search', '').strip()
-        
-        # Construir la consulta de búsqueda
-        query = Q()
-        if search:
-            query &= (
-                Q(nombre__icontains=search) |
-                Q(apellido__icontains=search) |
-                Q(dni__icontains=search)
-            )
-        
-        # Obtener los niños que coincidan con la búsqueda
-        ninos = Nino.objects.filter(query).order_by('apellido', 'nombre')
-        
-        # Preparar los datos para la respuesta JSON
-        data = [{
-            'id': nino.id_ninos,  # Usamos id_ninos en lugar de id
-            'nombre': nino.nombre,
-            'apellido': nino.apellido,
-            'dni': nino.dni or '',
-        } for nino in ninos]
-        
-        return JsonResponse(data, safe=False)
-
-class ParteAPIView(View):
-    """API view para obtener la lista de partes con búsqueda"""
+
+# Resultados por pedido; el resto se trae con "cargar mas" (cursor)
+LIMITE = 20
+# Segundos que se reutiliza la respuesta de una misma busqueda (la version de
+# personas cambia con cada alta, edicion o baja)
+CACHE_SEGUNDOS = 60
+
+
+class PersonaAPIView(View):
+    """
+    Autocompletado de personas: busqueda por prefijo sobre las columnas
+    normalizadas, a lo sumo LIMITE resultados por pedido y `siguiente` para pedir
+    los que siguen con ?cursor=. Responde {"resultados": [...], "siguiente": ...}.
+    """
+    model = None
+
+    def serializar(self, persona):
+        return {
+            'id': persona.pk,
+            'nombre': persona.nombre,
+            'apellido': persona.apellido,
+            'dni': persona.dni or '',
+            # Mismo texto que la opcion elegida en los widgets de core.widgets
+            'texto': str(persona),
+        }
+
+    def _clave_cache(self, search, cursor):
+        base = f'{search}|{cursor}'.encode('utf-8')
+        version = versiones.version_datos(versiones.PERSONAS)
+        return f'api-personas:{self.model._meta.model_name}:{version}:{hashlib.md5(base).hexdigest()}'
+
+    def buscar(self, search, cursor):
+        queryset = self.model.objects.only('pk', 'nombre', 'apellido', 'dni', 'apellido_nombre_normalizado')
+        condicion = filtro_personas(search)
+        if condicion is not None:
+            queryset = queryset.filter(condicion)
+        pagina = CursorPaginator(queryset.order_by('apellido_nombre_normalizado'), LIMITE).page(cursor)
+        return {
+            'resultados': [self.serializar(persona) for persona in pagina.object_list],
+            'siguiente': pagina.cursor_siguiente,
+        }
+
     def get(self, request, *args, **kwargs):
         search = request.GET.get('search', '').strip()
+        cursor = request.GET.get(PARAMETRO, '')
+        clave = self._clave_cache(search, cursor)
+        datos = cache.get(clave)
+        if datos is None:
+            datos = self.buscar(search, cursor)
+            cache.set(clave, datos, CACHE_SEGUNDOS)
+        return JsonResponse(datos)
+
+
+class NinoAPIView(PersonaAPIView):
+    """API view para obtener la lista de niños con búsqueda"""
+    model = Nino
 
-        query = Q()
-        if search:
-            query &= (
-                Q(nombre__icontains=search) |
-                Q(apellido__icontains=search) |
-                Q(dni__icontains=search)
-            )
 
-        partes = Parte.objects.filter(query).order_by('apellido', 'nombre')
+class ParteAPIView(PersonaAPIView):
+    """API view para obtener la lista de partes con búsqueda"""
+    model = Parte
 
-        data = [{
-            'id': parte.id_partes,
-            'nombre': parte.nombre,
-            'apellido': parte.apellido,
-            'dni': parte.dni or '',
-        } for parte in partes]
 
-        return JsonResponse(data, safe=False)
+class PersonaBusquedaAPIView(LoginRequiredMixin, View):
+    """
+    Busqueda unificada de niños y partes (?q=, al menos 2 caracteres): los mas
+    relevantes de las dos tablas en una consulta, con la cantidad de casos de cada
+    persona. Responde {"resultados": [...]}.
+    """
+    raise_exception = True
+    MINIMO = 2
+    URLS = {'nino': 'personas:nino_detail', 'parte': 'personas:parte_detail'}
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', '').strip()
+        if len(query) < self.MINIMO:
+            return JsonResponse({'resultados': []})
+        return JsonResponse({
+            'resultados': [
+                {
+                    'tipo': fila['tipo'],
+                    'id': fila['id'],
+                    'nombre': fila['nombre'],
+                    'apellido': fila['apellido'],
+                    'dni': fila['dni'] or '',
+                    'casos': fila['total_casos'],
+                    'url': reverse(self.URLS[fila['tipo']], args=[fila['id']]),
+                }
+                for fila in buscar_personas(query)
+            ],
+        })
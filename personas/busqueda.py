@@ -0,0 +1,145 @@
+import re
+
+from django.db.models import Case, CharField, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from core.texto import normalizar, solo_digitos, terminos
+
+
+# Resultados de la busqueda unificada de niños y partes
+MAX_RESULTADOS = 10
+_DOCUMENTO = re.compile(r'^[\d.\s-]+$')
+
+CAMPOS_NORMALIZADOS = ('apellido_nombre_normalizado', 'nombre_apellido_normalizado', 'dni_normalizado')
+
+
+def normalizar_persona(persona):
+    """Completa las columnas de busqueda de un Nino o Parte (ver filtro_personas)."""
+    apellido, nombre = normalizar(persona.apellido), normalizar(persona.nombre)
+    persona.apellido_nombre_normalizado = ' '.join(filter(None, (apellido, nombre)))[:201]
+    persona.nombre_apellido_normalizado = ' '.join(filter(None, (nombre, apellido)))[:201]
+    persona.dni_normalizado = solo_digitos(persona.dni)[:20]
+
+
+def _prefijo(campo, texto):
+    """
+    Q de los valores de `campo` que empiezan con `texto`, como rango [texto,
+    sucesor). Las columnas normalizadas solo tienen minusculas sin tildes, digitos
+    y espacios, asi el rango es exactamente el prefijo con cualquier collation y lo
+    resuelve el indice comun (que ademas sirve para ordenar), en SQLite y PostgreSQL.
+    """
+    sucesor = texto[:-1] + chr(ord(texto[-1]) + 1)
+    return Q(**{f'{campo}__gte': texto, f'{campo}__lt': sucesor})
+
+
+def _condiciones(valor):
+    """
+    (exacta, frase, filtro) para `valor`, o None si no hay nada que buscar.
+    `filtro` es la condicion de busqueda; `exacta` y `frase` solo ordenan.
+    """
+    if valor and _DOCUMENTO.match(valor):
+        digitos = solo_digitos(valor)
+        if not digitos:
+            return None
+        prefijo = _prefijo('dni_normalizado', digitos)
+        return Q(dni_normalizado=digitos), prefijo, prefijo
+
+    lista = terminos(valor)
+    if not lista:
+        return None
+    frase = ' '.join(lista)
+    # El apellido completo (solo o seguido del nombre) o el nombre y apellido completos
+    exacta = (
+        Q(apellido_nombre_normalizado=frase)
+        | _prefijo('apellido_nombre_normalizado', f'{frase} ')
+        | Q(nombre_apellido_normalizado=frase)
+    )
+    frase_q = Q()
+    filtro = Q()
+    for campo in ('apellido_nombre_normalizado', 'nombre_apellido_normalizado'):
+        frase_q |= _prefijo(campo, frase)
+        # El primer termino acota por indice; los demas son comienzos de palabra
+        condicion = _prefijo(campo, lista[0])
+        for termino in lista[1:]:
+            condicion &= Q(**{f'{campo}__contains': f' {termino}'})
+        filtro |= condicion
+    return exacta, frase_q, filtro
+
+
+def filtro_personas(valor):
+    """
+    Q para buscar personas sobre las columnas normalizadas (sin tildes,
+    minusculas; DNI solo digitos), o None si no hay nada que buscar.
+
+    La primera palabra es el comienzo de "apellido nombre" o de "nombre apellido"
+    y las demas, comienzos de otras palabras: 'garcia ma', 'maria gar' o
+    'maria garcia' encuentran a GARCÍA, MARÍA JOSÉ. Cada lado es un rango sobre
+    un indice `*_norm_idx`; el resto se comprueba solo en esas filas.
+    """
+    condiciones = _condiciones(valor)
+    if condiciones is None:
+        return None
+    return condiciones[2]
+
+
+def relevancia_personas(valor):
+    """
+    Anotacion para ordenar los resultados de filtro_personas: 3 si coincide un
+    apellido completo, el nombre y apellido completos o el DNI, 2 si el nombre
+    completo empieza con la frase tal como se escribio y 1 en los demas casos.
+    """
+    condiciones = _condiciones(valor)
+    if condiciones is None:
+        return Value(1)
+    exacta, frase, _ = condiciones
+    return Case(
+        When(exacta, then=Value(3)),
+        When(frase, then=Value(2)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+
+
+def _contar_casos(modelo_vinculo, campo):
+    return Coalesce(
+        Subquery(
+            modelo_vinculo.objects.filter(**{campo: OuterRef('pk')})
+            .order_by()
+            .values(campo)
+            .annotate(total=Count('pk'))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def buscar_personas(valor, limite=MAX_RESULTADOS):
+    """
+    Niños y partes que coinciden con `valor` en una sola consulta (UNION ALL de
+    las dos tablas), ordenados por relevancia y apellido, a lo sumo `limite`.
+    Cada fila es un dict con tipo ('nino'/'parte'), id, nombre, apellido, dni,
+    relevancia y total_casos (cantidad de casos en los que participa).
+    """
+    from casos.models import CasoNino, CasoParte
+    from .models import Nino, Parte
+
+    condicion = filtro_personas(valor)
+    if condicion is None:
+        return []
+    relevancia = relevancia_personas(valor)
+
+    consultas = [
+        modelo.objects.filter(condicion).order_by().values(
+            'nombre', 'apellido', 'dni', 'apellido_nombre_normalizado',
+            tipo=Value(tipo, output_field=CharField()),
+            id=F('pk'),
+            relevancia=relevancia,
+            total_casos=_contar_casos(vinculo, campo),
+        )
+        for tipo, modelo, vinculo, campo in (
+            ('nino', Nino, CasoNino, 'nino'),
+            ('parte', Parte, CasoParte, 'parte'),
+        )
+    ]
+    union = consultas[0].union(consultas[1], all=True)
+    return list(union.order_by('-relevancia', 'apellido_nombre_normalizado', 'tipo', 'id')[:limite])
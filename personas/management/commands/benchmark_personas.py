@@ -0,0 +1,132 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from casos.models import Caso, CasoNino, CasoParte
+from personas.busqueda import normalizar_persona
+from personas.models import Nino, Parte
+
+
+APELLIDOS = [
+    'GARCÍA', 'GONZÁLEZ', 'RODRÍGUEZ', 'FERNÁNDEZ', 'LÓPEZ', 'MARTÍNEZ', 'PÉREZ', 'GÓMEZ',
+    'SÁNCHEZ', 'DÍAZ', 'ROMERO', 'SOSA', 'ÁLVAREZ', 'TORRES', 'RUIZ', 'RAMÍREZ', 'FLORES',
+    'BENÍTEZ', 'ACOSTA', 'MEDINA', 'HERRERA', 'SUÁREZ', 'AGUIRRE', 'GIMÉNEZ', 'GUTIÉRREZ',
+]
+NOMBRES = [
+    'MARÍA', 'JUAN', 'JOSÉ', 'ANA', 'LUCÍA', 'MATÍAS', 'SOFÍA', 'VALENTINA', 'SANTIAGO',
+    'MARTINA', 'BENJAMÍN', 'CAMILA', 'TOMÁS', 'JULIETA', 'AGUSTÍN', 'MILAGROS', 'JOAQUÍN',
+]
+
+# (nombre, querystring)
+ESCENARIOS = [
+    ('Sin busqueda (al abrir)', {}),
+    ('Prefijo corto', {'search': 'ga'}),
+    ('Apellido sin tilde', {'search': 'gonzalez'}),
+    ('Apellido y nombre', {'search': 'perez mar'}),
+    ('Nombre y apellido', {'search': 'maria gar'}),
+    ('DNI con puntos', {'search': '{dni}'}),
+    ('Sin resultados', {'search': 'zzzz'}),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Carga personas sinteticas dentro de una transaccion, mide la latencia del '
+        'autocompletado de niños y partes y descarta los datos al terminar.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--personas', type=int, default=200000, help='Cantidad de personas sinteticas (mitad niños, mitad partes).')
+        parser.add_argument('--repeticiones', type=int, default=10, help='Requests por escenario.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._cargar_datos(options['personas'])
+                self._medir(options['repeticiones'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _persona(self, modelo, numero):
+        persona = modelo(
+            apellido=f'{random.choice(APELLIDOS)} {random.choice(APELLIDOS)}' if random.random() < 0.2 else random.choice(APELLIDOS),
+            nombre=f'{random.choice(NOMBRES)} {random.choice(NOMBRES)}' if random.random() < 0.3 else random.choice(NOMBRES),
+            dni=f'{numero:08d}',
+        )
+        normalizar_persona(persona)
+        return persona
+
+    def _cargar_datos(self, cantidad):
+        mitad = cantidad // 2
+        base = random.randint(20_000_000, 40_000_000)
+        Nino.objects.bulk_create((self._persona(Nino, base + i) for i in range(mitad)), batch_size=5000)
+        Parte.objects.bulk_create((self._persona(Parte, base + mitad + i) for i in range(cantidad - mitad)), batch_size=5000)
+        # Un caso cada 10 personas, para medir el conteo de casos de la busqueda unificada
+        self.usuario = get_user_model().objects.create_user(username='benchmark-personas')
+        Caso.objects.bulk_create(
+            (Caso(codigo=f'BENCH-{i}', usuario=self.usuario) for i in range(cantidad // 10)), batch_size=5000
+        )
+        casos = list(Caso.objects.filter(codigo__startswith='BENCH-').values_list('pk', flat=True))
+        ninos = Nino.objects.order_by('-pk').values_list('pk', flat=True)[:mitad]
+        partes = Parte.objects.order_by('-pk').values_list('pk', flat=True)[:cantidad - mitad]
+        CasoNino.objects.bulk_create(
+            (CasoNino(caso_id=casos[i % len(casos)], nino_id=pk) for i, pk in enumerate(ninos)), batch_size=5000
+        )
+        CasoParte.objects.bulk_create(
+            (CasoParte(caso_id=casos[i % len(casos)], parte_id=pk) for i, pk in enumerate(partes)), batch_size=5000
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.stdout.write(f'Datos sinteticos: {mitad} niños y {cantidad - mitad} partes.')
+
+    def _medir(self, repeticiones):
+        client = Client()
+        client.force_login(self.usuario)
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for url_name in ('personas:api_ninos', 'personas:api_partes', 'personas:api_buscar'):
+                url = reverse(url_name)
+                modelo = Parte if url_name.endswith('partes') else Nino
+                # La busqueda unificada recibe el texto en ?q=
+                parametro = 'q' if url_name.endswith('buscar') else 'search'
+                dni = modelo.objects.order_by('?').values_list('dni', flat=True).first()
+                for nombre, parametros in ESCENARIOS:
+                    # El DNI de una persona cargada, con puntos y sin los ultimos digitos
+                    parametros = {parametro: valor.format(dni=f'{dni[:2]}.{dni[2:5]}') for valor in parametros.values()}
+                    tiempos = []
+                    for _ in range(repeticiones):
+                        cache.clear()
+                        reset_queries()
+                        with CaptureQueriesContext(connection) as ctx:
+                            inicio = time.perf_counter()
+                            response = client.get(url, parametros)
+                            tiempos.append((time.perf_counter() - inicio) * 1000)
+                        # captured_queries se lee del log, que el proximo request vacia
+                        consultas = len(ctx.captured_queries)
+                    datos = response.json()
+                    # Segunda pagina y respuesta cacheada de la primera
+                    inicio = time.perf_counter()
+                    client.get(url, parametros)
+                    cacheada = (time.perf_counter() - inicio) * 1000
+                    tiempos.sort()
+                    self.stdout.write(
+                        f'{url_name:<20} {nombre:<25} resultados={len(datos["resultados"]):<3} '
+                        f'consultas={consultas:<2} '
+                        f'mediana={tiempos[len(tiempos) // 2]:.1f} ms max={tiempos[-1]:.1f} ms '
+                        f'cacheada={cacheada:.1f} ms'
+                    )
+                    if datos.get('siguiente'):
+                        inicio = time.perf_counter()
+                        client.get(url, {**parametros, 'cursor': datos['siguiente']})
+                        self.stdout.write(f'{"":<20} {"  siguiente pagina":<25} tiempo={(time.perf_counter() - inicio) * 1000:.1f} ms')
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('personas', '0008_historicalnino_historicalparte'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nino',
+            index=models.Index(fields=['apellido', 'nombre', 'id_ninos'], name='nino_apellido_nombre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parte',
+            index=models.Index(fields=['apellido', 'nombre', 'id_partes'], name='parte_apellido_nombre_idx'),
+        ),
+    ]
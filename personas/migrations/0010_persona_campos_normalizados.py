@@ -0,0 +1,86 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:36
+
+from django.db import migrations, models
+
+from core.texto import normalizar, solo_digitos
+
+
+def completar_campos_normalizados(apps, schema_editor):
+    for nombre_modelo in ('Nino', 'Parte'):
+        modelo = apps.get_model('personas', nombre_modelo)
+        pendientes = []
+        for persona in modelo.objects.only('pk', 'nombre', 'apellido', 'dni').order_by('pk').iterator(chunk_size=2000):
+            persona.apellido_normalizado = normalizar(persona.apellido)[:100]
+            persona.nombre_normalizado = normalizar(persona.nombre)[:100]
+            persona.dni_normalizado = solo_digitos(persona.dni)[:20]
+            pendientes.append(persona)
+            if len(pendientes) >= 2000:
+                modelo.objects.bulk_update(pendientes, ['apellido_normalizado', 'nombre_normalizado', 'dni_normalizado'])
+                pendientes = []
+        if pendientes:
+            modelo.objects.bulk_update(pendientes, ['apellido_normalizado', 'nombre_normalizado', 'dni_normalizado'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('personas', '0009_indices_paginacion_cursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='nino',
+            name='apellido_normalizado',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='nino',
+            name='dni_normalizado',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='nino',
+            name='nombre_normalizado',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='parte',
+            name='apellido_normalizado',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='parte',
+            name='dni_normalizado',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='parte',
+            name='nombre_normalizado',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(completar_campos_normalizados, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='nino',
+            index=models.Index(fields=['apellido_normalizado', 'nombre_normalizado', 'id_ninos'], name='nino_apellido_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nino',
+            index=models.Index(fields=['nombre_normalizado'], name='nino_nombre_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nino',
+            index=models.Index(fields=['dni_normalizado'], name='nino_dni_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parte',
+            index=models.Index(fields=['apellido_normalizado', 'nombre_normalizado', 'id_partes'], name='parte_apellido_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parte',
+            index=models.Index(fields=['nombre_normalizado'], name='parte_nombre_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parte',
+            index=models.Index(fields=['dni_normalizado'], name='parte_dni_norm_idx'),
+        ),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.3 on 2026-10-18 14:46
+
+from django.db import migrations, models
+
+from core.texto import normalizar
+
+
+def completar_nombres_normalizados(apps, schema_editor):
+    campos = ['apellido_nombre_normalizado', 'nombre_apellido_normalizado']
+    for nombre_modelo in ('Nino', 'Parte'):
+        modelo = apps.get_model('personas', nombre_modelo)
+        pendientes = []
+        for persona in modelo.objects.only('pk', 'nombre', 'apellido').order_by('pk').iterator(chunk_size=2000):
+            apellido, nombre = normalizar(persona.apellido), normalizar(persona.nombre)
+            persona.apellido_nombre_normalizado = ' '.join(filter(None, (apellido, nombre)))[:201]
+            persona.nombre_apellido_normalizado = ' '.join(filter(None, (nombre, apellido)))[:201]
+            pendientes.append(persona)
+            if len(pendientes) >= 2000:
+                modelo.objects.bulk_update(pendientes, campos)
+                pendientes = []
+        if pendientes:
+            modelo.objects.bulk_update(pendientes, campos)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('personas', '0010_persona_campos_normalizados'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='nino',
+            name='nino_apellido_norm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='nino',
+            name='nino_nombre_norm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='parte',
+            name='parte_apellido_norm_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='parte',
+            name='parte_nombre_norm_idx',
+        ),
+        migrations.RemoveField(
+            model_name='nino',
+            name='apellido_normalizado',
+        ),
+        migrations.RemoveField(
+            model_name='nino',
+            name='nombre_normalizado',
+        ),
+        migrations.RemoveField(
+            model_name='parte',
+            name='apellido_normalizado',
+        ),
+        migrations.RemoveField(
+            model_name='parte',
+            name='nombre_normalizado',
+        ),
+        migrations.AddField(
+            model_name='nino',
+            name='apellido_nombre_normalizado',
+            field=models.CharField(blank=True, default='', editable=False, max_length=201),
+        ),
+        migrations.AddField(
+            model_name='nino',
+            name='nombre_apellido_normalizado',
+            field=models.CharField(blank=True, default='', editable=False, max_length=201),
+        ),
+        migrations.AddField(
+            model_name='parte',
+            name='apellido_nombre_normalizado',
+            field=models.CharField(blank=True, default='', editable=False, max_length=201),
+        ),
+        migrations.AddField(
+            model_name='parte',
+            name='nombre_apellido_normalizado',
+            field=models.CharField(blank=True, default='', editable=False, max_length=201),
+        ),
+        migrations.RunPython(completar_nombres_normalizados, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='nino',
+            index=models.Index(fields=['apellido_nombre_normalizado', 'id_ninos'], name='nino_apellido_nombre_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='nino',
+            index=models.Index(fields=['nombre_apellido_normalizado'], name='nino_nombre_apellido_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parte',
+            index=models.Index(fields=['apellido_nombre_normalizado', 'id_partes'], name='parte_apellido_nombre_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='parte',
+            index=models.Index(fields=['nombre_apellido_normalizado'], name='parte_nombre_apellido_norm_idx'),
+        ),
+    ]
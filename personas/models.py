@@ -1,7 +1,73 @@
 from django.db import models
 from simple_history.models import HistoricalRecords
 
-class Nino(models.Model):
+from core import versiones
+from .busqueda import CAMPOS_NORMALIZADOS, normalizar_persona
+
+
+class TextoCasosMixin:
+    """
+    Nombre y DNI forman parte del texto de busqueda de los casos vinculados. Se
+    guardan los valores cargados de la base para recalcularlo solo si cambian.
+    """
+    CAMPOS_TEXTO_CASOS = ('apellido', 'nombre', 'dni')
+    # related_name de la tabla intermedia con los casos
+    relacion_casos = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        cargados = dict(zip(field_names, values))
+        instance._valores_cargados = {
+            campo: cargados[campo] for campo in cls.CAMPOS_TEXTO_CASOS if campo in cargados
+        }
+        return instance
+
+    def _campos_texto_guardados(self, update_fields):
+        campos = [campo for campo in self.CAMPOS_TEXTO_CASOS if campo not in self.get_deferred_fields()]
+        if update_fields is not None:
+            campos = [campo for campo in campos if campo in set(update_fields)]
+        return campos
+
+    def _cambio_texto_casos(self, campos):
+        """True si algun campo de `campos` difiere del valor persistido."""
+        anteriores = self.__dict__.setdefault('_valores_cargados', {})
+        faltantes = [campo for campo in campos if campo not in anteriores]
+        if faltantes:
+            # Instancia que no se cargo de la base: se relee la fila una unica vez
+            anteriores.update(type(self)._default_manager.filter(pk=self.pk).values(*faltantes).first() or {})
+        return any(anteriores.get(campo) != getattr(self, campo) for campo in campos)
+
+    def save(self, *args, **kwargs):
+        campos = self._campos_texto_guardados(kwargs.get('update_fields'))
+        # Con pk puede tener casos aunque la instancia no venga de la base
+        cambio = self.pk is not None and self._cambio_texto_casos(campos)
+        super().save(*args, **kwargs)
+        self._valores_cargados = {
+            **self.__dict__.get('_valores_cargados', {}),
+            **{campo: getattr(self, campo) for campo in campos},
+        }
+        versiones.invalidar_datos(versiones.PERSONAS)
+        if cambio:
+            self._recalcular_casos(self._caso_ids())
+
+    def _caso_ids(self):
+        return getattr(self, self.relacion_casos).values_list('caso_id', flat=True)
+
+    def delete(self, *args, **kwargs):
+        caso_ids = list(self._caso_ids())
+        resultado = super().delete(*args, **kwargs)
+        versiones.invalidar_datos(versiones.PERSONAS)
+        self._recalcular_casos(caso_ids)
+        return resultado
+
+    @staticmethod
+    def _recalcular_casos(caso_ids):
+        from casos.models import Caso
+        Caso.recalcular_texto_busqueda(caso_ids)
+
+
+class Nino(TextoCasosMixin, models.Model):
     id_ninos = models.AutoField(primary_key=True)
     nombre = models.CharField(max_length=100)
     apellido = models.CharField(max_length=100)
@@ -10,12 +76,26 @@ class Nino(models.Model):
     dni = models.CharField(max_length=20, unique=True, blank=True, null=True)
     fecha_nac = models.DateField(blank=True, null=True)
     edad = models.PositiveIntegerField(blank=True, null=True, help_text='Edad en años, si no se conoce la fecha de nacimiento')
+    # Columnas de busqueda (personas.busqueda): "apellido nombre" y "nombre apellido"
+    # sin tildes y en minusculas, DNI solo digitos
+    apellido_nombre_normalizado = models.CharField(max_length=201, blank=True, default='', editable=False)
+    nombre_apellido_normalizado = models.CharField(max_length=201, blank=True, default='', editable=False)
+    dni_normalizado = models.CharField(max_length=20, blank=True, default='', editable=False)
 
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=CAMPOS_NORMALIZADOS)
+    relacion_casos = 'caso_ninos'
 
     class Meta:
         verbose_name = 'Niño'
         verbose_name_plural = 'Niños'
+        indexes = [
+            # Listado por apellido y nombre paginado por cursor
+            models.Index(fields=['apellido', 'nombre', 'id_ninos'], name='nino_apellido_nombre_idx'),
+            # Autocompletado por prefijo (personas.busqueda), ordenado por apellido y nombre
+            models.Index(fields=['apellido_nombre_normalizado', 'id_ninos'], name='nino_apellido_nombre_norm_idx'),
+            models.Index(fields=['nombre_apellido_normalizado'], name='nino_nombre_apellido_norm_idx'),
+            models.Index(fields=['dni_normalizado'], name='nino_dni_norm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nombre} {self.apellido}"
@@ -29,8 +109,11 @@ class Nino(models.Model):
             self.domicilio_principal = self.domicilio_principal.upper()
         if self.domicilio_secundario:
             self.domicilio_secundario = self.domicilio_secundario.upper()
+        normalizar_persona(self)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *CAMPOS_NORMALIZADOS}
         super().save(*args, **kwargs)
-        
+
     @property
     def edad_calculada(self):
         # Si no hay fecha de nacimiento, devolver la edad manual si existe
@@ -43,19 +126,29 @@ class Nino(models.Model):
         age = today.year - self.fecha_nac.year - ((today.month, today.day) < (self.fecha_nac.month, self.fecha_nac.day))
         return max(0, age)
 
-class Parte(models.Model):
+class Parte(TextoCasosMixin, models.Model):
     id_partes = models.AutoField(primary_key=True)
     nombre = models.CharField(max_length=100)
     apellido = models.CharField(max_length=100)
     dni = models.CharField(max_length=20, unique=True, blank=True, null=True)
     direccion = models.CharField(max_length=200, blank=True, null=True)
     telefono = models.CharField('Teléfono', max_length=20, blank=True, null=True)
+    apellido_nombre_normalizado = models.CharField(max_length=201, blank=True, default='', editable=False)
+    nombre_apellido_normalizado = models.CharField(max_length=201, blank=True, default='', editable=False)
+    dni_normalizado = models.CharField(max_length=20, blank=True, default='', editable=False)
 
-    history = HistoricalRecords()
+    history = HistoricalRecords(excluded_fields=CAMPOS_NORMALIZADOS)
+    relacion_casos = 'caso_partes'
 
     class Meta:
         verbose_name = 'Parte'
         verbose_name_plural = 'Partes'
+        indexes = [
+            models.Index(fields=['apellido', 'nombre', 'id_partes'], name='parte_apellido_nombre_idx'),
+            models.Index(fields=['apellido_nombre_normalizado', 'id_partes'], name='parte_apellido_nombre_norm_idx'),
+            models.Index(fields=['nombre_apellido_normalizado'], name='parte_nombre_apellido_norm_idx'),
+            models.Index(fields=['dni_normalizado'], name='parte_dni_norm_idx'),
+        ]
 
     def __str__(self):
         return f"{self.nombre} {self.apellido}"
@@ -67,4 +160,7 @@ class Parte(models.Model):
             self.apellido = self.apellido.upper()
         if self.direccion:
             self.direccion = self.direccion.upper()
+        normalizar_persona(self)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *CAMPOS_NORMALIZADOS}
         super().save(*args, **kwargs)
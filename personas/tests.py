@@ -1,3 +1,164 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from casos.models import Caso, CasoNino, CasoParte
+
+from . import api_views
+from .models import Nino, Parte
+
+
+class AutocompletadoPersonasTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.garcia = Nino.objects.create(apellido='GARCÍA', nombre='MARÍA JOSÉ', dni='30.123.456')
+        cls.gonzalez = Nino.objects.create(apellido='GONZÁLEZ', nombre='JUAN', dni='41222333')
+        cls.perez = Nino.objects.create(apellido='PÉREZ', nombre='MARÍA', dni='')
+
+    def _buscar(self, search, url_name='personas:api_ninos', **extra):
+        response = self.client.get(reverse(url_name), {'search': search, **extra})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def _ids(self, search, url_name='personas:api_ninos'):
+        return [fila['id'] for fila in self._buscar(search, url_name)['resultados']]
+
+    def test_guardar_completa_columnas_normalizadas(self):
+        self.assertEqual(
+            (self.garcia.apellido_nombre_normalizado, self.garcia.nombre_apellido_normalizado, self.garcia.dni_normalizado),
+            ('garcia maria jose', 'maria jose garcia', '30123456'),
+        )
+        self.garcia.apellido = 'Núñez'
+        self.garcia.save(update_fields=['apellido'])
+        self.garcia.refresh_from_db()
+        self.assertEqual(self.garcia.apellido_nombre_normalizado, 'nunez maria jose')
+
+    def test_prefijo_sin_tildes_ni_mayusculas(self):
+        self.assertEqual(self._ids('gonz'), [self.gonzalez.pk])
+        self.assertEqual(self._ids('Pérez'), [self.perez.pk])
+        # Nombre o apellido, ordenado por apellido
+        self.assertEqual(self._ids('mar'), [self.garcia.pk, self.perez.pk])
+        self.assertEqual(self._ids('zzz'), [])
+
+    def test_apellido_y_nombre_en_cualquier_orden(self):
+        self.assertEqual(self._ids('garcia mar'), [self.garcia.pk])
+        self.assertEqual(self._ids('maria gar'), [self.garcia.pk])
+        self.assertEqual(self._ids('maria jose garcia'), [self.garcia.pk])
+        # Nombre compuesto: cada palabra es el comienzo de alguna del nombre completo
+        self.assertEqual(self._ids('maria garcia'), [self.garcia.pk])
+        self.assertEqual(self._ids('garcia jose'), [self.garcia.pk])
+        self.assertEqual(self._ids('perez jose'), [])
+
+    def test_dni_con_o_sin_puntos(self):
+        self.assertEqual(self._ids('30.123'), [self.garcia.pk])
+        self.assertEqual(self._ids('41222'), [self.gonzalez.pk])
+
+    def test_limite_y_cursor(self):
+        Nino.objects.bulk_create([
+            Nino(apellido='ACOSTA', nombre=f'N{i:02d}', apellido_nombre_normalizado=f'acosta n{i:02d}')
+            for i in range(api_views.LIMITE + 5)
+        ])
+        with CaptureQueriesContext(connection) as ctx:
+            primera = self._buscar('acosta')
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(len(primera['resultados']), api_views.LIMITE)
+        self.assertIsNotNone(primera['siguiente'])
+
+        segunda = self._buscar('acosta', cursor=primera['siguiente'])
+        self.assertEqual(len(segunda['resultados']), 5)
+        self.assertIsNone(segunda['siguiente'])
+        self.assertEqual(segunda['resultados'][0]['nombre'], f'N{api_views.LIMITE:02d}')
+
+    def test_cache_se_invalida_al_guardar(self):
+        self.assertEqual(self._ids('sosa', 'personas:api_partes'), [])
+        parte = Parte.objects.create(apellido='SOSA', nombre='ANA')
+        self.assertEqual(self._ids('sosa', 'personas:api_partes'), [parte.pk])
+        parte.delete()
+        self.assertEqual(self._ids('sosa', 'personas:api_partes'), [])
+
+
+class BusquedaUnificadaTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.nino = Nino.objects.create(apellido='GARCÍA', nombre='MARÍA', dni='30123456')
+        cls.madre = Parte.objects.create(apellido='GARCÍA LÓPEZ', nombre='ANA')
+        cls.vecino = Parte.objects.create(apellido='PÉREZ', nombre='GARCIANO')
+        for _ in range(2):
+            caso = Caso.objects.create(usuario=cls.user)
+            CasoNino.objects.create(caso=caso, nino=cls.nino)
+        CasoParte.objects.create(caso=caso, parte=cls.madre)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def _buscar(self, q):
+        response = self.client.get(reverse('personas:api_buscar'), {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['resultados']
+
+    def test_ordena_por_relevancia_y_cuenta_casos(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resultados = self._buscar('garcia')
+        busquedas = [q for q in ctx.captured_queries if 'UNION' in q['sql']]
+        self.assertEqual(len(busquedas), 1)
+        self.assertEqual(
+            [(r['tipo'], r['id'], r['casos']) for r in resultados],
+            # Apellido completo primero (por apellido y nombre), despues el nombre
+            [('parte', self.madre.pk, 1), ('nino', self.nino.pk, 2), ('parte', self.vecino.pk, 0)],
+        )
+        self.assertEqual(resultados[1]['url'], reverse('personas:nino_detail', args=[self.nino.pk]))
+
+    def test_dni_minimo_y_limite(self):
+        self.assertEqual([r['id'] for r in self._buscar('30.123')], [self.nino.pk])
+        self.assertEqual(self._buscar('g'), [])
+        Parte.objects.bulk_create([
+            Parte(apellido='GARAY', nombre=f'P{i}', apellido_nombre_normalizado=f'garay p{i}') for i in range(15)
+        ])
+        self.assertEqual(len(self._buscar('gar')), 10)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('personas:api_buscar'), {'q': 'garcia'}).status_code, 403)
+
+
+class TextoBusquedaCasosTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.caso = Caso.objects.create(usuario=cls.user)
+        nino = Nino.objects.create(apellido='SOSA', nombre='ANA', dni='40111222')
+        parte = Parte.objects.create(apellido='ROJAS', nombre='LUIS')
+        CasoNino.objects.create(caso=cls.caso, nino=nino)
+        CasoParte.objects.create(caso=cls.caso, parte=parte)
+
+    def test_recalcula_solo_si_cambian_nombre_o_dni(self):
+        for modelo in (Nino, Parte):
+            persona = modelo.objects.get()
+            with mock.patch.object(Caso, 'recalcular_texto_busqueda') as recalcular:
+                persona.save()
+                persona.save(update_fields=['nombre'])
+                recalcular.assert_not_called()
+                persona.apellido = 'nuevo'
+                persona.save()
+                recalcular.assert_called_once()
+                # Ya guardado: el siguiente save compara contra el valor nuevo
+                persona.save()
+                recalcular.assert_called_once()
+
+            persona.nombre = 'otro'
+            persona.save()
+        self.caso.refresh_from_db()
+        self.assertIn('nuevo otro', self.caso.texto_busqueda)
+        self.assertNotIn('sosa', self.caso.texto_busqueda)
+        self.assertNotIn('rojas', self.caso.texto_busqueda)
 
-# Create your tests here.
+    def test_instancia_sin_cargar_compara_con_la_base(self):
+        nino = Nino.objects.get()
+        copia = Nino(pk=nino.pk, apellido=nino.apellido, nombre=nino.nombre, dni='40999888')
+        with mock.patch.object(Caso, 'recalcular_texto_busqueda') as recalcular:
+            copia.save()
+        recalcular.assert_called_once()
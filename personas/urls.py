@@ -1,6 +1,6 @@
 from django.urls import path
 from . import views
-from .api_views import NinoAPIView, ParteAPIView
+from .api_views import NinoAPIView, ParteAPIView, PersonaBusquedaAPIView
 
 app_name = 'personas'
 
@@ -21,5 +21,8 @@ urlpatterns = [
     path('partes/editar/<int:pk>/', views.ParteUpdateView.as_view(), name='parte_update'),
     path('partes/eliminar/<int:pk>/', views.ParteDeleteView.as_view(), name='parte_delete'),
     path('api/partes/', ParteAPIView.as_view(), name='api_partes'),
+
+    # Busqueda unificada de niños y partes
+    path('api/buscar/', PersonaBusquedaAPIView.as_view(), name='api_buscar'),
     
 ]
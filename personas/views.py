@@ -1,5 +1,3 @@
-import unicodedata
-
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
 from django.shortcuts import redirect, render
@@ -9,19 +7,14 @@ from django.views.generic import ListView, CreateView, UpdateView, DeleteView, D
 from .filters import NinoFilter, ParteFilter
 from oficios.models import Oficio
 from oficios.filters import OficioFilter
+from core import roles
+from core.paginacion import PaginacionCursorMixin
 from .models import Nino, Parte
 from .forms import NinoForm, ParteForm
 
 
 def _is_coordinacion_opd(user):
-    try:
-        sector = getattr(getattr(user, 'perfil', None), 'id_sector', None)
-        raw_nombre = getattr(sector, 'nombre', '') or ''
-        norm = unicodedata.normalize('NFKD', raw_nombre)
-        sector_nombre = ''.join(c for c in norm if not unicodedata.combining(c)).lower()
-        return 'coordinacion opd' in sector_nombre
-    except Exception:
-        return False
+    return roles.tiene_rol(user, roles.COORDINACION_OPD)
 
 
 class CoordinacionOPDWriteBlockMixin:
@@ -41,11 +34,12 @@ def personas_home(request):
     return render(request, 'personas/home.html', context)
 
 # Vistas para el modelo Nino
-class NinoListView(ListView):
+class NinoListView(PaginacionCursorMixin, ListView):
     model = Nino
     template_name = 'personas/nino_list.html'
     context_object_name = 'ninos'
     paginate_by = 10
+    estimar_total = True
     ordering = ['apellido', 'nombre']
 
     def get_queryset(self):
@@ -126,11 +120,12 @@ class NinoDeleteView(CoordinacionOPDWriteBlockMixin, DeleteView):
         return super().post(request, *args, **kwargs)
 
 # Vistas para el modelo Parte
-class ParteListView(ListView):
+class ParteListView(PaginacionCursorMixin, ListView):
     model = Parte
     template_name = 'personas/parte_list.html'
     context_object_name = 'partes'
     paginate_by = 10
+    estimar_total = True
     ordering = ['apellido', 'nombre']
 
     def get_queryset(self):
@@ -1,3 +1,17 @@
 from django.contrib import admin
 
-# No hay modelos propios para registrar por ahora.
+from .models import ResumenDiarioOficio
+
+
+@admin.register(ResumenDiarioOficio)
+class ResumenDiarioOficioAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'estado', 'institucion', 'juzgado', 'vencimiento', 'total')
+    list_filter = ('estado',)
+    date_hierarchy = 'fecha'
+    list_select_related = ('institucion', 'juzgado')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from core import versiones
+
+
+PREFIJO = 'reportes:dashboard'
+CLAVE_ACIERTOS = f'{PREFIJO}:aciertos'
+CLAVE_FALLOS = f'{PREFIJO}:fallos'
+
+
+def _timeout():
+    return getattr(settings, 'REPORTES_DASHBOARD_CACHE_TIMEOUT', 60 * 60)
+
+
+def _contar(clave):
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.add(clave, 0, timeout=None)
+        cache.incr(clave)
+    except Exception:
+        pass
+
+
+def snapshot_dashboard(desde, hasta, hoy, calcular):
+    """
+    Devuelve los datos del tablero para el rango desde el cache o, si no estan,
+    los arma con `calcular()` y los guarda. La clave incluye la version de los
+    datos de oficios (ver core.versiones), asi que cualquier alta/cambio de
+    oficio, movimiento o respuesta deja obsoletos los snapshots anteriores.
+    """
+    clave = f'{PREFIJO}:{versiones.version_datos(versiones.OFICIOS)}:{hoy}:{desde}:{hasta}'
+    datos = cache.get(clave)
+    if datos is not None:
+        _contar(CLAVE_ACIERTOS)
+        return datos
+    _contar(CLAVE_FALLOS)
+    datos = calcular()
+    cache.set(clave, datos, _timeout())
+    return datos
+
+
+def estadisticas():
+    """Aciertos y fallos acumulados del cache del tablero."""
+    valores = cache.get_many([CLAVE_ACIERTOS, CLAVE_FALLOS])
+    aciertos = valores.get(CLAVE_ACIERTOS, 0)
+    fallos = valores.get(CLAVE_FALLOS, 0)
+    total = aciertos + fallos
+    return {
+        'aciertos': aciertos,
+        'fallos': fallos,
+        'tasa_aciertos': aciertos / total if total else 0,
+    }
+
+
+def reiniciar_estadisticas():
+    cache.delete_many([CLAVE_ACIERTOS, CLAVE_FALLOS])
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from reportes.cache import estadisticas, reiniciar_estadisticas
+
+
+class Command(BaseCommand):
+    help = 'Muestra los aciertos y fallos del cache del tablero de reportes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reiniciar', action='store_true', help='Pone los contadores en cero.')
+
+    def handle(self, *args, **options):
+        datos = estadisticas()
+        self.stdout.write(
+            f"aciertos={datos['aciertos']} fallos={datos['fallos']} "
+            f"tasa={datos['tasa_aciertos']:.1%}"
+        )
+        if options['reiniciar']:
+            reiniciar_estadisticas()
+            self.stdout.write(self.style.SUCCESS('Contadores reiniciados.'))
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reportes.resumen import reconstruir
+
+
+def _fecha(valor):
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Fecha invalida: {valor} (usar AAAA-MM-DD)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstruye la tabla de resumen diario de oficios usada por el tablero de '
+        'reportes, para todo el historico o para un rango de fechas de emision.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=_fecha, help='Fecha de emision inicial (AAAA-MM-DD).')
+        parser.add_argument('--hasta', type=_fecha, help='Fecha de emision final (AAAA-MM-DD).')
+
+    def handle(self, *args, **options):
+        desde, hasta = options['desde'], options['hasta']
+        if desde and hasta and hasta < desde:
+            raise CommandError('--hasta no puede ser anterior a --desde.')
+        filas = reconstruir(desde, hasta)
+        self.stdout.write(self.style.SUCCESS(f'Resumen reconstruido: {filas} filas.'))
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def poblar_resumen(apps, schema_editor):
+    Oficio = apps.get_model('oficios', 'Oficio')
+    ResumenDiarioOficio = apps.get_model('reportes', 'ResumenDiarioOficio')
+    filas = (
+        Oficio.objects
+        .annotate(fecha=TruncDate('fecha_emision'), vencimiento=TruncDate('fecha_vencimiento'))
+        .values('fecha', 'estado', 'institucion_id', 'juzgado_id', 'vencimiento')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    ResumenDiarioOficio.objects.bulk_create(
+        (ResumenDiarioOficio(**fila) for fila in filas.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('oficios', '0036_alter_historicaloficio_codigo_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenDiarioOficio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha de emisión')),
+                ('estado', models.CharField(max_length=20, verbose_name='Estado')),
+                ('vencimiento', models.DateField(blank=True, null=True, verbose_name='Fecha de vencimiento')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('institucion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='oficios.institucion', verbose_name='Institución')),
+                ('juzgado', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='oficios.juzgado', verbose_name='Juzgado')),
+            ],
+            options={
+                'verbose_name': 'Resumen diario de oficios',
+                'verbose_name_plural': 'Resumen diario de oficios',
+                'ordering': ['-fecha'],
+                'indexes': [models.Index(fields=['fecha', 'estado', 'institucion', 'juzgado', 'vencimiento'], name='reportes_resumen_clave_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,99 @@
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
-# Actualmente la aplicación de reportes utiliza datos existentes (oficios, casos, respuestas)
-# sin requerir modelos propios. Este archivo queda listo para futuras extensiones.
+
+def fecha_local(valor):
+    """Fecha (dia local) de un DateTimeField; None si no hay valor."""
+    if valor is None:
+        return None
+    if timezone.is_aware(valor):
+        valor = timezone.localtime(valor)
+    return valor.date()
+
+
+class ResumenDiarioOficio(models.Model):
+    """
+    Tabla de hechos para el tablero de reportes: cantidad de oficios por dia de
+    emision, estado, institucion, juzgado y dia de vencimiento.
+
+    Se mantiene con deltas desde Oficio.save()/delete() y se puede reconstruir con
+    `manage.py reconstruir_resumen_oficios`. No lleva restriccion de unicidad: si dos
+    altas concurrentes crean la misma clave, las filas duplicadas se suman al leer.
+    """
+    fecha = models.DateField(verbose_name='Fecha de emisión')
+    estado = models.CharField(max_length=20, verbose_name='Estado')
+    institucion = models.ForeignKey(
+        'oficios.Institucion',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Institución'
+    )
+    juzgado = models.ForeignKey(
+        'oficios.Juzgado',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='Juzgado'
+    )
+    vencimiento = models.DateField(null=True, blank=True, verbose_name='Fecha de vencimiento')
+    total = models.PositiveIntegerField(default=0)
+
+    CAMPOS_CLAVE = ('fecha', 'estado', 'institucion_id', 'juzgado_id', 'vencimiento')
+
+    class Meta:
+        verbose_name = 'Resumen diario de oficios'
+        verbose_name_plural = 'Resumen diario de oficios'
+        ordering = ['-fecha']
+        indexes = [
+            models.Index(
+                fields=['fecha', 'estado', 'institucion', 'juzgado', 'vencimiento'],
+                name='reportes_resumen_clave_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha} {self.estado}: {self.total}"
+
+    @staticmethod
+    def clave_de_oficio(fecha_emision, estado, institucion_id, juzgado_id, fecha_vencimiento):
+        return (fecha_local(fecha_emision), estado, institucion_id, juzgado_id, fecha_local(fecha_vencimiento))
+
+    @classmethod
+    def ajustar(cls, deltas):
+        """
+        Aplica {clave: delta} sobre la tabla con un numero fijo de consultas,
+        sin importar cuantas claves se toquen: lectura con bloqueo, un
+        bulk_update y un bulk_create para las claves nuevas.
+        Debe llamarse dentro de la transaccion que guarda los oficios.
+        """
+        deltas = {clave: delta for clave, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        filtro = Q()
+        for clave in deltas:
+            filtro |= Q(**dict(zip(cls.CAMPOS_CLAVE, clave)))
+        existentes = {}
+        for fila in cls.objects.select_for_update().filter(filtro).order_by('pk'):
+            clave = tuple(getattr(fila, campo) for campo in cls.CAMPOS_CLAVE)
+            existentes.setdefault(clave, []).append(fila)
+
+        actualizar, crear = [], []
+        for clave, delta in deltas.items():
+            filas = existentes.get(clave)
+            if not filas:
+                if delta > 0:
+                    crear.append(cls(total=delta, **dict(zip(cls.CAMPOS_CLAVE, clave))))
+                continue
+            # Las bajas se descuentan de las filas con saldo (puede haber duplicados)
+            fila = filas[0] if delta > 0 else next((f for f in filas if f.total), filas[0])
+            fila.total = max(fila.total + delta, 0)
+            actualizar.append(fila)
+
+        if actualizar:
+            cls.objects.bulk_update(actualizar, ['total'])
+        if crear:
+            cls.objects.bulk_create(crear)
@@ -0,0 +1,148 @@
+from collections import Counter
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from core import versiones
+from oficios.models import Oficio
+
+from .models import ResumenDiarioOficio
+
+
+ESTADOS_PENDIENTES = ('cargado', 'asignado', 'devuelto')
+
+
+def _inicio_del_dia(fecha):
+    return timezone.make_aware(datetime.combine(fecha, time.min))
+
+
+def filas_desde_oficios(queryset, *extra):
+    """Agrupa oficios con la misma clave que ResumenDiarioOficio (mas los campos `extra`)."""
+    return (
+        queryset
+        .annotate(fecha=TruncDate('fecha_emision'), vencimiento=TruncDate('fecha_vencimiento'))
+        .values('fecha', 'estado', 'institucion_id', 'juzgado_id', 'vencimiento', *extra)
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+
+
+def reconstruir(desde=None, hasta=None):
+    """
+    Recalcula ResumenDiarioOficio a partir de los oficios, para todo el historico
+    o para el rango de fechas de emision indicado. Devuelve la cantidad de filas.
+    """
+    oficios = Oficio.objects.all()
+    resumen = ResumenDiarioOficio.objects.all()
+    if desde:
+        oficios = oficios.filter(fecha_emision__gte=_inicio_del_dia(desde))
+        resumen = resumen.filter(fecha__gte=desde)
+    if hasta:
+        oficios = oficios.filter(fecha_emision__lt=_inicio_del_dia(hasta + timedelta(days=1)))
+        resumen = resumen.filter(fecha__lte=hasta)
+    with transaction.atomic():
+        resumen.delete()
+        filas = ResumenDiarioOficio.objects.bulk_create(
+            (ResumenDiarioOficio(**fila) for fila in filas_desde_oficios(oficios).iterator()),
+            batch_size=1000,
+        )
+    versiones.invalidar_datos(versiones.OFICIOS)
+    return len(filas)
+
+
+def _sumar(contador, filas, campo):
+    for fila in filas:
+        contador[fila[campo]] += fila['total']
+
+
+def _top(totales, nombres, campo_nombre, limite=5):
+    return [
+        {campo_nombre: nombres[pk], 'total': total}
+        for pk, total in sorted(totales.items(), key=lambda item: (-item[1], nombres[item[0]]))[:limite]
+    ]
+
+
+def datos_dashboard(desde=None, hasta=None, hoy=None):
+    """
+    Agregados del tablero para el rango de fechas de emision [desde, hasta].
+
+    Los dias cerrados (anteriores a hoy) se leen de ResumenDiarioOficio; solo el dia
+    en curso (y cualquier fecha posterior) se calcula en vivo sobre Oficio, que es
+    una porcion chica de la tabla.
+    """
+    hoy = hoy or timezone.localdate()
+    limite_proximos = hoy + timedelta(days=7)
+
+    cerrados = ResumenDiarioOficio.objects.filter(fecha__lt=hoy)
+    if desde:
+        cerrados = cerrados.filter(fecha__gte=desde)
+    if hasta:
+        cerrados = cerrados.filter(fecha__lte=hasta)
+
+    estados = Counter()
+    meses = Counter()
+    instituciones = Counter()
+    juzgados = Counter()
+    nombres_instituciones = {}
+    nombres_juzgados = {}
+
+    _sumar(estados, cerrados.values('estado').annotate(total=Sum('total')).order_by(), 'estado')
+    _sumar(meses, cerrados.annotate(mes=TruncMonth('fecha')).values('mes').annotate(total=Sum('total')).order_by(), 'mes')
+    for fila in (
+        cerrados.filter(institucion__isnull=False)
+        .values('institucion_id', 'institucion__nombre')
+        .annotate(total=Sum('total'))
+        .order_by()
+    ):
+        instituciones[fila['institucion_id']] += fila['total']
+        nombres_instituciones[fila['institucion_id']] = fila['institucion__nombre']
+    for fila in (
+        cerrados.filter(juzgado__isnull=False)
+        .values('juzgado_id', 'juzgado__nombre')
+        .annotate(total=Sum('total'))
+        .order_by()
+    ):
+        juzgados[fila['juzgado_id']] += fila['total']
+        nombres_juzgados[fila['juzgado_id']] = fila['juzgado__nombre']
+    vencimientos = cerrados.aggregate(
+        vencidos=Sum('total', filter=Q(vencimiento__lt=hoy)),
+        proximos=Sum('total', filter=Q(vencimiento__gte=hoy, vencimiento__lt=limite_proximos)),
+    )
+    vencidos = vencimientos['vencidos'] or 0
+    proximos = vencimientos['proximos'] or 0
+
+    # Dia en curso: en vivo, con la misma clave que el resumen
+    if not hasta or hasta >= hoy:
+        en_vivo = Oficio.objects.filter(fecha_emision__gte=_inicio_del_dia(max(desde or hoy, hoy)))
+        if hasta:
+            en_vivo = en_vivo.filter(fecha_emision__lt=_inicio_del_dia(hasta + timedelta(days=1)))
+        filas = filas_desde_oficios(en_vivo, 'institucion__nombre', 'juzgado__nombre')
+        for fila in filas:
+            total = fila['total']
+            estados[fila['estado']] += total
+            meses[fila['fecha'].replace(day=1)] += total
+            if fila['institucion_id']:
+                instituciones[fila['institucion_id']] += total
+                nombres_instituciones[fila['institucion_id']] = fila['institucion__nombre']
+            if fila['juzgado_id']:
+                juzgados[fila['juzgado_id']] += total
+                nombres_juzgados[fila['juzgado_id']] = fila['juzgado__nombre']
+            if fila['vencimiento']:
+                if fila['vencimiento'] < hoy:
+                    vencidos += total
+                elif fila['vencimiento'] < limite_proximos:
+                    proximos += total
+
+    return {
+        'estados': dict(estados),
+        'serie_mensual': [{'mes': mes, 'total': total} for mes, total in sorted(meses.items()) if total],
+        'top_instituciones': _top(instituciones, nombres_instituciones, 'institucion__nombre'),
+        'top_juzgados': _top(juzgados, nombres_juzgados, 'juzgado__nombre'),
+        'total_oficios': sum(estados.values()),
+        'pendientes': sum(estados.get(estado, 0) for estado in ESTADOS_PENDIENTES),
+        'vencidos': vencidos,
+        'proximos': proximos,
+    }
@@ -1,6 +1,114 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from oficios.models import Institucion, Juzgado, Oficio, Respuesta
+
+from .cache import estadisticas, reiniciar_estadisticas
+from .models import ResumenDiarioOficio
+from .resumen import reconstruir
 
 
 class ReportesSmokeTest(TestCase):
     def test_placeholder(self):
         self.assertTrue(True)
+
+
+class ResumenDiarioOficioTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.institucion = Institucion.objects.create(nombre='HOSPITAL')
+        cls.juzgado = Juzgado.objects.create(nombre='JUZGADO 1')
+        cls.hoy = timezone.localdate()
+        cls.hace_diez_dias = timezone.now() - timedelta(days=10)
+
+    def setUp(self):
+        cache.clear()
+
+    def _resumen(self):
+        return sorted(
+            (tuple(getattr(fila, campo) for campo in ResumenDiarioOficio.CAMPOS_CLAVE), fila.total)
+            for fila in ResumenDiarioOficio.objects.filter(total__gt=0)
+        )
+
+    def _crear(self, **kwargs):
+        datos = {'institucion': self.institucion, 'juzgado': self.juzgado, 'plazo_horas': 48}
+        datos.update(kwargs)
+        return Oficio.objects.create(**datos)
+
+    def test_deltas_coinciden_con_reconstruccion(self):
+        viejo = self._crear(fecha_emision=self.hace_diez_dias)
+        otro = self._crear(fecha_emision=self.hace_diez_dias, institucion=None)
+        self._crear()
+        viejo.estado = 'enviado'
+        viejo.save()
+        otro.institucion = self.institucion
+        otro.save(update_fields=['institucion'])
+        Oficio.objects.get(pk=self._crear(estado='asignado').pk).delete()
+
+        incremental = self._resumen()
+        reconstruir()
+        self.assertEqual(incremental, self._resumen())
+
+    def test_dashboard_lee_dias_cerrados_del_resumen(self):
+        self._crear(fecha_emision=self.hace_diez_dias, estado='respondido')
+        self._crear(fecha_emision=self.hace_diez_dias)
+        self._crear(estado='enviado')
+        # Un oficio viejo cargado por fuera de save() solo aparece tras reconstruir
+        Oficio.objects.bulk_create([
+            Oficio(codigo='X-1', fecha_emision=self.hace_diez_dias, institucion=self.institucion),
+        ])
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('reportes:dashboard'))
+        kpis = response.context['kpis']
+        self.assertEqual(kpis['total_oficios'], 3)
+        self.assertEqual(kpis['respondidos'], 1)
+        self.assertEqual(kpis['enviados'], 1)
+        self.assertEqual(kpis['vencidos'], 2)
+        self.assertEqual(response.context['top_instituciones'], [{'institucion__nombre': 'HOSPITAL', 'total': 3}])
+
+        reconstruir()
+        response = self.client.get(reverse('reportes:dashboard'), {'hasta': str(self.hoy - timedelta(days=1))})
+        self.assertEqual(response.context['kpis']['total_oficios'], 3)
+        self.assertEqual(response.context['kpis']['pendientes'], 2)
+
+
+class CacheDashboardTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='operador', password='x')
+        cls.oficio = Oficio.objects.create(plazo_horas=48)
+
+    def setUp(self):
+        cache.clear()
+        reiniciar_estadisticas()
+        self.client.force_login(self.user)
+
+    def test_segunda_carga_sin_agregados(self):
+        self.client.get(reverse('reportes:dashboard'))
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('reportes:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        agregados = [q['sql'] for q in ctx.captured_queries if 'COUNT(' in q['sql'] or 'SUM(' in q['sql']]
+        self.assertEqual(agregados, [])
+        self.assertEqual(estadisticas()['aciertos'], 1)
+        self.assertEqual(estadisticas()['fallos'], 1)
+
+    def test_escritura_invalida_el_snapshot(self):
+        url = reverse('reportes:dashboard')
+        self.assertEqual(self.client.get(url).context['kpis']['respondidos'], 0)
+        Respuesta.objects.create(id_oficio=self.oficio, respuesta='ok')
+        self.oficio.estado = 'respondido'
+        self.oficio.save()
+        response = self.client.get(url)
+        self.assertEqual(response.context['kpis']['respondidos'], 1)
+        self.assertEqual(len(response.context['respuestas_recientes']), 1)
+        self.assertEqual(estadisticas()['fallos'], 2)
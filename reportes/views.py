@@ -1,13 +1,14 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.db.models.functions import TruncMonth
 from django.utils import timezone
 from django.views.generic import TemplateView
 
 from oficios.models import MovimientoOficio, Oficio, Respuesta
 
+from .cache import snapshot_dashboard
+from .resumen import datos_dashboard
+
 
 class DashboardView(LoginRequiredMixin, TemplateView):
     template_name = 'reportes/dashboard.html'
@@ -42,44 +43,30 @@ class DashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         start, end = self.get_filters()
+        today = timezone.localdate()
+        context.update({
+            'fecha_desde': start,
+            'fecha_hasta': end,
+        })
+        # El snapshot es el mismo para todos los usuarios hasta la proxima escritura
+        context.update(snapshot_dashboard(start, end, today, lambda: self.get_snapshot(start, end, today)))
+        return context
+
+    def get_snapshot(self, start, end, today):
+        """Compute every dashboard figure; querysets are evaluated so the result can be cached."""
         oficios_qs = self.get_base_oficios()
 
-        today = timezone.localdate()
-        upcoming_limit = today + timedelta(days=7)
+        # Agregados desde la tabla de resumen (ver reportes/resumen.py)
+        datos = datos_dashboard(start, end, hoy=today)
 
         estado_labels = dict(Oficio.ESTADO_CHOICES)
         estado_counts = {key: 0 for key in estado_labels.keys()}
-        for row in oficios_qs.values('estado').annotate(total=Count('id')):
-            estado_counts[row['estado']] = row['total']
+        estado_counts.update(datos['estados'])
         estado_resumen = [
             {'clave': key, 'nombre': label, 'total': estado_counts.get(key, 0)}
             for key, label in estado_labels.items()
         ]
 
-        serie_mensual = (
-            oficios_qs
-            .annotate(mes=TruncMonth('fecha_emision'))
-            .values('mes')
-            .annotate(total=Count('id'))
-            .order_by('mes')
-        )
-
-        top_instituciones = (
-            oficios_qs
-            .filter(institucion__isnull=False)
-            .values('institucion__nombre')
-            .annotate(total=Count('id'))
-            .order_by('-total')[:5]
-        )
-
-        top_juzgados = (
-            oficios_qs
-            .filter(juzgado__isnull=False)
-            .values('juzgado__nombre')
-            .annotate(total=Count('id'))
-            .order_by('-total')[:5]
-        )
-
         movimientos_recientes = (
             MovimientoOficio.objects
             .select_related('oficio', 'institucion', 'usuario')
@@ -94,34 +81,27 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             .order_by('-fecha_hora')[:8]
         )
 
-        context.update({
-            'fecha_desde': start,
-            'fecha_hasta': end,
+        return {
             'kpis': {
-                'total_oficios': oficios_qs.count(),
-                'respondidos': oficios_qs.filter(estado='respondido').count(),
-                'enviados': oficios_qs.filter(estado='enviado').count(),
-                'pendientes': oficios_qs.filter(estado__in=['cargado', 'asignado', 'devuelto']).count(),
-                'vencidos': oficios_qs.filter(fecha_vencimiento__lt=today).count(),
-                'proximos': oficios_qs.filter(
-                    fecha_vencimiento__gte=today,
-                    fecha_vencimiento__lte=upcoming_limit
-                ).count(),
+                'total_oficios': datos['total_oficios'],
+                'respondidos': estado_counts.get('respondido', 0),
+                'enviados': estado_counts.get('enviado', 0),
+                'pendientes': datos['pendientes'],
+                'vencidos': datos['vencidos'],
+                'proximos': datos['proximos'],
                 'casos_vinculados': oficios_qs.exclude(caso__isnull=True).values('caso_id').distinct().count(),
             },
             'estado_labels': estado_labels,
             'estado_counts': estado_counts,
             'estado_resumen': estado_resumen,
-            'serie_mensual': serie_mensual,
-            'top_instituciones': top_instituciones,
-            'top_juzgados': top_juzgados,
-            'movimientos_recientes': movimientos_recientes,
-            'respuestas_recientes': respuestas_recientes,
-            'oficios_proximos_vencer': (
+            'serie_mensual': datos['serie_mensual'],
+            'top_instituciones': datos['top_instituciones'],
+            'top_juzgados': datos['top_juzgados'],
+            'movimientos_recientes': list(movimientos_recientes),
+            'respuestas_recientes': list(respuestas_recientes),
+            'oficios_proximos_vencer': list(
                 oficios_qs
                 .filter(fecha_vencimiento__gte=today)
                 .order_by('fecha_vencimiento')[:5]
             ),
-        })
-
-        return context
+        }